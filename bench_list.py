@@ -0,0 +1,156 @@
+"""
+Порівняння постійного рендера картки-списку (services/list_renderer) з новою фігурою на кожне зображення.
+Рендерить однакові картки обома способами, рахує різницю пікселів і міряє час.
+
+Запуск: python bench_list.py [кількість повторів]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+
+import matplotlib
+matplotlib.use("Agg") # рендер лише у PNG, без GUI-бекенда
+import matplotlib.patches as patches
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from services.image_generator import COLOR_ACCENT
+from services.list_renderer import ListViewRenderer
+
+
+def draw_list_view_matplotlib(
+    intervals: List[tuple],
+    current_dt: datetime,
+    queue_id: str,
+    title: str = "Сьогодні",
+    show_time_marker: bool = True,
+    region_name: Optional[str] = None,
+    bot_username: Optional[str] = None
+) -> BytesIO:
+    """
+    Повний рендер картки через нову фігуру matplotlib (еталон для services/list_renderer).
+    """
+    # Розрахунок висоти (завжди квадрат 8x8)
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_axes([0.05, 0.05, 0.9, 0.9])
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.set_axis_off()
+
+    # Заголовок регіону (самий верх)
+    if region_name:
+        plt.text(0.5, 0.97, region_name, ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=ax.transAxes)
+    
+    # Підзаголовок
+    plt.text(0.5, 0.90, f"Графік відключень • {title}", ha='center', va='top', fontsize=14, fontweight='bold', color='#555555', transform=ax.transAxes)
+    
+    y_pos = 0.65 # Починаємо нижче, щоб не наповзало на заголовок
+    
+    if not intervals:
+        plt.text(0.5, 0.45, f"{current_dt.strftime('%d.%m.%Y')}\nВідключень не заплановано", 
+                 ha='center', va='center', fontsize=16, color='green', fontweight='bold', transform=ax.transAxes)
+    else:
+        # Дата (вище першого інтервалу)
+        plt.text(0.05, y_pos + 0.12, f"{current_dt.strftime('%d.%m.%Y')}", fontsize=14, fontweight='bold', color='#333333', transform=ax.transAxes)
+        
+        # Динамічний крок залежно від кількості інтервалів
+        step = min(0.14, 0.50 / len(intervals)) if intervals else 0.15
+        
+        for start, end in intervals:
+            s_h, s_m = divmod(start * 30, 60)
+            e_h, e_m = divmod(end * 30, 60)
+            if e_h == 24: e_h, e_m = 0, 0
+            
+            duration_min = (end - start) * 30
+            dur_h, dur_m = divmod(duration_min, 60)
+            dur_str = f"{dur_h} год" + (f" {dur_m} хв" if dur_m else "")
+
+            # Динамічний розмір плашки та шрифту
+            box_h = min(0.12, 0.5 / len(intervals)) if intervals else 0.08
+            font_s = 18 if len(intervals) <= 3 else 16
+            
+            # Плашка інтервалу
+            rect = patches.FancyBboxPatch((0.05, y_pos - box_h/2), 0.6, box_h, 
+                                          facecolor='#C2185B', edgecolor='none', 
+                                          boxstyle='round,pad=0.02', transform=ax.transAxes)
+            ax.add_patch(rect)
+            
+            plt.text(0.15, y_pos, f"{s_h:02d}:{s_m:02d}", color='white', fontsize=font_s, fontweight='bold', ha='center', va='center', transform=ax.transAxes)
+            plt.text(0.35, y_pos, "———", color='white', fontsize=font_s, ha='center', va='center', transform=ax.transAxes)
+            plt.text(0.55, y_pos, f"{e_h:02d}:{e_m:02d}", color='white', fontsize=font_s, fontweight='bold', ha='center', va='center', transform=ax.transAxes)
+            
+            # Тривалість
+            plt.text(0.75, y_pos, dur_str, color='#C2185B', fontsize=font_s - 2, fontweight='bold', 
+                     ha='left', va='center', bbox=dict(facecolor='white', edgecolor='#C2185B', boxstyle='round,pad=0.3'), transform=ax.transAxes)
+            
+            y_pos -= step * 1.2 if len(intervals) <= 3 else step
+            
+    # Номер черги в нижньому правому куті (піднято, щоб не заважати тегу)
+    plt.text(0.95, 0.12, f"{queue_id}", ha='right', va='bottom', fontsize=16, fontweight='bold', 
+             bbox=dict(facecolor=COLOR_ACCENT, alpha=0.8, edgecolor='none', boxstyle='round,pad=0.5'), color='white',
+             transform=ax.transAxes)
+
+    if show_time_marker:
+        plt.text(0.01, 0.01, f"Станом на {current_dt.strftime('%H:%M')}", fontsize=9, color='grey', transform=ax.transAxes, ha='left', va='bottom')
+
+    if bot_username:
+        # Вирівнюємо по горизонталі з "Станом на"
+        plt.text(0.99, 0.01, f"@{bot_username.replace('@', '')}", ha='right', va='bottom', fontsize=9, color='grey', transform=ax.transAxes,
+                 bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
+
+    buf = BytesIO()
+    plt.savefig(buf, format='png', dpi=120)
+    buf.seek(0)
+    plt.close(fig)
+    return buf
+
+
+def random_intervals(rng: random.Random) -> list:
+    """Від 0 до 6 відключень, що не перетинаються."""
+    intervals, slot = [], rng.randrange(6)
+    for _ in range(rng.randrange(7)):
+        start = slot + rng.randrange(1, 6)
+        end = min(48, start + rng.randrange(1, 9))
+        if start >= 48:
+            break
+        intervals.append((start, end))
+        slot = end
+    return intervals
+
+
+def to_rgb(buf: BytesIO) -> np.ndarray:
+    return np.asarray(Image.open(BytesIO(buf.getvalue())).convert("RGB")).astype(np.int16)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rng = random.Random(18)
+    cases = [
+        (random_intervals(rng), datetime(2026, 1, 15, rng.randrange(24), rng.randrange(60)), f"{i % 6 + 1}.{i % 2 + 1}")
+        for i in range(repeats)
+    ]
+    kwargs = dict(title="Сьогодні", region_name="Київська область", bot_username="svitlo_bot")
+
+    started = time.perf_counter()
+    reference = [draw_list_view_matplotlib(iv, dt, q, **kwargs) for iv, dt, q in cases]
+    fresh_ms = (time.perf_counter() - started) * 1000 / repeats
+
+    renderer = ListViewRenderer()
+    renderer.render(*cases[0], **kwargs)
+    started = time.perf_counter()
+    reused = [renderer.render(iv, dt, q, **kwargs) for iv, dt, q in cases]
+    reused_ms = (time.perf_counter() - started) * 1000 / repeats
+
+    diffs = [np.abs(to_rgb(a) - to_rgb(b)) for a, b in zip(reference, reused)]
+    identical = sum(1 for d in diffs if not d.any())
+    print(f"new figure: {fresh_ms:.1f} ms/image")
+    print(f"reused:     {reused_ms:.1f} ms/image ({fresh_ms / reused_ms:.1f}x)")
+    print(f"pixel-identical: {identical}/{repeats}, max diff {max(int(d.max()) for d in diffs)}")
+
+
+if __name__ == "__main__":
+    main()
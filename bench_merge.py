@@ -0,0 +1,158 @@
+"""
+Порівняння пакетного об'єднання графіків (merge_schedules) зі старими циклами по слотах.
+Генерує повний набір регіонів, перевіряє, що результат ідентичний, і міряє час.
+
+Запуск: python bench_merge.py [кількість повторів]
+"""
+import copy
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from services.day_grid import (
+    SLOT_LABELS, compact_schedule, expand_schedule, merge_day, merge_schedules, merge_schedules_batch
+)
+
+REGIONS_COUNT = 25
+QUEUES = [f"{g}.{s}" for g in range(1, 7) for s in range(1, 3)]
+
+
+def random_day(rng: random.Random) -> dict:
+    """День у форматі API: частина слотів відсутня, частина невідома (0)."""
+    day = {}
+    for label in SLOT_LABELS:
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        day[label] = 0 if roll < 0.3 else rng.choice((1, 2, 3))
+    return day
+
+
+def build_payload(rng: random.Random) -> dict:
+    today = date.today()
+    dates = [(today + timedelta(days=i)).isoformat() for i in range(-1, 2)]
+    regions = []
+    for i in range(REGIONS_COUNT):
+        schedule = {}
+        for q_id in QUEUES:
+            if rng.random() < 0.05:
+                continue
+            schedule[q_id] = {d: random_day(rng) for d in dates if rng.random() < 0.9}
+        regions.append({"cpu": f"region-{i}", "emergency": False, "schedule": schedule})
+    return {"date_today": dates[1], "date_tomorrow": dates[2], "regions": regions}
+
+
+def legacy_merge(new_data: dict, old_data: dict):
+    """Старий _merge_with_old_data над словниками формату API (змінює new_data)."""
+    old_regions = {r["cpu"]: r for r in old_data.get("regions", [])}
+    for new_r in new_data.get("regions", []):
+        cpu = new_r.get("cpu")
+        if cpu not in old_regions: continue
+        old_r = old_regions[cpu]
+        if "schedule" not in old_r: continue
+        if "schedule" not in new_r:
+            new_r["schedule"] = old_r["schedule"]
+            continue
+        for q_id, old_q_sched in old_r["schedule"].items():
+            if q_id not in new_r["schedule"]:
+                new_r["schedule"][q_id] = old_q_sched
+                continue
+            new_q_sched = new_r["schedule"][q_id]
+            for date_str, old_day_grid in old_q_sched.items():
+                if date_str not in new_q_sched:
+                    new_q_sched[date_str] = old_day_grid
+                else:
+                    for slot, old_status in old_day_grid.items():
+                        new_status = new_q_sched[date_str].get(slot, 0)
+                        if new_status == 0 and old_status != 0:
+                            new_q_sched[date_str][slot] = old_status
+
+
+def legacy_if_merge(region_schedule: dict, new_if_schedules: dict):
+    """Старе об'єднання для ІФ над словниками формату API (змінює region_schedule)."""
+    for q_id, q_sched in new_if_schedules.items():
+        if q_id not in region_schedule:
+            region_schedule[q_id] = {}
+        old_q_sched = region_schedule[q_id]
+        for date_str, day_grid in q_sched.items():
+            if date_str not in old_q_sched:
+                old_q_sched[date_str] = day_grid
+            else:
+                for slot, status in day_grid.items():
+                    if status == 0 and old_q_sched[date_str].get(slot, 0) != 0:
+                        continue
+                    old_q_sched[date_str][slot] = status
+
+
+def loop_merge(new: dict, old: dict) -> dict:
+    """Попередня реалізація над DayGrid: merge_day у циклі по чергах і датах."""
+    merged = {q_id: dict(q_sched) for q_id, q_sched in new.items()}
+    for q_id, old_q_sched in old.items():
+        if q_id not in merged:
+            merged[q_id] = old_q_sched
+            continue
+        for date_str, old_grid in old_q_sched.items():
+            if date_str not in merged[q_id]:
+                merged[q_id][date_str] = old_grid
+            else:
+                merged[q_id][date_str] = merge_day(merged[q_id][date_str], old_grid)
+    return merged
+
+
+def normalized(schedule: dict) -> dict:
+    """Відсутній слот і 0 однаково означають "невідомо"."""
+    return {q: {d: {s: v for s, v in day.items() if v} for d, day in qs.items()} for q, qs in schedule.items()}
+
+
+def timed(fn, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = random.Random(42)
+    old_data = build_payload(rng)
+    new_data = build_payload(rng)
+    old_compact = [compact_schedule(r["schedule"]) for r in old_data["regions"]]
+    new_compact = [compact_schedule(r["schedule"]) for r in new_data["regions"]]
+    days = sum(len(qs) for s in new_compact for qs in s.values())
+    print(f"Payload: {REGIONS_COUNT} regions, {days} queue-days")
+
+    # 1. Еквівалентність основного об'єднання
+    expected = copy.deepcopy(new_data)
+    legacy_merge(expected, copy.deepcopy(old_data))
+    batch = merge_schedules_batch(list(zip(new_compact, old_compact)))
+    for r, new_s, old_s, batched in zip(expected["regions"], new_compact, old_compact, batch):
+        assert expand_schedule(batched) == r["schedule"], f"DTEK merge mismatch in {r['cpu']}"
+        assert batched == loop_merge(new_s, old_s), f"merge_day mismatch in {r['cpu']}"
+
+    # 2. Еквівалентність об'єднання ІФ (ІФ завжди пише 0 явно, тож порівнюємо з точністю до 0/відсутній)
+    for new_r, old_s, new_s in zip(new_data["regions"], old_compact, new_compact):
+        expected_if = copy.deepcopy(expand_schedule(old_s))
+        legacy_if_merge(expected_if, copy.deepcopy(new_r["schedule"]))
+        batched = merge_schedules(new_s, old_s)
+        assert normalized(expand_schedule(batched)) == normalized(expected_if), "IF merge mismatch"
+    print("Equivalence: OK")
+
+    # 3. Час
+    def run_legacy():
+        data = copy.deepcopy(new_data)
+        legacy_merge(data, old_data)
+
+    copy_ms = timed(lambda: copy.deepcopy(new_data), repeats)
+    legacy_ms = timed(run_legacy, repeats) - copy_ms
+    loop_ms = timed(lambda: [loop_merge(n, o) for n, o in zip(new_compact, old_compact)], repeats)
+    region_ms = timed(lambda: [merge_schedules(n, o) for n, o in zip(new_compact, old_compact)], repeats)
+    batched_ms = timed(lambda: merge_schedules_batch(list(zip(new_compact, old_compact))), repeats)
+    print(f"legacy dict loops: {legacy_ms:8.2f} ms")
+    print(f"merge_day loops:   {loop_ms:8.2f} ms")
+    print(f"per-region batch:  {region_ms:8.2f} ms")
+    print(f"all-regions batch: {batched_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
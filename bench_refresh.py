@@ -0,0 +1,86 @@
+"""
+Бенчмарк оновлення кешу проти локального фейкового upstream (fake_upstream.py).
+Міряє тривалість оновлення (завантаження, декодування, об'єднання, визначення змін),
+пропускну здатність та затримку розсилки — паралельних запитів графіків усіх черг
+після кожного оновлення. Працює повністю офлайн.
+
+Запуск: python bench_refresh.py --refreshes 20 --regions 25 --latency-ms 50 --mutations 5
+Хеджування: ... --hedge-delay 0.1 --latency-ms 500 --temno-latency-ms 50
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Optional
+
+from fake_upstream import FakeUpstream, config_from_args, parse_args as parse_upstream_args, temno_entrypoint
+from services.api_client import SvitloApiClient
+from services.http_pool import HttpPool
+from services.sources import SourceProvider
+from services.temno_source import TemnoSource
+
+
+def percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return f"p50={p(0.5):.1f}ms p95={p(0.95):.1f}ms max={ordered[-1]:.1f}ms mean={statistics.mean(ordered):.1f}ms"
+
+
+async def run(refreshes: int, hedge_delay: Optional[float], upstream_argv: list[str]):
+    upstream = FakeUpstream(config_from_args(parse_upstream_args(upstream_argv)))
+    base_url = await upstream.start()
+    print(f"Fake upstream at {base_url}: {len(upstream.regions)} regions, "
+          f"{len(upstream.queue_ids)} queues, feed {len(upstream.feed_body()) / 1024:.0f} KB")
+
+    pool = HttpPool()
+    session = pool.session()
+    # --hedge-delay вмикає друге джерело (ендпоінт /temno фейкового upstream)
+    secondary = TemnoSource(entrypoint=temno_entrypoint(base_url)) if hedge_delay is not None else None
+    client = SvitloApiClient(
+        session=session, cache_ttl=3600, source=SourceProvider.local(base_url),
+        secondary_source=secondary, hedge_delay=hedge_delay or 0
+    )
+    pairs = [(cpu, q) for cpu in upstream.regions for q in upstream.queue_ids]
+
+    refresh_ms, fanout_ms, changed_total = [], [], 0
+    started = time.perf_counter()
+    for _ in range(refreshes):
+        t0 = time.perf_counter()
+        await client._refresh_cache()
+        refresh_ms.append((time.perf_counter() - t0) * 1000)
+        changed_total += len(client.get_changed_regions(reset=True))
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(client.fetch_schedule(cpu, q) for cpu, q in pairs))
+        fanout_ms.append((time.perf_counter() - t0) * 1000)
+        assert all(results), "fan-out returned empty schedules"
+    total = time.perf_counter() - started
+
+    pool_stats = pool.get_stats()
+    await client.close()
+    await pool.close()
+    await upstream.stop()
+    print(f"Refreshes: {refreshes} in {total:.2f}s ({refreshes / total:.1f}/s), changed regions total: {changed_total}")
+    print(f"Refresh:  {percentiles(refresh_ms)}")
+    print(f"Fan-out ({len(pairs)} lookups): {percentiles(fanout_ms)}")
+    print(f"Upstream stats: {upstream.stats}")
+    print(f"Client feed stats: {client.get_feed_stats()}")
+    print(f"Sources: {client.get_source_health()}")
+    print(f"HTTP pool: {pool_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh benchmark against fake_upstream", add_help=False)
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--hedge-delay", type=float, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args, upstream_argv = parser.parse_known_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(run(args.refreshes, args.hedge_delay, upstream_argv))
+
+
+if __name__ == "__main__":
+    main()
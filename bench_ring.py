@@ -0,0 +1,157 @@
+"""
+Порівняння шаблонного рендера кільця (services/ring_renderer) з повним рендером matplotlib.
+Рендерить однакові графіки обома способами, рахує різницю пікселів і міряє час.
+
+Запуск: python bench_ring.py [кількість повторів] [тека для PNG]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+
+import matplotlib
+matplotlib.use("Agg") # рендер лише у PNG, без GUI-бекенда
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from services.image_generator import COLOR_OFF, COLOR_ON, COLOR_POSSIBLE, COLOR_TEXT_WHITE, COLOR_UNKNOWN
+from services.ring_renderer import get_template, render_ring
+
+
+def draw_circle_view_matplotlib(
+    colors: List[str],
+    current_dt: datetime,
+    queue_id: str,
+    title: str,
+    show_time_marker: bool = True,
+    region_name: Optional[str] = None,
+    bot_username: Optional[str] = None
+) -> BytesIO:
+    """
+    Повний рендер кругової діаграми через matplotlib (еталон для services/ring_renderer).
+    """
+    sizes = [1] * 48
+
+    fig = plt.figure(figsize=(8, 8))
+    # Максимально збільшуємо графік, щоб він займав майже весь простір
+    ax = fig.add_axes([0.01, 0.01, 0.98, 0.98], projection=None, aspect='equal')
+    
+    # Малюємо кільце з 48 сегментів, але БЕЗ автоматичних ліній
+    ax.pie(sizes, colors=colors, startangle=90, counterclock=False, 
+           wedgeprops=dict(width=0.4, edgecolor='none', linewidth=0))
+
+    # Додаємо розділювачі годин вручну (тільки 24 лінії, кожні 2 сегменти)
+    for i in range(24):
+        angle = 90 - i * 15
+        r_in, r_out = 0.6, 1.0
+        x_in = r_in * np.cos(np.radians(angle))
+        y_in = r_in * np.sin(np.radians(angle))
+        x_out = r_out * np.cos(np.radians(angle))
+        y_out = r_out * np.sin(np.radians(angle))
+        ax.plot([x_in, x_out], [y_in, y_out], color='w', linewidth=0.8, zorder=3)
+
+    # Додаємо цифри годин (всі 24 години)
+    for i in range(24):
+        angle = 90 - (i * 15 + 7.5) 
+        r = 0.8 
+        x = r * np.cos(np.radians(angle))
+        y = r * np.sin(np.radians(angle))
+        ax.text(x, y, f"{i:02d}", ha='center', va='center', 
+                fontsize=11, fontweight='bold', color=COLOR_TEXT_WHITE)
+
+    # Стрілка поточного часу
+    if show_time_marker:
+        current_angle = 90 - (current_dt.hour * 15 + current_dt.minute * 0.25)
+        r_start, r_end = 0.55, 1.05
+        x_s = r_start * np.cos(np.radians(current_angle))
+        y_s = r_start * np.sin(np.radians(current_angle))
+        x_e = r_end * np.cos(np.radians(current_angle))
+        y_e = r_end * np.sin(np.radians(current_angle))
+        ax.plot([x_s, x_e], [y_s, y_e], color='#2196F3', linewidth=4, solid_capstyle='round', zorder=5)
+        ax.scatter([x_e], [y_e], color='#2196F3', s=100, edgecolors='white', linewidth=2, zorder=6)
+
+    # Розділювач опівночі (00:00) - завжди вгорі
+    mx_s, mx_e = 0.55, 1.05
+    ax.plot([0, 0], [mx_s, mx_e], color='white', linewidth=4, zorder=10)
+    
+    # Центр
+    ax.text(0, 0.15, queue_id, ha='center', va='center', fontsize=20, fontweight='bold')
+    
+    
+    ax.text(0, -0.1, title, ha='center', va='center', fontsize=14, fontweight='bold', color='#555555')
+    ax.text(0, -0.25, f"{current_dt.strftime('%d.%m.%Y')}", ha='center', va='center', fontsize=10, color='grey')
+
+    if region_name:
+        # Додаємо заголовок зверху (трохи вище, щоб не наповзало)
+        plt.text(0.5, 0.99, region_name, ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=fig.transFigure, 
+                 bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
+    
+    if bot_username:
+        # Переносимо в самий нижній кут з невеликою підкладкою для читабельності
+        plt.text(0.99, 0.01, f"@{bot_username.replace('@', '')}", ha='right', va='bottom', fontsize=9, color='grey', transform=fig.transFigure,
+                 bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
+
+    buf = BytesIO()
+    plt.savefig(buf, format='png', dpi=120)
+    buf.seek(0)
+    plt.close(fig)
+    return buf
+
+
+def random_colors(rng: random.Random) -> list:
+    colors, current = [], COLOR_ON
+    for _ in range(48):
+        if rng.random() < 0.15:
+            current = rng.choice((COLOR_ON, COLOR_OFF, COLOR_POSSIBLE, COLOR_UNKNOWN))
+        colors.append(current)
+    return colors
+
+
+def to_rgb(buf: BytesIO) -> np.ndarray:
+    return np.asarray(Image.open(BytesIO(buf.getvalue())).convert("RGB")).astype(np.int16)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    rng = random.Random(17)
+    cases = [
+        (random_colors(rng), datetime(2026, 1, 15, rng.randrange(24), rng.randrange(60)), f"{i % 6 + 1}.{i % 2 + 1}")
+        for i in range(repeats)
+    ]
+    kwargs = dict(title="Сьогодні", region_name="Київська область", bot_username="svitlo_bot")
+
+    started = time.perf_counter()
+    get_template()
+    print(f"template build: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    reference = [draw_circle_view_matplotlib(c, dt, q, show_time_marker=True, **kwargs) for c, dt, q in cases]
+    mpl_ms = (time.perf_counter() - started) * 1000 / repeats
+
+    # Перший прохід наповнює кеш текстів і стрілок, другий — типовий рендер
+    [render_ring(c, dt, q, show_time_marker=True, **kwargs) for c, dt, q in cases]
+    started = time.perf_counter()
+    fast = [render_ring(c, dt, q, show_time_marker=True, **kwargs) for c, dt, q in cases]
+    fast_ms = (time.perf_counter() - started) * 1000 / repeats
+
+    diffs = [np.abs(to_rgb(a) - to_rgb(b)) for a, b in zip(reference, fast)]
+    mean_diff = float(np.mean([d.mean() for d in diffs]))
+    changed = float(np.mean([(d.max(axis=2) > 32).mean() for d in diffs])) * 100
+    print(f"matplotlib: {mpl_ms:.1f} ms/image, {len(reference[0].getvalue())} bytes")
+    print(f"template:   {fast_ms:.1f} ms/image, {len(fast[0].getvalue())} bytes ({mpl_ms / fast_ms:.1f}x)")
+    print(f"pixel diff: mean {mean_diff:.2f}/255, {changed:.2f}% pixels differ by >32")
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        for name, buf in (("matplotlib.png", reference[0]), ("template.png", fast[0])):
+            with open(os.path.join(out_dir, name), "wb") as f:
+                f.write(buf.getvalue())
+
+
+if __name__ == "__main__":
+    main()
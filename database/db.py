@@ -145,3 +145,37 @@ async def get_users_by_region(region_id: str) -> List[Tuple]:
             FROM users WHERE region_id = ?
         """, (region_id,)) as cursor:
             return await cursor.fetchall()
+
+async def get_subscribed_regions() -> List[str]:
+    """
+    Повертає ID регіонів, у яких є хоча б один користувач.
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute("SELECT DISTINCT region_id FROM users") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+async def get_dynamic_queues(region_id: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """
+    Повертає унікальні (region_id, queue_id, alias) користувачів у режимі dynamic
+    (опціонально лише для одного регіону).
+    """
+    query = "SELECT region_id, queue_id FROM users WHERE display_mode = 'dynamic'"
+    params = ()
+    if region_id is not None:
+        query += " AND region_id = ?"
+        params = (region_id,)
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+    subscriptions = set()
+    for reg_id, q_json in rows:
+        try:
+            queues = json.loads(q_json)
+            if isinstance(queues, list):
+                for q in queues:
+                    subscriptions.add((reg_id, q["id"], q.get("alias", q["id"])))
+            else:
+                subscriptions.add((reg_id, str(q_json), str(q_json)))
+        except:
+            subscriptions.add((reg_id, str(q_json), str(q_json)))
+    return sorted(subscriptions)
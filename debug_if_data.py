@@ -1,7 +1,8 @@
-import aiohttp
 import asyncio
 import json
 import logging
+
+from services.http_pool import HttpPool, read_json
 from datetime import datetime
 
 # Configure logging
@@ -13,12 +14,12 @@ IF_API_URL = "https://be-svitlo.oe.if.ua/schedule-by-queue"
 async def fetch_if_schedule(queue: str):
     url = f"{IF_API_URL}?queue={queue}"
     print(f"Fetching {url}...")
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status != 200:
-                print(f"Error: {resp.status}")
-                return None
-            return await resp.json()
+    session = HttpPool().session()
+    async with session.get(url) as resp:
+        if resp.status != 200:
+            print(f"Error: {resp.status}")
+            return None
+        return await read_json(resp)
 
 def parse_if_schedule(raw_data: list, queue: str):
     parsed = {}
@@ -85,5 +86,11 @@ async def main():
             today = datetime.now().date().isoformat()
             print(f"Today is {today}")
 
+async def run():
+    try:
+        await main()
+    finally:
+        await HttpPool().close()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
@@ -1,8 +1,9 @@
-import aiohttp
 import asyncio
 import json
 import logging
 
+from services.http_pool import HttpPool, read_json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
@@ -10,12 +11,12 @@ IF_QUEUES_URL = "https://be-svitlo.oe.if.ua/gpv-queue-list"
 
 async def fetch_queues():
     print(f"Fetching {IF_QUEUES_URL}...")
-    async with aiohttp.ClientSession() as session:
-        async with session.get(IF_QUEUES_URL) as resp:
-            if resp.status != 200:
-                print(f"Error: {resp.status}")
-                return None
-            return await resp.json()
+    session = HttpPool().session()
+    async with session.get(IF_QUEUES_URL) as resp:
+        if resp.status != 200:
+            print(f"Error: {resp.status}")
+            return None
+        return await read_json(resp)
 
 async def main():
     queues = await fetch_queues()
@@ -40,5 +41,11 @@ async def main():
         else:
             print("❌ Queue 5.2 NOT found in queue list.")
 
+async def run():
+    try:
+        await main()
+    finally:
+        await HttpPool().close()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
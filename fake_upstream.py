@@ -0,0 +1,287 @@
+"""
+Локальний фейковий upstream для офлайн-тестів і бенчмарків.
+Віддає синтетичні дані у форматі проксі DTEK та сайту ІФ з налаштовуваними
+розміром, затримкою, часткою помилок, поведінкою ETag та змінами між запитами.
+
+Запуск: python fake_upstream.py --port 8080 --regions 25 --latency-ms 200 --mutations 3
+Бот: UPSTREAM_BASE_URL=http://127.0.0.1:8080 у .env. Друге джерело для хеджування (бенчмарки):
+TemnoSource(entrypoint=temno_entrypoint(base_url)) — ендпоінт /temno цього сервера.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+from datetime import date, timedelta
+from email.utils import formatdate
+from typing import Optional
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+IF_REGION_CPU = "ivano-frankivska-oblast"
+SLOT_LABELS = [f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 30)]
+
+
+class FakeConfig:
+    def __init__(
+        self,
+        regions: int = 25,
+        queues: int = 12,
+        days: int = 2,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        error_rate: float = 0,
+        etag: str = "strong",
+        max_age: Optional[int] = None,
+        mutations: int = 0,
+        mutate_every: int = 1,
+        temno_latency_ms: Optional[float] = None,
+        seed: int = 42
+    ):
+        self.regions = regions # кількість регіонів (включно з ІФ)
+        self.queues = queues # черг у регіоні
+        self.days = days # дат у графіку кожної черги
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate # частка відповідей 503
+        self.etag = etag # "strong", "weak" або "none" (без ETag та Last-Modified)
+        self.max_age = max_age # Cache-Control: max-age, якщо задано
+        self.mutations = mutations # скільки слотів змінювати
+        self.mutate_every = max(1, mutate_every) # ...на кожному N-му запиті стрічки DTEK
+        self.temno_latency_ms = temno_latency_ms # окрема затримка ендпоінта temno (None — як у решти)
+        self.seed = seed
+
+
+class FakeUpstream:
+    """Стан фейкового сервера: синтетичний графік, версія та лічильники запитів."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self.version = 1
+        self._modified_at = formatdate(usegmt=True)
+        self.stats = {"dtek": 0, "dtek_304": 0, "if_queues": 0, "if_schedule": 0, "temno": 0, "errors": 0, "mutations": 0}
+        today = date.today()
+        self.dates = [(today + timedelta(days=i)).isoformat() for i in range(config.days)]
+        self.queue_ids = [f"{g}.{s}" for g in range(1, 7) for s in range(1, 3)][:config.queues] or ["1.1"]
+        cpus = [IF_REGION_CPU] + [f"region-{i}" for i in range(1, config.regions)]
+        self.regions = {
+            cpu: {q: {d: self._random_day() for d in self.dates} for q in self.queue_ids}
+            for cpu in cpus[:max(1, config.regions)]
+        }
+        self._body_cache: Optional[bytes] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def _random_day(self) -> list[int]:
+        day, status = [], 1
+        for _ in SLOT_LABELS:
+            if self._rng.random() < 0.15:
+                status = 2 if status == 1 else 1
+            day.append(status)
+        return day
+
+    def mutate(self, count: int):
+        """Змінює count випадкових слотів і підіймає версію (новий ETag)."""
+        if count <= 0:
+            return
+        cpus = list(self.regions)
+        for _ in range(count):
+            day = self.regions[self._rng.choice(cpus)][self._rng.choice(self.queue_ids)][self._rng.choice(self.dates)]
+            idx = self._rng.randrange(len(SLOT_LABELS))
+            day[idx] = 1 if day[idx] != 1 else 2
+        self.version += 1
+        self._modified_at = formatdate(usegmt=True)
+        self._body_cache = None
+        self.stats["mutations"] += count
+
+    def feed_body(self) -> bytes:
+        if self._body_cache is None:
+            inner = {
+                "date_today": self.dates[0],
+                "date_tomorrow": self.dates[1] if len(self.dates) > 1 else self.dates[0],
+                "regions": [
+                    {
+                        "cpu": cpu,
+                        "emergency": False,
+                        "schedule": {
+                            q: {d: dict(zip(SLOT_LABELS, day)) for d, day in q_sched.items()}
+                            for q, q_sched in schedule.items()
+                        }
+                    }
+                    for cpu, schedule in self.regions.items()
+                ]
+            }
+            self._body_cache = json.dumps({"body": json.dumps(inner, ensure_ascii=False)}).encode()
+        return self._body_cache
+
+    def if_intervals(self, queue: str) -> list:
+        """Графік черги ІФ у форматі сайту ІФ: інтервали відключень по датах."""
+        result = []
+        for d, day in self.regions[IF_REGION_CPU].get(queue, {}).items():
+            intervals, start = [], None
+            for idx, status in enumerate(day + [1]):
+                if status == 2 and start is None:
+                    start = idx
+                elif status != 2 and start is not None:
+                    intervals.append({"from": SLOT_LABELS[start], "to": _slot_time(idx), "status": 1})
+                    start = None
+            y, m, dd = d.split("-")
+            result.append({"eventDate": f"{dd}.{m}.{y}", "queues": {queue: intervals}})
+        return result
+
+    async def _delay_or_fail(self, base_latency_ms: Optional[float] = None) -> Optional[web.Response]:
+        cfg = self.config
+        base = cfg.latency_ms if base_latency_ms is None else base_latency_ms
+        latency = base + self._rng.uniform(0, cfg.latency_jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+        if cfg.error_rate and self._rng.random() < cfg.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=503, text="upstream unavailable")
+        return None
+
+    def _etag(self) -> Optional[str]:
+        if self.config.etag == "strong":
+            return f'"v{self.version}"'
+        if self.config.etag == "weak":
+            return f'W/"v{self.version}"'
+        return None
+
+    async def handle_dtek(self, request: web.Request) -> web.Response:
+        self.stats["dtek"] += 1
+        if self.config.mutations and self.stats["dtek"] % self.config.mutate_every == 0:
+            self.mutate(self.config.mutations)
+        error = await self._delay_or_fail()
+        if error:
+            return error
+
+        headers = {}
+        etag = self._etag()
+        if etag:
+            headers["ETag"] = etag
+            headers["Last-Modified"] = self._modified_at
+        if self.config.max_age is not None:
+            headers["Cache-Control"] = f"public, max-age={self.config.max_age}"
+
+        cache_bust = "t" in request.query or request.headers.get("Cache-Control") == "no-cache"
+        if etag and not cache_bust and request.headers.get("If-None-Match") == etag:
+            self.stats["dtek_304"] += 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=self.feed_body(), content_type="application/json", headers=headers)
+
+    async def handle_if_queues(self, request: web.Request) -> web.Response:
+        self.stats["if_queues"] += 1
+        error = await self._delay_or_fail()
+        if error:
+            return error
+        return web.json_response([{"code": q} for q in self.queue_ids])
+
+    async def handle_if_schedule(self, request: web.Request) -> web.Response:
+        self.stats["if_schedule"] += 1
+        error = await self._delay_or_fail()
+        if error:
+            return error
+        return web.json_response(self.if_intervals(request.query.get("queue", "")))
+
+    async def handle_temno(self, request: web.Request) -> web.Response:
+        """
+        Графік одного регіону для temno_entrypoint: {"region", "queues": {черга: {дата: {"HH:MM": код}}}}.
+        Це транспорт лише фейкового сервера; справжній temno викликається як функція Python.
+        """
+        self.stats["temno"] += 1
+        error = await self._delay_or_fail(self.config.temno_latency_ms)
+        if error:
+            return error
+        cpu = request.query.get("region", "")
+        schedule = self.regions.get(cpu)
+        if schedule is None:
+            return web.Response(status=404, text="unknown region")
+        queues = {q: {d: dict(zip(SLOT_LABELS, day)) for d, day in q_sched.items()} for q, q_sched in schedule.items()}
+        return web.json_response({"region": cpu, "queues": queues})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, "version": self.version, "feed_bytes": len(self.feed_body())})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/dtek", self.handle_dtek)
+        app.router.add_get("/if/gpv-queue-list", self.handle_if_queues)
+        app.router.add_get("/if/schedule-by-queue", self.handle_if_schedule)
+        app.router.add_get("/temno", self.handle_temno)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускає сервер у поточному циклі подій і повертає базову адресу."""
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def temno_entrypoint(base_url: str):
+    """
+    entrypoint для TemnoSource: async-функція region -> графік регіону з ендпоінта /temno
+    фейкового сервера (None при помилці).
+    """
+    from services.http_pool import HttpPool, read_json
+    url = f"{base_url.rstrip('/')}/temno"
+
+    async def fetch_region_schedule(region: str) -> Optional[dict]:
+        async with HttpPool().session().get(url, params={"region": region}) as resp:
+            if resp.status != 200:
+                _LOGGER.error(f"Fake temno error {resp.status} for region {region}")
+                return None
+            return await read_json(resp)
+
+    return fetch_region_schedule
+
+
+def _slot_time(idx: int) -> str:
+    return "24:00" if idx >= len(SLOT_LABELS) else SLOT_LABELS[idx]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake DTEK/IF upstream for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--regions", type=int, default=25)
+    parser.add_argument("--queues", type=int, default=12)
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--etag", choices=["strong", "weak", "none"], default="strong")
+    parser.add_argument("--max-age", type=int, default=None)
+    parser.add_argument("--mutations", type=int, default=0)
+    parser.add_argument("--mutate-every", type=int, default=1)
+    parser.add_argument("--temno-latency-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    return FakeConfig(
+        regions=args.regions, queues=args.queues, days=args.days,
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate, etag=args.etag, max_age=args.max_age,
+        mutations=args.mutations, mutate_every=args.mutate_every,
+        temno_latency_ms=args.temno_latency_ms, seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    upstream = FakeUpstream(config_from_args(args))
+    _LOGGER.info(f"Fake upstream: {len(upstream.regions)} regions, feed {len(upstream.feed_body()) / 1024:.0f} KB")
+    web.run_app(upstream.create_app(), host=args.host, port=args.port)
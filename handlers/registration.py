@@ -5,10 +5,9 @@ from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import Message, CallbackQuery, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove, BufferedInputFile, InputMediaPhoto
+from aiogram.types import Message, CallbackQuery, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from services.api_client import SvitloApiClient
 from database.db import add_or_update_user, get_user
-from services.image_generator import convert_api_to_half_list
 from datetime import datetime
 from typing import List, Dict, Any
 
@@ -41,7 +40,7 @@ MACRO_GROUPS_KEYWORDS = {
 
 async def get_grouped_regions():
     """Групує всі доступні області з api_client за макрорегіонами."""
-    all_regions = await api_client.get_active_regions()
+    all_regions = await api_client.get_active_regions(allow_stale=True)
     grouped = {group: {} for group in MACRO_GROUPS_KEYWORDS}
     grouped["Інші"] = {}
     
@@ -95,7 +94,7 @@ async def show_regions_for_macro(message: Message, state: FSMContext, macro: str
         grouped = await get_grouped_regions()
         await state.update_data(grouped_regions=grouped)
 
-    all_regions = await api_client.get_active_regions()
+    all_regions = await api_client.get_active_regions(allow_stale=True)
     
     if macro in grouped:
         filtered_regions = grouped[macro]
@@ -125,7 +124,7 @@ async def process_macro_region(message: Message, state: FSMContext):
         grouped = await get_grouped_regions()
         await state.update_data(grouped_regions=grouped)
 
-    all_regions = await api_client.get_active_regions()
+    all_regions = await api_client.get_active_regions(allow_stale=True)
     
     # 1. Перевірка, чи це макрорегіон
     if await show_regions_for_macro(message, state, user_input):
@@ -170,7 +169,7 @@ async def process_region(message: Message, state: FSMContext):
     data = await state.get_data()
     regions = data.get("regions")
     if not regions:
-        regions = await api_client.get_active_regions()
+        regions = await api_client.get_active_regions(allow_stale=True)
         await state.update_data(regions=regions)
     
     # Шукаємо ID регіону за назвою (точний збіг або підрядок)
@@ -243,7 +242,7 @@ async def process_queue(message: Message, state: FSMContext):
     valid_queues = []
     ignored_queues = []
     for q in queue_data:
-        schedule_data = await api_client.fetch_schedule(region_id, q["id"])
+        schedule_data = await api_client.fetch_schedule(region_id, q["id"], allow_stale=True)
         if schedule_data:
             valid_queues.append(q)
         else:
@@ -460,11 +459,15 @@ async def send_schedule(target: Any, tg_id: int):
     Універсальна функція для відправки графіку.
     Використовує ImageCache для classic/list режимів.
     """
-    from services.image_generator import generate_schedule_image, convert_api_to_half_list, get_next_event_info, is_schedule_empty
-    from services.image_cache import ImageCache
+    from services.image_generator import get_next_event_info, is_schedule_empty
+    from services.render_pool import render_schedule_images
+    from services.render_coordinator import RenderCoordinator
+    from services.image_cache import ImageCache, image_cache_key
+    from services.dynamic_prerender import DynamicPrerender
+    from services.telegram_files import send_photos
+    from services.day_grid import EMPTY_DAY, schedule_hash
     from aiogram import Bot
     from aiogram.types import Message
-    import hashlib
     import json
     from database.db import update_user_hash
     
@@ -496,27 +499,38 @@ async def send_schedule(target: Any, tg_id: int):
     img_cache = ImageCache()
     now_dt = datetime.now()
     
+    # Отримуємо назву регіону з REGIONS
+    from services.api_client import REGIONS
+    reg_name = REGIONS.get(region_id, "Unknown Region")
+    # Username бота намальований на зображенні, тому входить у ключ кешу (bot.me() кешує getMe).
+    # target — Message (бот у target.bot) або сам Bot (сповіщення з check_updates)
+    bot = target if isinstance(target, Bot) else getattr(target, "bot", None)
+    bot_username = (await bot.me()).username if bot else None
+    
     for q in queues:
-        schedule_data = await api_client.fetch_schedule(region_id, q["id"])
+        schedule_data = await api_client.fetch_schedule(region_id, q["id"], allow_stale=True)
         if not schedule_data:
             continue
             
         all_schedules[q["id"]] = schedule_data["schedule"]
-        sched_hash = hashlib.md5(json.dumps(schedule_data["schedule"], sort_keys=True).encode()).hexdigest()
+        sched_hash = schedule_hash(schedule_data["schedule"])
         
-        # Спробуємо взяти з кешу (тільки для classic та list)
+        # Спробуємо взяти з кешу (classic та list — на дату рендера; dynamic — на поточний півгодинний слот)
+        if mode == "dynamic":
+            cache_key = DynamicPrerender().cache_key(sched_hash, now_dt, q["alias"], reg_name, bot_username)
+        else:
+            cache_key = image_cache_key(sched_hash, now_dt.date().isoformat(), q["alias"], reg_name, bot_username)
         cached_images = None
         if mode in ["classic", "list"]:
-            cached_images = img_cache.get(region_id, q["id"], mode, sched_hash)
+            cached_images = await img_cache.get(region_id, q["id"], mode, cache_key)
+        elif mode == "dynamic":
+            cached_images = await DynamicPrerender().get(region_id, q["id"], cache_key)
             
         if cached_images:
             images_to_send = cached_images
         else:
-            today_data = schedule_data["schedule"].get(schedule_data["date_today"], {})
-            tomorrow_data = schedule_data["schedule"].get(schedule_data["date_tomorrow"], {})
-            
-            today_half = convert_api_to_half_list(today_data)
-            tomorrow_half = convert_api_to_half_list(tomorrow_data)
+            today_half = schedule_data["schedule"].get(schedule_data["date_today"], EMPTY_DAY).to_half_list()
+            tomorrow_half = schedule_data["schedule"].get(schedule_data["date_tomorrow"], EMPTY_DAY).to_half_list()
             
             # В режимі dynamic ми завжди показуємо 24 години вперед, але якщо завтра порожньо - воно буде сірим
             # В інших режимах приховуємо завтра зовсім, якщо там немає даних
@@ -531,31 +545,31 @@ async def send_schedule(target: Any, tg_id: int):
             # Для інших - ні (вони кешуються без маркера).
             show_marker = (mode == "dynamic")
             
-            # Отримуємо назву регіону з REGIONS
-            from services.api_client import REGIONS
-            reg_name = REGIONS.get(region_id, "Unknown Region")
-            
-            # Отримуємо username бота
-            bot = target.bot if hasattr(target, "bot") else None
-            bot_username = None
-            if bot:
-                bot_info = await bot.get_me()
-                bot_username = bot_info.username
-            
-            images_to_send = generate_schedule_image(
-                today_half, tomorrow_half_for_gen, now_dt, mode, q["alias"], 
-                show_time_marker=show_marker,
-                region_name=reg_name,
-                bot_username=bot_username
-            )
-            
-            # Кешуємо, якщо це не dynamic
-            if mode in ["classic", "list"]:
-                img_cache.set(region_id, q["id"], mode, sched_hash, images_to_send)
+            async def render_and_cache():
+                images = await render_schedule_images(
+                    today_half, tomorrow_half_for_gen, now_dt, mode, q["alias"],
+                    show_time_marker=show_marker,
+                    region_name=reg_name,
+                    bot_username=bot_username
+                )
+
+                # Кешуємо: classic/list — за хешем графіка та датою, dynamic — до кінця півгодинного слоту
+                if mode in ["classic", "list"]:
+                    await img_cache.set(region_id, q["id"], mode, cache_key, images)
+                elif mode == "dynamic":
+                    await DynamicPrerender().set(region_id, q["id"], cache_key, images)
+                return images
+
+            # Ключ як у кешу: одночасні запити тієї самої черги чекають один рендер.
+            # Між промахом кешу вище та цим викликом немає await, тож готовий результат не пропускається
+            render_key = cache_key
+            if mode == "dynamic" and not DynamicPrerender().cacheable:
+                render_key += f"|{now_dt.strftime('%H:%M')}"
+            images_to_send = await RenderCoordinator().render((region_id, q["id"], mode, render_key), render_and_cache)
 
         # Формуємо текстовий прогноз
-        today_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_today"], {}))
-        tomorrow_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_tomorrow"], {}))
+        today_half = schedule_data["schedule"].get(schedule_data["date_today"], EMPTY_DAY).to_half_list()
+        tomorrow_half = schedule_data["schedule"].get(schedule_data["date_tomorrow"], EMPTY_DAY).to_half_list()
         forecast_text = get_next_event_info(today_half, tomorrow_half, now_dt)
         
         # Додаємо повідомлення про відсутність графіку на завтра
@@ -565,41 +579,22 @@ async def send_schedule(target: Any, tg_id: int):
         # Додаємо час запиту в підпис
         timestamp_str = now_dt.strftime("%H:%M")
         
-        queue_media = []
-        for i, img_buf in enumerate(images_to_send):
-            photo = BufferedInputFile(img_buf.getvalue(), filename=f"schedule_{q['id']}_{i}.png")
-            # Додаємо підпис тільки до першого фото кожної черги
-            caption = f"📍 **{q['alias']}**\n{forecast_text}\n\n🕒 _Запитано о {timestamp_str}_" if i == 0 else None
-            queue_media.append(InputMediaPhoto(media=photo, caption=caption, parse_mode="Markdown"))
-        
-        if not queue_media:
+        if not images_to_send:
             continue
 
-        # Надсилаємо розклад для цієї черги
-        if hasattr(target, "answer_photo"):
-            if len(queue_media) > 1:
-                await target.answer_media_group(queue_media)
-            else:
-                await target.answer_photo(
-                    queue_media[0].media,
-                    caption=queue_media[0].caption,
-                    parse_mode="Markdown"
-                )
-        elif hasattr(target, "send_photo"):
-            if len(queue_media) > 1:
-                await target.send_media_group(tg_id, queue_media)
-            else:
-                await target.send_photo(
-                    tg_id,
-                    queue_media[0].media,
-                    caption=queue_media[0].caption,
-                    parse_mode="Markdown"
-                )
+        # Надсилаємо розклад для цієї черги; вже завантажені зображення йдуть за file_id
+        if hasattr(target, "answer_photo") or hasattr(target, "send_photo"):
+            caption = f"📍 **{q['alias']}**\n{forecast_text}\n\n🕒 _Запитано о {timestamp_str}_"
+            await send_photos(
+                target, tg_id,
+                images_to_send,
+                caption=caption,
+                filename=f"schedule_{q['id']}"
+            )
 
     # Оновлюємо хеш користувача
     if all_schedules:
-        sched_str = json.dumps(all_schedules, sort_keys=True)
-        new_hash = hashlib.md5(sched_str.encode()).hexdigest()
+        new_hash = schedule_hash(all_schedules)
         await update_user_hash(tg_id, new_hash)
     else:
         if hasattr(target, "answer"):
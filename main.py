@@ -1,19 +1,12 @@
 import asyncio
 import logging
-import hashlib
 import json
 import os
-import aiohttp
+from functools import partial
 from dotenv import load_dotenv
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import datetime
 
-from database.db import init_db, get_all_users, update_user_hash
-from services.api_client import SvitloApiClient
-from handlers.registration import send_schedule
-from handlers import registration
+from services import startup_report
 
 # Налаштування логування
 logging.basicConfig(
@@ -29,23 +22,60 @@ _LOGGER.info(f"Loading environment variables from: {env_path}")
 loaded = load_dotenv(env_path)
 _LOGGER.info(f"load_dotenv() result: {loaded}")
 
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-CHECK_INTERVAL_STR = os.getenv("CHECK_INTERVAL", "10")
-CHECK_INTERVAL = int(CHECK_INTERVAL_STR)
 
-if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
-    _LOGGER.error(f"BOT_TOKEN is invalid or missing! Value: {repr(BOT_TOKEN)}")
-    exit(1)
+def _data_path(value: str) -> str:
+    """Відносні шляхи з .env рахуються від теки бота, а не від поточної теки процесу."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), value) if value else value
 
-_LOGGER.info(f"Bot token loaded (starts with: {str(BOT_TOKEN)[:5]}...)")
 
-bot = Bot(token=BOT_TOKEN)
-dp = Dispatcher(storage=MemoryStorage())
-scheduler = AsyncIOScheduler()
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+CHECK_INTERVAL_STR = os.getenv("CHECK_INTERVAL", "10")
+CHECK_INTERVAL = int(CHECK_INTERVAL_STR)
+IF_CONCURRENCY = int(os.getenv("IF_CONCURRENCY", "4"))
+IF_QUEUE_TIMEOUT = float(os.getenv("IF_QUEUE_TIMEOUT", "15"))
+IF_REFRESH_TIMEOUT = float(os.getenv("IF_REFRESH_TIMEOUT", "45"))
+SNAPSHOT_HISTORY = int(os.getenv("SNAPSHOT_HISTORY", "4"))
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "0") == "1"
+FEED_CACHE_BUST = os.getenv("FEED_CACHE_BUST", "0") == "1"
+FEED_SKIP_UNSUBSCRIBED = os.getenv("FEED_SKIP_UNSUBSCRIBED", "0") == "1"
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "2"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", str(CHECK_INTERVAL * 3)))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "300"))
+UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL", "")
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "30"))
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_MAX_RESPONSE_MB = float(os.getenv("HTTP_MAX_RESPONSE_MB", "16"))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_MAX_TASKS_PER_CHILD = int(os.getenv("RENDER_MAX_TASKS_PER_CHILD", "200"))
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", "16"))
+IMAGE_CACHE_MB = float(os.getenv("IMAGE_CACHE_MB", "64"))
+IMAGE_CACHE_TTL = float(os.getenv("IMAGE_CACHE_TTL", "0"))
+IMAGE_DISK_CACHE_DIR = os.getenv("IMAGE_DISK_CACHE_DIR", os.path.join(os.path.dirname(__file__), "database", "image_cache"))
+IMAGE_DISK_CACHE_MB = float(os.getenv("IMAGE_DISK_CACHE_MB", "256"))
+IMAGE_INVALIDATE_CHANGED_ONLY = os.getenv("IMAGE_INVALIDATE_CHANGED_ONLY", "1") == "1"
+DYNAMIC_PRERENDER = os.getenv("DYNAMIC_PRERENDER", "1") == "1"
+DYNAMIC_LIVE_MARKER = os.getenv("DYNAMIC_LIVE_MARKER", "0") == "1"
+API_STATE_PATH = _data_path(os.getenv("API_STATE_PATH", os.path.join("database", "api_state.json.gz")))
 
-# Глобальні об'єкти, що ініціалізуються в main()
+# Глобальні об'єкти, що ініціалізуються в main().
+# Воркери пулу рендерів імпортують main.py заново (як __mp_main__), тому на рівні модуля
+# лише налаштування: бот, пули, клієнт API (з метаданими регіонів) та обробники
+# імпортуються і створюються тільки в main(), а воркер виконує лише код рендерерів
+http_pool = None
+bot = None
+render_pool = None
+dynamic_prerender = None
+render_coordinator = None
+dp = None
+scheduler = None
+image_cache = None
 api_client = None
 session = None
+poller = None
 
 def is_change_relevant(old_sched: dict, new_sched: dict, mode: str, current_dt: datetime) -> bool:
     """
@@ -58,72 +88,73 @@ def is_change_relevant(old_sched: dict, new_sched: dict, mode: str, current_dt:
     if old_sched.get("is_emergency") != new_sched.get("is_emergency"):
         return True
 
-    from services.image_generator import convert_api_to_half_list
+    from services.day_grid import UNKNOWN_CODES
     
     new_date_today = new_sched["date_today"]
     new_date_tomorrow = new_sched["date_tomorrow"]
     
-    def get_sched_for_date(sched_obj, date_str):
-        """Допоміжна функція для отримання графіку за конкретну дату."""
-        if sched_obj.get("date_today") == date_str:
-            return convert_api_to_half_list(sched_obj["schedule"].get(date_str, {}))
-        if sched_obj.get("date_tomorrow") == date_str:
-            return convert_api_to_half_list(sched_obj["schedule"].get(date_str, {}))
-        return ["unknown"] * 48
-
-    old_for_new_today = get_sched_for_date(old_sched, new_date_today)
-    new_for_new_today = get_sched_for_date(new_sched, new_date_today)
+    def get_codes_for_date(sched_obj, date_str) -> bytes:
+        """
+        Допоміжна функція для отримання 48 нормалізованих кодів за конкретну дату
+        (0 - невідомо, 1..3 - відомий статус).
+        """
+        if date_str in (sched_obj.get("date_today"), sched_obj.get("date_tomorrow")):
+            day_grid = sched_obj["schedule"].get(date_str)
+            if day_grid is not None:
+                return day_grid.codes()
+        return UNKNOWN_CODES
+
+    old_for_new_today = get_codes_for_date(old_sched, new_date_today)
+    new_for_new_today = get_codes_for_date(new_sched, new_date_today)
     
-    old_for_new_tomorrow = get_sched_for_date(old_sched, new_date_tomorrow)
-    new_for_new_tomorrow = get_sched_for_date(new_sched, new_date_tomorrow)
+    old_for_new_tomorrow = get_codes_for_date(old_sched, new_date_tomorrow)
+    new_for_new_tomorrow = get_codes_for_date(new_sched, new_date_tomorrow)
     
     current_idx = current_dt.hour * 2 + (1 if current_dt.minute >= 30 else 0)
-    
-    def filter_unknown(sched):
-        """Замінює 'unknown' на None для коректного порівняння."""
-        return [None if s == "unknown" else s for s in sched]
 
     if mode == "dynamic":
         # Для "Прогнозу" релевантні зміни від зараз до кінця дня сьогодні
         # ТА від початку дня до зараз завтра (це те, що потрапляє в 24-годинне коло).
-        relevant_old = filter_unknown(old_for_new_today[current_idx:] + old_for_new_tomorrow[:current_idx])
-        relevant_new = filter_unknown(new_for_new_today[current_idx:] + new_for_new_tomorrow[:current_idx])
-        
-        # Ми вважаємо зміну релевантною, якщо:
-        # 1. Новий статус відомий (не None)
-        # 2. Він відрізняється від старого статусу (навіть якщо старий був None)
-        for o, n in zip(relevant_old, relevant_new):
-            if n is not None and n != o:
-                return True
-        return False
+        relevant_old = old_for_new_today[current_idx:] + old_for_new_tomorrow[:current_idx]
+        relevant_new = new_for_new_today[current_idx:] + new_for_new_tomorrow[:current_idx]
     else:
         # Для classic та list релевантні зміни від зараз до кінця дня сьогодні
         # ТА весь день завтра (оскільки користувач може перемикати вкладки).
-        relevant_old = filter_unknown(old_for_new_today[current_idx:] + old_for_new_tomorrow)
-        relevant_new = filter_unknown(new_for_new_today[current_idx:] + new_for_new_tomorrow)
-        
-        for o, n in zip(relevant_old, relevant_new):
-            if n is not None and n != o:
-                return True
+        relevant_old = old_for_new_today[current_idx:] + old_for_new_tomorrow
+        relevant_new = new_for_new_today[current_idx:] + new_for_new_tomorrow
+
+    if relevant_old == relevant_new:
         return False
+    # Ми вважаємо зміну релевантною, якщо:
+    # 1. Новий статус відомий (не 0)
+    # 2. Він відрізняється від старого статусу (навіть якщо старий був невідомий)
+    for o, n in zip(relevant_old, relevant_new):
+        if n and n != o:
+            return True
+    return False
 
-async def check_updates():
+async def check_updates() -> str:
     """
     Періодична перевірка оновлень розкладу.
     Оптимізовано: спочатку перевіряємо змінені регіони, потім сповіщаємо користувачів.
+    Повертає результат для адаптивного планувальника: CHANGED, QUIET або ERROR.
     """
-    from database.db import get_users_by_region, get_unique_queues_by_region
-    from services.image_cache import ImageCache
-    from services.image_generator import generate_schedule_image, convert_api_to_half_list
+    from database.db import get_users_by_region, get_unique_queues_by_region, get_subscribed_regions, get_dynamic_queues, update_user_hash
+    from services.image_cache import ImageCache, image_cache_key
+    from services.day_grid import EMPTY_DAY, schedule_hash
     from services.api_client import REGIONS, API_REGION_MAP
+    from services.render_pool import render_schedule_images
+    from services.poller import CHANGED, QUIET, ERROR
+    from handlers.registration import send_schedule
     
     _LOGGER.info("Checking for updates...")
+    api_client.set_subscribed_regions(await get_subscribed_regions())
     await api_client._refresh_cache()
     changed_region_cpus = api_client.get_changed_regions(reset=True)
     
     if not changed_region_cpus:
         _LOGGER.info("No regions changed.")
-        return
+        return QUIET if api_client.last_refresh_ok else ERROR
 
     bot_info = await bot.get_me()
     bot_username = bot_info.username
@@ -142,39 +173,70 @@ async def check_updates():
         _LOGGER.info(f"Region '{region_id}' changed. Processing updates...")
         
         # 1. Очищуємо старий кеш зображень для цього регіону
-        img_cache.clear_region(region_id)
+        # (або лише черг, чий графік змінився — див. clear_queue нижче)
+        if not IMAGE_INVALIDATE_CHANGED_ONLY:
+            img_cache.clear_region(region_id)
         
         # 2. Знаходимо всі унікальні черги в цьому регіоні
         unique_queues = await get_unique_queues_by_region(region_id)
         _LOGGER.info(f"Pre-generating images for {len(unique_queues)} queues in {region_id}")
         
+        # Дата рендера намальована на зображенні, тому одна на весь регіон і входить у ключ кешу
+        now_dt = datetime.now()
+        region_name = REGIONS.get(region_id)
+
+        async def pre_render(q_id, mode, cache_key, today_half, tomorrow_half_for_gen):
+            # Для кешу генеруємо БЕЗ часової відмітки
+            images = await render_schedule_images(
+                today_half, tomorrow_half_for_gen, now_dt, mode, q_id,
+                show_time_marker=False,
+                region_name=region_name,
+                bot_username=bot_username
+            )
+            await img_cache.set(region_id, q_id, mode, cache_key, images)
+            return images
+
         # 3. Попередньо генеруємо зображення для всіх черг (classic та list)
         # Це робиться один раз на регіон, а не для кожного користувача
+        render_jobs = []
         for q_id in unique_queues:
             schedule_data = await api_client.fetch_schedule(region_id, q_id)
             if not schedule_data: continue
             
-            today_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_today"], {}))
-            tomorrow_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_tomorrow"], {}))
+            today_half = schedule_data["schedule"].get(schedule_data["date_today"], EMPTY_DAY).to_half_list()
+            tomorrow_half = schedule_data["schedule"].get(schedule_data["date_tomorrow"], EMPTY_DAY).to_half_list()
             
             # Хеш розкладу для ключа кешу
-            sched_hash = hashlib.md5(json.dumps(schedule_data["schedule"], sort_keys=True).encode()).hexdigest()
+            sched_hash = schedule_hash(schedule_data["schedule"])
+            if IMAGE_INVALIDATE_CHANGED_ONLY:
+                img_cache.clear_queue(region_id, q_id, keep_hash=sched_hash)
             
             from services.image_generator import is_schedule_empty
             tomorrow_is_empty = is_schedule_empty(tomorrow_half)
 
+            # Назва черги на зображенні — її номер (як у користувачів без власної назви)
+            cache_key = image_cache_key(sched_hash, now_dt.date().isoformat(), q_id, region_name, bot_username)
             for mode in ["classic", "list"]:
+                # Графік черги не змінився — зображення вже в кеші
+                if img_cache.has(region_id, q_id, mode, cache_key):
+                    continue
                 # Приховуємо завтра, якщо воно порожнє
                 tomorrow_half_for_gen = [] if tomorrow_is_empty else tomorrow_half
                 
-                # Для кешу генеруємо БЕЗ часової відмітки
-                images = generate_schedule_image(
-                    today_half, tomorrow_half_for_gen, datetime.now(), mode, q_id, 
-                    show_time_marker=False,
-                    region_name=REGIONS.get(region_id),
-                    bot_username=bot_username
-                )
-                img_cache.set(region_id, q_id, mode, sched_hash, images)
+                # Якщо цю ж чергу вже рендерить запит користувача — чекаємо його результат
+                render_jobs.append(((q_id, mode), render_coordinator.render(
+                    (region_id, q_id, mode, cache_key),
+                    partial(pre_render, q_id, mode, cache_key, today_half, tomorrow_half_for_gen)
+                )))
+
+        # Рендер у пулі процесів паралельно; черга пулу обмежена, тож решта просто чекає
+        results = await asyncio.gather(*(job for _, job in render_jobs), return_exceptions=True)
+        for ((q_id, mode), _), images in zip(render_jobs, results):
+            if isinstance(images, BaseException):
+                _LOGGER.error(f"Failed to pre-render {mode} image for {region_id}/{q_id}: {images!r}")
+
+        # Зображення dynamic на поточний слот для користувачів цього регіону
+        await dynamic_prerender.prerender(api_client, await get_dynamic_queues(region_id), bot_username)
 
         # 4. Сповіщаємо користувачів цього регіону
         users = await get_users_by_region(region_id)
@@ -198,7 +260,7 @@ async def check_updates():
                     user_schedules[q["id"]] = s_data["schedule"]
             if not user_schedules: continue
             
-            new_hash = hashlib.md5(json.dumps(user_schedules, sort_keys=True).encode()).hexdigest()
+            new_hash = schedule_hash(user_schedules)
             
             if new_hash != last_hash:
                 # Перевірка релевантності змін
@@ -208,13 +270,10 @@ async def check_updates():
                     old_s = await api_client.get_old_schedule(region_id, q["id"])
                     new_s = await api_client.fetch_schedule(region_id, q["id"])
                     
-                    # Якщо старий розклад недоступний або ідентичний новому (через перезапис кешу),
-                    # а хеш змінився - значить зміни були, але ми втратили "попередній" стан.
-                    # В такому випадку вважаємо зміни релевантними.
+                    # Старий розклад береться з версії знімка, актуальної під час попередньої
+                    # перевірки, тому однаковий розклад означає, що ця черга не змінилася.
                     if old_s and new_s and old_s["schedule"] == new_s["schedule"]:
-                        _LOGGER.warning(f"Old schedule lost (cache overwritten) for user {tg_id}, assuming change is relevant.")
-                        is_relevant = True
-                        break
+                        continue
                         
                     if new_s and is_change_relevant(old_s, new_s, mode, now_dt):
                         is_relevant = True
@@ -245,15 +304,88 @@ async def check_updates():
                 # Завжди оновлюємо хеш, навіть якщо це перший запуск
                 await update_user_hash(tg_id, new_hash)
 
+    return CHANGED
+
+async def prerender_dynamic_slot():
+    """На межі кожної півгодини рендерить «Прогноз (24 год)» для всіх користувачів режиму dynamic."""
+    from database.db import get_dynamic_queues
+
+    bot_info = await bot.get_me()
+    await dynamic_prerender.prerender(api_client, await get_dynamic_queues(), bot_info.username, new_slot=True)
+
 async def main():
-    global api_client, session
+    global http_pool, bot, render_pool, dynamic_prerender, render_coordinator, dp, scheduler
+    global image_cache, api_client, session, poller
+
+    from aiogram import Bot, Dispatcher
+    from aiogram.fsm.storage.memory import MemoryStorage
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from database.db import init_db
+    from services.api_client import SvitloApiClient, REGION_META
+    from services.http_pool import HttpPool, SharedAiohttpSession
+    from services.render_pool import RenderPool
+    from services.render_coordinator import RenderCoordinator
+    from services.image_cache import ImageCache
+    from services.dynamic_prerender import DynamicPrerender
+    from services.telegram_files import TelegramFileCache
+    from services.sources import SourceProvider
+    from services.poller import AdaptivePoller
+    from handlers import registration
+    startup_report.mark("imports")
+
+    # Один пул з'єднань для upstream-джерел і Telegram
+    http_pool = HttpPool(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        dns_ttl=HTTP_DNS_TTL,
+        timeout=HTTP_TIMEOUT,
+        max_response_bytes=int(HTTP_MAX_RESPONSE_MB * 1024 * 1024)
+    )
+    bot = Bot(token=BOT_TOKEN, session=SharedAiohttpSession(http_pool))
+    # Рендер графіків у окремих процесах, щоб matplotlib не блокував цикл подій
+    render_pool = RenderPool(
+        workers=RENDER_WORKERS,
+        max_tasks_per_child=RENDER_MAX_TASKS_PER_CHILD,
+        max_queue=RENDER_MAX_QUEUE
+    )
+    dynamic_prerender = DynamicPrerender(enabled=DYNAMIC_PRERENDER, live_marker=DYNAMIC_LIVE_MARKER)
+    render_coordinator = RenderCoordinator()
+    dp = Dispatcher(storage=MemoryStorage())
+    scheduler = AsyncIOScheduler()
+
+    # Кеш зображень з обмеженням пам'яті; має бути налаштований до першого використання
+    image_cache = ImageCache(
+        max_bytes=int(IMAGE_CACHE_MB * 1024 * 1024),
+        ttl=IMAGE_CACHE_TTL or None,
+        disk_path=IMAGE_DISK_CACHE_DIR or None,
+        disk_max_bytes=int(IMAGE_DISK_CACHE_MB * 1024 * 1024)
+    )
     
     # Ініціалізація БД
     await init_db()
+    startup_report.mark("db")
     
     # Ініціалізація мережевої сесії та клієнта
-    session = aiohttp.ClientSession()
-    api_client = SvitloApiClient(session=session, cache_ttl=CHECK_INTERVAL * 60)
+    session = http_pool.session()
+    api_client = SvitloApiClient(
+        session=session,
+        cache_ttl=CHECK_INTERVAL * 60,
+        if_concurrency=IF_CONCURRENCY,
+        if_queue_timeout=IF_QUEUE_TIMEOUT,
+        if_refresh_timeout=IF_REFRESH_TIMEOUT,
+        history_size=SNAPSHOT_HISTORY,
+        stale_while_revalidate=STALE_WHILE_REVALIDATE,
+        state_path=API_STATE_PATH or None,
+        cache_bust=FEED_CACHE_BUST,
+        skip_unsubscribed=FEED_SKIP_UNSUBSCRIBED,
+        breaker_threshold=BREAKER_FAILURES,
+        breaker_reset_timeout=BREAKER_RESET_TIMEOUT,
+        source=SourceProvider.local(UPSTREAM_BASE_URL) if UPSTREAM_BASE_URL else None
+    )
+    # Теплий старт: відновлюємо останній знімок, щоб не перемальовувати все заново
+    api_client.load_state()
+    startup_report.mark("api_client")
     
     # Реєстрація роутерів
     dp.include_router(registration.router)
@@ -286,26 +418,58 @@ async def main():
         _LOGGER.error(f"Unhandled exception: {exception}", exc_info=True)
         return False
     
-    # Налаштування планувальника
-    _LOGGER.info(f"Starting scheduler with interval {CHECK_INTERVAL} minutes (aligned to absolute time)")
-    scheduler.add_job(check_updates, "cron", minute=f"*/{CHECK_INTERVAL}")
+    # Налаштування планувальника: перевірка оновлень має адаптивний інтервал
+    _LOGGER.info(
+        f"Starting adaptive poller: base {CHECK_INTERVAL} min, "
+        f"range {POLL_MIN_INTERVAL}-{POLL_MAX_INTERVAL} min"
+    )
+    poller = AdaptivePoller(
+        check_updates,
+        base_interval=CHECK_INTERVAL * 60,
+        min_interval=POLL_MIN_INTERVAL * 60,
+        max_interval=POLL_MAX_INTERVAL * 60,
+        describe=lambda: (
+            f"sources={api_client.get_source_health()}, http={http_pool.get_stats()}, "
+            f"render={render_pool.get_stats()}, single_flight={render_coordinator.get_stats()}, "
+            f"dynamic={dynamic_prerender.get_stats()}, "
+            f"tg_files={TelegramFileCache().get_stats()}, images={image_cache.get_stats(detailed=False)}"
+        )
+    )
     
     from services.reminder_service import check_reminders
     scheduler.add_job(check_reminders, "interval", minutes=1, args=[bot, api_client])
+    if dynamic_prerender.cacheable:
+        # Секунда запасу, щоб datetime.now() гарантовано був уже в новому слоті
+        scheduler.add_job(prerender_dynamic_slot, "cron", minute="0,30", second=1)
     
     scheduler.start()
     
     # Негайна перевірка при старті
     _LOGGER.info("Performing initial update check on startup...")
-    await check_updates()
+    first_delay = await poller.run_once()
+    startup_report.mark("first_poll")
+    startup_report.report({"region_meta": REGION_META["source"], "region_meta_ms": REGION_META["load_ms"]})
+    poller.start(initial_delay=first_delay)
+    if dynamic_prerender.cacheable:
+        # Перший слот — одразу у фоні, не затримуючи старт бота
+        scheduler.add_job(prerender_dynamic_slot)
     
     _LOGGER.info("Starting bot polling...")
     try:
         await dp.start_polling(bot)
     finally:
-        await session.close()
+        await poller.stop()
+        await api_client.close()
+        await http_pool.close()
+        await image_cache.close()
+        render_pool.shutdown()
 
 if __name__ == "__main__":
+    if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
+        _LOGGER.error(f"BOT_TOKEN is invalid or missing! Value: {repr(BOT_TOKEN)}")
+        exit(1)
+
+    _LOGGER.info(f"Bot token loaded (starts with: {str(BOT_TOKEN)[:5]}...)")
     try:
         asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
@@ -1,75 +1,41 @@
 import aiohttp
-import json
+import asyncio
 import logging
-import sys
-import os
 import time
+from collections import deque
 from datetime import datetime
 from typing import Any, Optional, Dict
 
+from services import snapshot_store
+from services.circuit_breaker import CircuitBreaker
+from services.http_pool import HttpPool
+from services.latency import LatencyTracker
+from services.region_meta import load_region_metadata
+from services.day_grid import DayGrid, EMPTY_DAY, merge_schedules, merge_schedules_batch, reconcile_schedules, schedule_hash, pack_payload, unpack_payload
+from services.schedule_snapshot import ScheduleSnapshot
+from services.sources import SourceProvider
+from services.temno_source import TemnoSource
+
 _LOGGER = logging.getLogger(__name__)
 
-# Додаємо шлях до папки svitlo_live
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-REPO_ROOT = os.path.dirname(CURRENT_DIR)
-CONST_PATH = os.path.join(REPO_ROOT, "external", "svitlo_live", "custom_components", "svitlo_live", "const.py")
-
-def load_const_directly():
-    """Завантажує константи безпосередньо з файлу, уникаючи імпорту __init__.py та HA залежностей."""
-    import importlib.util
-    import types
-    
-    # Надійне мокування homeassistant
-    for mod_name in ['homeassistant', 'homeassistant.const', 'homeassistant.core', 'homeassistant.helpers']:
-        if mod_name not in sys.modules:
-            m = types.ModuleType(mod_name)
-            if mod_name == 'homeassistant': m.__path__ = []
-            sys.modules[mod_name] = m
-    
-    # Додаємо Platform у homeassistant.const
-    sys.modules['homeassistant.const'].Platform = types.SimpleNamespace(
-        SENSOR="sensor", BINARY_SENSOR="binary_sensor", CALENDAR="calendar"
-    )
-
-    try:
-        if not os.path.exists(CONST_PATH):
-            # Спробуємо знайти в поточному каталозі (якщо запущено з кореня)
-            alt_path = os.path.join(os.getcwd(), "external", "svitlo_live", "custom_components", "svitlo_live", "const.py")
-            if os.path.exists(alt_path):
-                path = alt_path
-            else:
-                _LOGGER.error(f"File not found: {CONST_PATH}")
-                return None
-        else:
-            path = CONST_PATH
-            
-        spec = importlib.util.spec_from_file_location("svitlo_live_const_temp", path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
-    except Exception as e:
-        _LOGGER.error(f"Failed to load const directly from {CONST_PATH}: {e}")
-        import traceback
-        _LOGGER.debug(traceback.format_exc())
-        return None
-
-const_module = load_const_directly()
-
-if const_module:
-    DTEK_API_URL = getattr(const_module, "DTEK_API_URL", "https://dtek-api.svitlo-proxy.workers.dev/")
-    REGIONS = getattr(const_module, "REGIONS", {"ivano-frankivska-oblast": "Івано-Франківська область"})
-    API_REGION_MAP = getattr(const_module, "API_REGION_MAP", {})
-    _LOGGER.info(f"Successfully loaded {len(REGIONS)} regions from {CONST_PATH}")
-else:
+# Метадані регіонів з external/svitlo_live (через кеш, щоб не виконувати const.py на кожному старті)
+REGION_META = load_region_metadata()
+DTEK_API_URL = REGION_META["dtek_api_url"]
+REGIONS = REGION_META["regions"]
+API_REGION_MAP = REGION_META["api_region_map"]
+
+if REGION_META["source"] == "fallback":
     _LOGGER.warning("Using fallback values for REGIONS")
-    DTEK_API_URL = "https://dtek-api.svitlo-proxy.workers.dev/"
-    REGIONS = {"ivano-frankivska-oblast": "Івано-Франківська область"}
-    API_REGION_MAP = {}
+else:
+    _LOGGER.info(f"Loaded {len(REGIONS)} regions from {REGION_META['source']} in {REGION_META['load_ms']}ms")
 
 IF_API_URL = "https://be-svitlo.oe.if.ua/schedule-by-queue"
 IF_QUEUES_URL = "https://be-svitlo.oe.if.ua/gpv-queue-list"
 IF_REGION_ID = "ivano-frankivska-oblast"
 
+# Скільки вимірів затримки потрібно, щоб підлаштовувати хеджування під статистику
+HEDGE_MIN_SAMPLES = 5
+
 _instance = None
 
 class SvitloApiClient:
@@ -80,257 +46,537 @@ class SvitloApiClient:
             _instance._initialized = False
         return _instance
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None, cache_ttl: int = 60):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache_ttl: int = 60,
+        if_concurrency: int = 4,
+        if_queue_timeout: float = 15,
+        if_refresh_timeout: float = 45,
+        history_size: int = 4,
+        stale_while_revalidate: bool = False,
+        state_path: Optional[str] = None,
+        cache_bust: bool = False,
+        skip_unsubscribed: bool = False,
+        breaker_threshold: int = 3,
+        breaker_reset_timeout: float = 300,
+        source: Optional[SourceProvider] = None,
+        secondary_source: Optional[TemnoSource] = None,
+        hedge_delay: float = 2.0
+    ):
         if self._initialized:
             if session: self._session = session
             return
         self._session = session
-        self._cached_data = None
-        self._old_cached_data = None
+        # Джерела (запит, валідація, декодування); за замовчуванням — живі DTEK-проксі та сайт ІФ
+        self._source = source or SourceProvider(DTEK_API_URL, IF_API_URL, IF_QUEUES_URL)
+        self._if_concurrency = max(1, if_concurrency)
+        self._if_queue_timeout = if_queue_timeout # секунди на одну чергу ІФ
+        self._if_refresh_timeout = if_refresh_timeout # секунди на весь прохід по чергах ІФ
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        self._old_snapshot: Optional[ScheduleSnapshot] = None
+        # Кільце попередніх версій знімка (незмінні, спільні незмінені регіони)
+        self._history: deque[ScheduleSnapshot] = deque(maxlen=max(1, history_size))
+        self._baseline_version: Optional[int] = None # версія на момент останнього reset змін
+        self._active_regions = None # (snapshot, відфільтровані регіони)
         self._last_fetch_time = 0
         self._cache_ttl = cache_ttl # seconds
+        self._refresh_task: Optional[asyncio.Task] = None # поточне оновлення (single-flight)
+        self._stale_while_revalidate = stale_while_revalidate
         self._etag = None
+        self._last_modified = None
+        self._fresh_until = 0 # до цього часу відповідь основного API свіжа за Cache-Control
+        self._cache_bust = cache_bust # примусово оминати кеш проксі (?t= та no-cache)
+        self._feed_stats = {
+            "responses_200": 0,
+            "responses_304": 0,
+            "responses_error": 0,
+            "skipped_fresh": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0
+        }
+        self._last_body_size = 0
+        self._decode_metrics = {}
+        # Набір CPU регіонів з підписниками; None — розбирати всі регіони
+        self._skip_unsubscribed = skip_unsubscribed
+        self._region_filter: Optional[set] = None
+        self._state_path = state_path # файл для теплого перезапуску (None — не зберігати)
+        # Запобіжники окремо для проксі DTEK та сайту ІФ
+        self._breakers = {
+            "dtek": CircuitBreaker("dtek", breaker_threshold, breaker_reset_timeout),
+            "if": CircuitBreaker("if", breaker_threshold, breaker_reset_timeout),
+            "temno": CircuitBreaker("temno", breaker_threshold, breaker_reset_timeout)
+        }
+        # Друге джерело (temno) для хеджованих запитів по регіонах, які воно покриває
+        self._secondary = secondary_source
+        self._hedge_delay = hedge_delay # максимальна затримка перед хеджованим запитом, секунди
+        self._latency = {"dtek": LatencyTracker(), "temno": LatencyTracker()}
+        self._hedge_stats = {"hedged": 0, "primary_wins": 0, "secondary_wins": 0, "conflict_slots": 0}
+        self._pending_primary: Optional[asyncio.Task] = None # запит до DTEK, що програв хеджування
+        self._background_tasks: set[asyncio.Task] = set() # фонові оновлення, які треба завершити в close()
+        self._secondary_results = {} # cpu -> (графік з temno, час отримання)
+        # cpu -> регіон у вигляді основного API, до поєднання з temno: знімок містить уже поєднаний
+        # графік, тож звіряти temno (і об'єднувати нові дані DTEK) треба з цим «сирим» видом
+        self._primary_regions: Dict[str, dict] = {}
+        self._primary_fetched_at = 0.0 # коли основне API востаннє підтвердило дані
+        self._last_refresh_ok = True # чи вдалося останнє оновлення з основного API
         self._region_hashes = {} # region_cpu -> hash
         self._pending_changes = set() # region_cpu
         self._initialized = True
 
-    async def fetch_schedule(self, region: str, queue: str) -> Optional[dict[str, Any]]:
+    async def fetch_schedule(self, region: str, queue: str, allow_stale: bool = False) -> Optional[dict[str, Any]]:
         """
         Отримує розклад для вказаної черги. Використовує кеш, якщо він актуальний.
+        allow_stale=True дозволяє (в режимі stale-while-revalidate) одразу віддати
+        поточний знімок, поки оновлення йде у фоні.
         """
-        now = time.time()
-        # Перевірка зміни дня
-        last_fetch_dt = datetime.fromtimestamp(self._last_fetch_time) if self._last_fetch_time else None
-        day_changed = last_fetch_dt and last_fetch_dt.date() != datetime.now().date()
-        
-        # Якщо кеш застарів АБО змінився день, пробуємо оновити
-        if not self._cached_data or (now - self._last_fetch_time) > self._cache_ttl or day_changed:
-            await self._refresh_cache()
+        await self._ensure_fresh(check_day=True, allow_stale=allow_stale)
             
-        if not self._cached_data:
+        if not self._snapshot:
             return None
             
         api_region_key = API_REGION_MAP.get(region, region)
-        regions_list = self._cached_data.get("regions", [])
-        region_obj = next((r for r in regions_list if r.get("cpu") == api_region_key), None)
-        
+        region_obj = self._snapshot.regions.get(api_region_key)
         if not region_obj:
             _LOGGER.error(f"Region '{api_region_key}' not found in API")
             return None
+        if region_obj.get("skipped"):
+            await self._load_skipped_region(api_region_key)
         
-        date_today = self._cached_data.get("date_today")
-        date_tomorrow = self._cached_data.get("date_tomorrow")
-        
-        schedule = (region_obj.get("schedule") or {}).get(queue) or {}
-        if not schedule:
+        result = self._schedule_from_snapshot(self._snapshot, region, queue)
+        if not result:
             _LOGGER.warning(f"No schedule found for queue {queue} in region {region}")
-            return None
-        
-        return {
-            "region": region,
-            "queue": queue,
-            "date_today": date_today,
-            "date_tomorrow": date_tomorrow,
-            "schedule": schedule,
-            "is_emergency": region_obj.get("emergency", False)
-        }
+        return result
 
     async def get_old_schedule(self, region: str, queue: str) -> Optional[dict[str, Any]]:
         """
-        Повертає попередній розклад (до останнього оновлення кешу).
+        Повертає попередній розклад — стан на момент попереднього виклику
+        get_changed_regions(reset=True), навіть якщо між ними було кілька оновлень кешу.
         """
-        if not self._old_cached_data:
+        if not self._old_snapshot:
             return None
-            
+        return self._schedule_from_snapshot(self._old_snapshot, region, queue)
+
+    @staticmethod
+    def _schedule_from_snapshot(snapshot: ScheduleSnapshot, region: str, queue: str) -> Optional[dict[str, Any]]:
+        """Формує відповідь для черги зі знімка без проходу по списку регіонів."""
         api_region_key = API_REGION_MAP.get(region, region)
-        regions_list = self._old_cached_data.get("regions", [])
-        region_obj = next((r for r in regions_list if r.get("cpu") == api_region_key), None)
-        
-        if not region_obj:
-            return None
-        
-        date_today = self._old_cached_data.get("date_today")
-        date_tomorrow = self._old_cached_data.get("date_tomorrow")
-        
-        schedule = (region_obj.get("schedule") or {}).get(queue) or {}
+        schedule = snapshot.get_queue(api_region_key, queue)
         if not schedule:
             return None
         
         return {
             "region": region,
             "queue": queue,
-            "date_today": date_today,
-            "date_tomorrow": date_tomorrow,
+            "date_today": snapshot.date_today,
+            "date_tomorrow": snapshot.date_tomorrow,
             "schedule": schedule,
-            "is_emergency": region_obj.get("emergency", False)
+            "is_emergency": snapshot.regions[api_region_key].get("emergency", False)
         }
 
-        return changed_regions
-
-    async def _fetch_if_schedule(self, queue: str) -> Optional[list]:
-        """Отримує сирі дані розкладу для конкретної черги ІФ."""
+    async def _fetch_if_schedule(self, queue: str) -> Optional[Dict[str, DayGrid]]:
+        """
+        Отримує графік конкретної черги ІФ у компактній формі.
+        Таймаут не ковтається, щоб викликач міг відрізнити його від помилки.
+        """
         if self._session is None:
             return None
-        try:
-            url = f"{IF_API_URL}?queue={queue}"
-            async with self._session.get(url, timeout=15) as resp:
-                if resp.status != 200:
-                    _LOGGER.error(f"IF API error {resp.status} for queue {queue}")
-                    return None
-                return await resp.json()
-        except Exception as e:
-            _LOGGER.error(f"Failed to fetch IF schedule for queue {queue}: {e}")
-            return None
+        result = await self._source.if_site.fetch(self._session, queue, self._if_queue_timeout)
+        return result.data
 
-    def _parse_if_schedule(self, raw_data: list, queue: str) -> Dict[str, Dict[str, int]]:
+    async def _ensure_fresh(self, check_day: bool, allow_stale: bool):
         """
-        Перетворює формат ІФ (інтервали) у формат бота (30-хвилинна сітка).
+        Оновлює кеш, якщо він застарів (або змінився день, коли check_day=True).
+        У режимі stale-while-revalidate при allow_stale=True не чекає на оновлення,
+        а запускає його у фоні. Після зміни дня старий знімок не віддається,
+        бо в ньому неправильні date_today/date_tomorrow.
         """
-        parsed = {}
-        for day_data in raw_data:
-            date_str = day_data.get("eventDate") # "28.01.2026"
-            if not date_str: continue
-            
-            # Конвертуємо DD.MM.YYYY в YYYY-MM-DD
-            try:
-                dt = datetime.strptime(date_str, "%d.%m.%Y")
-                iso_date = dt.date().isoformat()
-            except:
-                continue
-                
-            day_schedule = {}
-            # Ініціалізуємо сітку (0 - світло)
-            for h in range(24):
-                day_schedule[f"{h:02d}:00"] = 1
-                day_schedule[f"{h:02d}:30"] = 1
-            
-            # Заповнюємо відключення
-            intervals = day_data.get("queues", {}).get(queue, [])
-            for interval in intervals:
-                # interval: {"from": "06:00", "to": "10:30", "status": 1}
-                # status 1 зазвичай означає відключення на цьому сайті
-                start_str = interval.get("from")
-                end_str = interval.get("to")
-                if not start_str or not end_str: continue
-                
-                try:
-                    start_h, start_m = map(int, start_str.split(":"))
-                    end_h, end_m = map(int, end_str.split(":"))
-                    
-                    # Проходимо по 30-хвилинних слотах
-                    curr_h, curr_m = start_h, start_m
-                    while (curr_h < end_h) or (curr_h == end_h and curr_m < end_m):
-                        day_schedule[f"{curr_h:02d}:{curr_m:02d}"] = 2 # 2 - немає світла
-                        curr_m += 30
-                        if curr_m >= 60:
-                            curr_m = 0
-                            curr_h += 1
-                except Exception as e:
-                    _LOGGER.error(f"Error parsing interval {start_str}-{end_str}: {e}")
-                    
-            parsed[iso_date] = day_schedule
-        return parsed
+        now = time.time()
+        last_fetch_dt = datetime.fromtimestamp(self._last_fetch_time) if self._last_fetch_time else None
+        day_changed = check_day and last_fetch_dt and last_fetch_dt.date() != datetime.now().date()
+        
+        if self._snapshot and (now - self._last_fetch_time) <= self._cache_ttl and not day_changed:
+            return
+        
+        if allow_stale and self._stale_while_revalidate and self._snapshot and not day_changed:
+            self._start_refresh()
+            return
+        await self._refresh_cache()
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Запускає оновлення кешу або повертає вже запущене (single-flight)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._do_refresh_cache())
+        else:
+            _LOGGER.debug("Cache refresh already in flight, joining it")
+        return self._refresh_task
 
     async def _refresh_cache(self) -> list[str]:
+        """
+        Оновлює кеш. Конкурентні виклики не запускають окремі завантаження,
+        а чекають на результат того самого оновлення.
+        """
+        # shield: скасування одного з очікувачів не перериває спільне оновлення
+        changed_regions = await asyncio.shield(self._start_refresh())
+        return list(changed_regions)
+
+    async def _do_refresh_cache(self) -> list[str]:
         """
         Завантажує повний JSON з API та оновлює кеш.
         Також довантажує актуальні дані для Івано-Франківська.
         """
-        import hashlib
-        close_session = False
         if self._session is None:
-            self._session = aiohttp.ClientSession()
-            close_session = True
+            # Без явно переданої сесії використовуємо спільний пул, а не одноразову сесію
+            self._session = HttpPool().session()
 
         changed_regions = []
+        started = time.monotonic()
         _LOGGER.info("Refreshing global API cache...")
         
-        # Зберігаємо попередній стан перед оновленням
-        if self._cached_data:
-            import copy
-            self._old_cached_data = copy.deepcopy(self._cached_data)
+        # Попередній знімок не змінюється, тому копіювати його не потрібно
+        previous = self._snapshot
+        previous_etag = self._etag
+        previous_last_modified = self._last_modified
+        data = previous.data if previous else None
             
         try:
             # 1. Отримуємо основні дані
-            url_with_cache_bust = f"{DTEK_API_URL}?t={int(time.time())}"
-            headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-            if self._etag: headers["If-None-Match"] = self._etag
-
-            async with self._session.get(url_with_cache_bust, headers=headers, timeout=30) as resp:
-                if resp.status == 200:
-                    self._etag = resp.headers.get("ETag")
-                    raw_response = await resp.json(content_type=None)
-                    body_str = raw_response.get("body")
-                    if body_str:
-                        new_data = json.loads(body_str)
-                        self._merge_with_old_data(new_data)
-                        self._cached_data = new_data
-                        self._sync_cache_dates()
-                elif resp.status == 304:
-                    _LOGGER.info("Global API returned 304.")
-                    self._sync_cache_dates()
-                else:
-                    _LOGGER.error(f"Global API error {resp.status}")
-                    self._sync_cache_dates()
-
-            if not self._cached_data:
+            dtek_breaker = self._breakers["dtek"]
+            # Відповідь DTEK, що програла хеджування, вже отримана: її треба застосувати
+            # незалежно від вікна свіжості (яке вона сама й посунула) та стану запобіжника
+            late_primary = self._pending_primary is not None
+            if not late_primary and not self._cache_bust and previous and time.time() < self._fresh_until:
+                # Проксі дозволяє вважати попередню відповідь свіжою — запит не потрібен
+                self._feed_stats["skipped_fresh"] += 1
+                self._last_refresh_ok = True
+                self._primary_fetched_at = time.time()
+                _LOGGER.info("Global API response is still fresh, skipping request.")
+            elif not late_primary and not dtek_breaker.allow():
+                _LOGGER.warning(f"Global API circuit is open, keeping cached data: {dtek_breaker.snapshot()}")
+                # Регіони, які покриває temno, все одно можна оновити з нього
+                cpus = self._hedge_candidates(previous)
+                secondary = await self._fetch_secondary(cpus) if cpus and self._breakers["temno"].allow() else {}
+                self._last_refresh_ok = bool(secondary)
+            else:
+                new_data, ok, secondary = await self._fetch_hedged(previous)
+                self._last_refresh_ok = ok or bool(secondary)
+                if new_data:
+                    self._merge_with_old_data(new_data)
+                    self._primary_regions = {r.get("cpu"): r for r in new_data.get("regions", [])}
+                    data = new_data
+
+            if not data:
                 return []
+            data = self._sync_cache_dates(data)
+            data = self._apply_secondary_results(data)
 
             # 2. Окремо оновлюємо Івано-Франківськ
             if IF_REGION_ID in REGIONS:
-                await self._update_if_region_data()
-
-            # 3. Визначаємо змінені регіони
-            for r in self._cached_data.get("regions", []):
-                cpu = r.get("cpu")
-                r_content = json.dumps({
-                    "schedule": r.get("schedule"),
-                    "emergency": r.get("emergency")
-                }, sort_keys=True)
-                r_hash = hashlib.md5(r_content.encode()).hexdigest()
-                
-                if self._region_hashes.get(cpu) != r_hash:
-                    changed_regions.append(cpu)
-                    self._region_hashes[cpu] = r_hash
-                    self._pending_changes.add(cpu)
+                data = await self._update_if_region_data(data)
+
+            # 3. Визначаємо змінені регіони та перевикористовуємо незмінені
+            data, changed_regions = self._share_unchanged_regions(data, previous)
+            published = previous is None or data is not previous.data
+            if published:
+                self._publish_snapshot(data)
             
             self._last_fetch_time = time.time()
-            _LOGGER.info(f"Cache refreshed. Changed regions: {len(changed_regions)}")
+            _LOGGER.info(f"Cache refreshed in {time.monotonic() - started:.2f}s. Changed regions: {len(changed_regions)}")
+            _LOGGER.info(f"Feed stats: {self._feed_stats}, sources: {self.get_source_health()}")
+
+            # 4. Зберігаємо стан на диск лише коли щось змінилося
+            if self._state_path and (published or self._etag != previous_etag or self._last_modified != previous_last_modified):
+                await self._save_state()
 
         except Exception as e:
             _LOGGER.error(f"Error refreshing cache: {e}")
-        finally:
-            if close_session:
-                await self._session.close()
-                self._session = None
         
         return changed_regions
 
+    async def _fetch_primary(self) -> tuple[Optional[dict], bool]:
+        """
+        Запит до основного API з обліком затримки та станом запобіжника.
+        Повертає (нові дані або None, чи відповіло API як слід — 200/304).
+        """
+        started = time.monotonic()
+        try:
+            new_data, ok = await self._fetch_feed()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Мережева помилка або таймаут: рахуємо її та працюємо з попередніми даними
+            self._feed_stats["responses_error"] += 1
+            _LOGGER.error(f"Global API request failed: {e!r}")
+            new_data, ok = None, False
+        self._latency["dtek"].record((time.monotonic() - started) * 1000, ok)
+        if ok:
+            self._breakers["dtek"].record_success()
+            self._primary_fetched_at = time.time()
+        else:
+            self._breakers["dtek"].record_failure()
+        return new_data, ok
+
+    async def _fetch_secondary(self, cpus: list[str]) -> dict:
+        """Запит до temno по регіонах cpus. Повертає {cpu: компактний графік}."""
+        started = time.monotonic()
+        try:
+            result = await self._secondary.fetch(cpus)
+            fetched = {r["cpu"]: r["schedule"] for r in result.data["regions"]} if result.ok and result.data else {}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Temno request failed: {e!r}")
+            fetched = {}
+        ok = bool(fetched)
+        self._latency["temno"].record((time.monotonic() - started) * 1000, ok)
+        if ok:
+            self._breakers["temno"].record_success()
+        else:
+            self._breakers["temno"].record_failure()
+        now = time.time()
+        for cpu, schedule in fetched.items():
+            self._secondary_results[cpu] = (schedule, now)
+        return fetched
+
+    async def _fetch_hedged(self, previous: Optional[ScheduleSnapshot]) -> tuple[Optional[dict], bool, dict]:
+        """
+        Запит до основного API з хеджуванням через temno для регіонів, які воно покриває:
+        якщо DTEK не відповів за затримку хеджування (або впав), паралельно запитуємо temno,
+        і перемагає перша успішна відповідь. Повільна відповідь DTEK не скасовується,
+        а застосовується окремим оновленням, щойно надійде.
+        Повертає (дані DTEK або None, чи відповів DTEK, {cpu: графік з temno}).
+        """
+        primary = self._pending_primary or asyncio.create_task(self._fetch_primary())
+        self._pending_primary = None
+        cpus = self._hedge_candidates(previous)
+        if not cpus or not self._breakers["temno"].allow():
+            new_data, ok = await primary
+            return new_data, ok, {}
+
+        delay = self._current_hedge_delay()
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if primary in done and primary.result()[1]:
+            return (*primary.result(), {})
+
+        self._hedge_stats["hedged"] += 1
+        _LOGGER.info(f"Global API did not answer in {delay:.2f}s, hedging {len(cpus)} region(s) via temno")
+        secondary = asyncio.create_task(self._fetch_secondary(cpus))
+        pending = {secondary} if primary.done() else {primary, secondary}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if primary in done and primary.result()[1]:
+                self._hedge_stats["primary_wins"] += 1
+                fetched = secondary.result() if secondary.done() else {}
+                secondary.cancel()
+                return (*primary.result(), fetched)
+            if secondary in done and secondary.result():
+                self._hedge_stats["secondary_wins"] += 1
+                if primary.done():
+                    return (*primary.result(), secondary.result())
+                # Відповідь DTEK не втрачаємо: її підхопить наступне оновлення
+                self._pending_primary = primary
+                primary.add_done_callback(self._on_late_primary)
+                return None, False, secondary.result()
+
+        new_data, ok = primary.result()
+        return new_data, ok, {}
+
+    def _on_late_primary(self, task: asyncio.Task):
+        """Запускає оновлення, яке застосує відповідь DTEK, що надійшла після перемоги temno."""
+        if task.cancelled() or self._pending_primary is not task:
+            return
+        late_task = asyncio.ensure_future(self._apply_late_primary(task))
+        self._background_tasks.add(late_task)
+        late_task.add_done_callback(self._background_tasks.discard)
+
+    async def _apply_late_primary(self, task: asyncio.Task):
+        # Оновлення, що ще йде (напр. ІФ після перемоги temno), цю відповідь не підхопить:
+        # приєднуємося до нього, а потім запускаємо власне, яке її застосує
+        for _ in range(2):
+            if self._pending_primary is not task:
+                return
+            await self._refresh_cache()
+
+    async def close(self):
+        """
+        Скасовує фонові запити та оновлення. Викликати до закриття HTTP-пулу,
+        інакше вони завершаться помилкою закритої сесії.
+        """
+        tasks = set(self._background_tasks)
+        if self._pending_primary is not None:
+            tasks.add(self._pending_primary)
+            self._pending_primary = None
+        if self._refresh_task is not None:
+            tasks.add(self._refresh_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._background_tasks.clear()
+
+    def _hedge_candidates(self, previous: Optional[ScheduleSnapshot]) -> list[str]:
+        """Регіони, які покривають обидва джерела (з урахуванням фільтра підписаних регіонів)."""
+        if not self._secondary or not previous:
+            return []
+        return [
+            cpu for cpu, r in previous.regions.items()
+            if not r.get("skipped") and self._secondary.covers(cpu)
+            and (self._region_filter is None or cpu in self._region_filter)
+        ]
+
+    def _current_hedge_delay(self) -> float:
+        """
+        Затримка перед хеджованим запитом: p95 затримки DTEK (не більше налаштованої).
+        Якщо temno стабільно швидше і надійне, запитуємо обидва джерела одразу.
+        """
+        dtek, temno = self._latency["dtek"], self._latency["temno"]
+        if len(dtek) >= HEDGE_MIN_SAMPLES and len(temno) >= HEDGE_MIN_SAMPLES:
+            dtek_p50, temno_p50 = dtek.percentile(0.5), temno.percentile(0.5)
+            if temno_p50 is not None and (dtek_p50 is None or temno_p50 < dtek_p50) and temno.success_rate >= 0.9:
+                return 0
+        dtek_p95 = dtek.percentile(0.95)
+        if len(dtek) >= HEDGE_MIN_SAMPLES and dtek_p95 is not None:
+            return min(self._hedge_delay, dtek_p95 / 1000)
+        return self._hedge_delay
+
+    def _apply_secondary_results(self, data: dict) -> dict:
+        """
+        Поєднує графіки з temno з даними DTEK по слотах (copy-on-write).
+        При розбіжності авторитетне свіжіше джерело; при рівності — основне API.
+        Результати temno, старші за два інтервали кешу, ігноруються.
+        """
+        if not self._secondary_results:
+            return data
+        now = time.time()
+        max_age = max(2 * self._cache_ttl, 600)
+        conflicts = 0
+        regions = []
+        for r in data.get("regions", []):
+            entry = self._secondary_results.get(r.get("cpu"))
+            if not entry or r.get("skipped") or now - entry[1] > max_age:
+                regions.append(r)
+                continue
+            temno_schedule, fetched_at = entry
+            # Після 304 у знімку вже поєднаний графік: звіряємо temno з даними самого DTEK
+            primary_schedule = (self._primary_regions.get(r.get("cpu")) or r).get("schedule")
+            if fetched_at > self._primary_fetched_at:
+                schedule, region_conflicts = reconcile_schedules(temno_schedule, primary_schedule)
+            else:
+                schedule, region_conflicts = reconcile_schedules(primary_schedule, temno_schedule)
+            conflicts += region_conflicts
+            regions.append({**r, "schedule": schedule})
+        self._hedge_stats["conflict_slots"] += conflicts
+        if conflicts:
+            _LOGGER.info(f"Sources disagree in {conflicts} slot(s), using the fresher source")
+        new_data = dict(data)
+        new_data["regions"] = regions
+        return new_data
+
+    async def _fetch_feed(self) -> tuple[Optional[dict], bool]:
+        """
+        Умовний запит до основного API (ETag / Last-Modified) через джерело стрічки.
+        Повертає (розібрані нові дані або None, якщо дані не змінилися (304) чи сталася помилка;
+        чи відповіло API як слід — 200/304).
+        """
+        validators = {"etag": self._etag, "last_modified": self._last_modified}
+        result = await self._source.feed.fetch(self._session, validators, self._cache_bust, self._region_filter)
+        if result.ok:
+            # Помилка з max-age (напр. 503 від проксі) не повинна відкладати наступний запит
+            self._fresh_until = time.time() + result.fresh_for
+        if result.not_modified:
+            self._feed_stats["responses_304"] += 1
+            self._feed_stats["bytes_saved"] += self._last_body_size
+            _LOGGER.info("Global API returned 304.")
+            return None, True
+        if not result.ok:
+            self._feed_stats["responses_error"] += 1
+            _LOGGER.error(f"Global API error {result.status}")
+            return None, False
+
+        self._feed_stats["responses_200"] += 1
+        self._feed_stats["bytes_downloaded"] += result.raw_bytes
+        self._last_body_size = result.raw_bytes
+        self._etag = result.validators.get("etag")
+        self._last_modified = result.validators.get("last_modified")
+        self._decode_metrics = result.decode_metrics
+        _LOGGER.info(f"Feed decoded: {self._decode_metrics}")
+        return result.data, True
+
+    def get_feed_stats(self) -> dict[str, Any]:
+        """
+        Лічильники відповідей 200/304 та переданих/зекономлених байтів основного API,
+        а також метрики останнього декодування (час розбору, розміри, пікова пам'ять).
+        """
+        return {**self._feed_stats, "last_decode": dict(self._decode_metrics)}
+
+    def get_source_health(self) -> dict[str, Any]:
+        """Стан запобіжників, перцентилі затримки джерел (dtek, if, temno) та лічильники хеджування."""
+        health = {
+            name: {**breaker.snapshot(), **(self._latency[name].snapshot() if name in self._latency else {})}
+            for name, breaker in self._breakers.items()
+        }
+        if self._secondary:
+            health["hedge"] = dict(self._hedge_stats)
+        return health
+
+    @property
+    def last_refresh_ok(self) -> bool:
+        """False, якщо останнє оновлення не отримало відповіді від основного API."""
+        return self._last_refresh_ok
+
+    def set_subscribed_regions(self, region_ids):
+        """
+        Задає регіони з підписниками. У режимі skip_unsubscribed графіки решти регіонів
+        не зберігаються в знімку. Якщо з'явився новий регіон, скидаємо валідатори,
+        щоб наступне оновлення завантажило його повністю, а не отримало 304.
+        """
+        if not self._skip_unsubscribed:
+            return
+        cpus = {API_REGION_MAP.get(r, r) for r in region_ids}
+        if self._region_filter is None or not cpus <= self._region_filter:
+            self._invalidate_validators()
+        self._region_filter = cpus
+
+    def _invalidate_validators(self):
+        self._etag = None
+        self._last_modified = None
+        self._fresh_until = 0
+
+    async def _load_skipped_region(self, cpu: str):
+        """Довантажує регіон, пропущений як такий, що не мав підписників (нова реєстрація)."""
+        _LOGGER.info(f"Region '{cpu}' was skipped as unsubscribed, loading it on demand")
+        if self._region_filter is not None:
+            self._region_filter.add(cpu)
+        # Друга спроба потрібна, якщо ми приєдналися до оновлення, що вже йшло зі старим фільтром
+        for _ in range(2):
+            self._invalidate_validators()
+            await self._refresh_cache()
+            region_obj = self._snapshot.regions.get(cpu) if self._snapshot else None
+            if not region_obj or not region_obj.get("skipped"):
+                return
+
     async def _fetch_if_queues(self) -> list[str]:
         """Отримує список доступних черг з сайту ІФ."""
         if self._session is None:
             return []
-        try:
-            async with self._session.get(IF_QUEUES_URL, timeout=15) as resp:
-                if resp.status != 200:
-                    _LOGGER.error(f"IF Queues API error {resp.status}")
-                    return []
-                data = await resp.json()
-                # Очікуємо список об'єктів [{"code": "1.1", ...}, ...]
-                if isinstance(data, list):
-                    return [q.get("code") for q in data if isinstance(q, dict) and q.get("code")]
-                return []
-        except Exception as e:
-            _LOGGER.error(f"Failed to fetch IF queues: {e}")
-            return []
+        return await self._source.if_site.fetch_queues(self._session, self._if_queue_timeout)
 
-    async def _update_if_region_data(self):
-        """Оновлює дані для регіону ІФ безпосередньо з їхнього сайту."""
+    async def _update_if_region_data(self, data: dict) -> dict:
+        """
+        Оновлює дані для регіону ІФ безпосередньо з їхнього сайту.
+        Не змінює переданий об'єкт: повертає нові дані з оновленим регіоном
+        або ті самі, якщо оновлювати нічого.
+        """
+        started = time.monotonic()
         api_region_key = API_REGION_MAP.get(IF_REGION_ID, IF_REGION_ID)
-        regions_list = self._cached_data.get("regions", [])
-        region_obj = next((r for r in regions_list if r.get("cpu") == api_region_key), None)
+        region_obj = ScheduleSnapshot(data).get_region(api_region_key)
         
-        if not region_obj: return
+        # Регіон без підписників не оновлюємо
+        if not region_obj or region_obj.get("skipped"): return data
+
+        if_breaker = self._breakers["if"]
+        if not if_breaker.allow():
+            _LOGGER.warning(f"IF circuit is open, keeping cached IF schedules: {if_breaker.snapshot()}")
+            return data
 
         # 1. Отримуємо список черг з сайту
         queues = await self._fetch_if_queues()
@@ -345,39 +591,81 @@ class SvitloApiClient:
             queues = [f"{g}.{s}" for g in range(1, 7) for s in range(1, 3)] # 1.1 ... 6.2
 
         _LOGGER.info(f"Updating IF schedules for {len(queues)} queues: {queues}")
-        new_if_schedules = {}
-        for q in queues:
-            raw_if = await self._fetch_if_schedule(q)
-            if raw_if:
-                parsed_if = self._parse_if_schedule(raw_if, q)
-                if parsed_if:
-                    new_if_schedules[q] = parsed_if
+        new_if_schedules, timed_out, failed = await self._fetch_if_schedules(queues)
         
-        if new_if_schedules:
-            # Оновлюємо розклад у об'єкті регіону
-            # Ми об'єднуємо нові дані з існуючими, щоб не втратити графік за попередній день
-            # відразу після опівночі, якщо він ще потрібен.
-            if "schedule" not in region_obj:
-                region_obj["schedule"] = {}
-            
-            for q_id, q_sched in new_if_schedules.items():
-                if q_id not in region_obj["schedule"]:
-                    region_obj["schedule"][q_id] = {}
-                
-                # Розумне об'єднання для ІФ: не затираємо відоме невідомим
-                old_q_sched = region_obj["schedule"][q_id]
-                for date_str, day_grid in q_sched.items():
-                    if date_str not in old_q_sched:
-                        old_q_sched[date_str] = day_grid
-                    else:
-                        # Порівнюємо по слотах
-                        for slot, status in day_grid.items():
-                            # Якщо новий статус "unknown" (0), а старий був відомий — залишаємо старий
-                            if status == 0 and old_q_sched[date_str].get(slot, 0) != 0:
-                                continue
-                            old_q_sched[date_str][slot] = status
-                
-            _LOGGER.info(f"Successfully updated IF schedules from direct source")
+        # Черги, які не встигли або впали, зберігають останній відомий графік
+        known_queues = region_obj.get("schedule") or {}
+        fallback = [q for q in timed_out + failed if q in known_queues]
+        _LOGGER.info(
+            f"IF refresh finished in {time.monotonic() - started:.2f}s: "
+            f"fetched={len(new_if_schedules)}, timed_out={len(timed_out)}, "
+            f"failed={len(failed)}, fallback={len(fallback)}"
+        )
+        # Джерело вважається недоступним, лише якщо не вдалося отримати жодної черги
+        if new_if_schedules or not (timed_out or failed):
+            if_breaker.record_success()
+        else:
+            if_breaker.record_failure()
+        
+        if not new_if_schedules:
+            return data
+
+        # Оновлюємо розклад у копії об'єкта регіону (copy-on-write):
+        # попередні версії знімка можуть посилатися на ті самі словники.
+        # Ми об'єднуємо нові дані з існуючими, щоб не втратити графік за попередній день
+        # відразу після опівночі, якщо він ще потрібен.
+        # Розумне об'єднання для ІФ: не затираємо відоме невідомим
+        new_schedule = merge_schedules(new_if_schedules, region_obj.get("schedule"))
+
+        new_region = dict(region_obj)
+        new_region["schedule"] = new_schedule
+        new_data = dict(data)
+        new_data["regions"] = [new_region if r is region_obj else r for r in data.get("regions", [])]
+        _LOGGER.info(f"Successfully updated IF schedules from direct source")
+        return new_data
+
+    async def _fetch_if_schedules(self, queues: list[str]) -> tuple[Dict[str, dict], list[str], list[str]]:
+        """
+        Паралельно завантажує графіки черг ІФ з обмеженням кількості одночасних запитів.
+        Кожна черга має власний дедлайн, а весь прохід — загальний.
+        Повертає (розібрані графіки, черги з таймаутом, черги з помилкою).
+        """
+        semaphore = asyncio.Semaphore(self._if_concurrency)
+
+        async def fetch_one(q: str) -> Optional[Dict[str, DayGrid]]:
+            async with semaphore:
+                return await asyncio.wait_for(self._fetch_if_schedule(q), timeout=self._if_queue_timeout)
+
+        tasks = {asyncio.create_task(fetch_one(q)): q for q in queues}
+        done, pending = await asyncio.wait(tasks.keys(), timeout=self._if_refresh_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Чекаємо завершення скасованих задач, щоб не лишати їх висіти
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        parsed_schedules = {}
+        timed_out = [tasks[t] for t in pending]
+        failed = []
+        for task in done:
+            q = tasks[task]
+            if task.exception() is not None:
+                if isinstance(task.exception(), asyncio.TimeoutError):
+                    _LOGGER.warning(f"IF queue {q} missed its {self._if_queue_timeout}s deadline")
+                    timed_out.append(q)
+                else:
+                    _LOGGER.error(f"Failed to fetch IF schedule for queue {q}: {task.exception()}")
+                    failed.append(q)
+                continue
+            parsed_if = task.result()
+            if parsed_if:
+                parsed_schedules[q] = parsed_if
+            else:
+                failed.append(q)
+        
+        if pending:
+            _LOGGER.warning(f"IF refresh hit the {self._if_refresh_timeout}s deadline, {len(pending)} queues left unfinished")
+        return parsed_schedules, timed_out, failed
 
     def get_changed_regions(self, reset: bool = True) -> list[str]:
         """
@@ -388,8 +676,69 @@ class SvitloApiClient:
         changes = list(self._pending_changes)
         if reset:
             self._pending_changes.clear()
+            self._old_snapshot = self._find_baseline_snapshot()
+            self._baseline_version = self._snapshot.version if self._snapshot else None
         return changes
 
+    def load_state(self) -> bool:
+        """
+        Відновлює знімок, хеші регіонів та валідатори з диска після перезапуску,
+        щоб перше оновлення було умовним запитом, а не повним перезавантаженням.
+        """
+        if not self._state_path or self._snapshot:
+            return False
+        state = snapshot_store.load_state(self._state_path)
+        if not state or not state.get("data"):
+            return False
+        
+        self._publish_snapshot(unpack_payload(state["data"]))
+        self._region_hashes = dict(state.get("region_hashes") or {})
+        self._etag = state.get("etag")
+        self._last_modified = state.get("last_modified")
+        self._last_fetch_time = state.get("last_fetch_time") or 0
+        _LOGGER.info(
+            f"Restored API state from {self._state_path}: "
+            f"{len(self._snapshot.regions)} regions, etag={self._etag}"
+        )
+        return True
+
+    async def _save_state(self):
+        """Атомарно записує поточний знімок у фоновому потоці (знімок незмінний, тож це безпечно)."""
+        state = {
+            "data": pack_payload(self._snapshot.data),
+            "region_hashes": dict(self._region_hashes),
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "last_fetch_time": self._last_fetch_time
+        }
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(snapshot_store.save_state, self._state_path, state)
+            _LOGGER.debug(f"Saved API state to {self._state_path} in {time.monotonic() - started:.2f}s")
+        except Exception as e:
+            _LOGGER.error(f"Failed to save API state to {self._state_path}: {e}")
+
+    def _find_baseline_snapshot(self) -> Optional[ScheduleSnapshot]:
+        """
+        Знаходить у кільці версію, з якою слід порівнювати поточний знімок:
+        ту, що була актуальною під час попереднього reset (або попередню версію на старті).
+        """
+        if not self._history:
+            return None
+        if self._baseline_version is None:
+            return self._history[-1]
+        if self._snapshot and self._snapshot.version == self._baseline_version:
+            # Після попереднього reset оновлень не було
+            return self._snapshot
+        for snapshot in self._history:
+            if snapshot.version == self._baseline_version:
+                return snapshot
+        _LOGGER.warning(
+            f"Snapshot version {self._baseline_version} fell out of history "
+            f"(size {self._history.maxlen}), comparing with the oldest kept version"
+        )
+        return self._history[0]
+
     async def get_regions(self) -> Dict[str, str]:
         """
         Повертає список регіонів, використовуючи REGIONS з const.py.
@@ -397,30 +746,30 @@ class SvitloApiClient:
         """
         return REGIONS
 
-    async def get_active_regions(self) -> Dict[str, str]:
+    async def get_active_regions(self, allow_stale: bool = False) -> Dict[str, str]:
         """
         Повертає список регіонів, які мають хоча б одну чергу з розкладом.
         """
-        now = time.time()
-        if not self._cached_data or (now - self._last_fetch_time) > self._cache_ttl:
-            await self._refresh_cache()
+        await self._ensure_fresh(check_day=False, allow_stale=allow_stale)
             
-        if not self._cached_data:
+        snapshot = self._snapshot
+        if not snapshot:
             return REGIONS # Fallback
-            
-        active_cpus = set()
-        for r in self._cached_data.get("regions", []):
-            if r.get("schedule"):
-                active_cpus.add(r.get("cpu"))
         
-        # Фільтруємо REGIONS за допомогою API_REGION_MAP та active_cpus
+        # Результат фільтрації залежить лише від знімка, тож рахуємо його один раз
+        if self._active_regions and self._active_regions[0] is snapshot:
+            return self._active_regions[1]
+            
+        # Фільтруємо REGIONS за допомогою API_REGION_MAP та активних регіонів знімка
         filtered = {}
         for reg_id, reg_name in REGIONS.items():
             api_key = API_REGION_MAP.get(reg_id, reg_id)
-            if api_key in active_cpus:
+            if api_key in snapshot.active_cpus:
                 filtered[reg_id] = reg_name
         
-        return filtered if filtered else REGIONS
+        result = filtered if filtered else REGIONS
+        self._active_regions = (snapshot, result)
+        return result
 
     @staticmethod
     def get_status_at_time(schedule_data: dict, dt: datetime) -> str:
@@ -428,63 +777,98 @@ class SvitloApiClient:
         Визначає статус (on/off/unknown) для конкретного часу.
         """
         date_str = dt.date().isoformat()
-        day_schedule = schedule_data["schedule"].get(date_str, {})
-        
-        hour = dt.hour
-        minute = 30 if dt.minute >= 30 else 0
-        time_key = f"{hour:02d}:{minute:02d}"
-        
-        code = day_schedule.get(time_key, 0)
-        if code == 1: return "on"
-        if code == 2: return "off"
-        if code == 3: return "possible"
-        return "unknown"
-
-    def _sync_cache_dates(self):
-        """Забезпечує відповідність date_today та date_tomorrow системному часу."""
-        if not self._cached_data: return
-        
+        day_grid = schedule_data["schedule"].get(date_str, EMPTY_DAY)
+        return day_grid.status_at(dt.hour * 2 + (1 if dt.minute >= 30 else 0))
+
+    def _sync_cache_dates(self, data: dict) -> dict:
+        """
+        Забезпечує відповідність date_today та date_tomorrow системному часу.
+        Повертає нову поверхневу копію, якщо дати змінилися.
+        """
         from datetime import timedelta
         now_date = datetime.now().date()
         iso_today = now_date.isoformat()
         iso_tomorrow = (now_date + timedelta(days=1)).isoformat()
         
-        if self._cached_data.get("date_today") != iso_today:
-            _LOGGER.info(f"Syncing cache dates: {self._cached_data.get('date_today')} -> {iso_today}")
-            self._cached_data["date_today"] = iso_today
-            self._cached_data["date_tomorrow"] = iso_tomorrow
+        if data.get("date_today") == iso_today:
+            return data
+        _LOGGER.info(f"Syncing cache dates: {data.get('date_today')} -> {iso_today}")
+        synced = dict(data)
+        synced["date_today"] = iso_today
+        synced["date_tomorrow"] = iso_tomorrow
+        return synced
+
+    def _share_unchanged_regions(self, data: dict, previous: Optional[ScheduleSnapshot]) -> tuple[dict, list[str]]:
+        """
+        Рахує хеші регіонів і замінює незмінені регіони об'єктами з попереднього знімка,
+        щоб версії в історії ділили пам'ять. Повертає (дані, змінені CPU).
+        """
+        prev_regions = previous.regions if previous else {}
+        regions = []
+        changed_regions = []
+        for r in data.get("regions", []):
+            cpu = r.get("cpu")
+            prev_r = prev_regions.get(cpu)
+            if prev_r is r:
+                # Регіон вже спільний з попередньою версією (304 або без змін ІФ)
+                regions.append(r)
+                continue
+            
+            r_hash = schedule_hash({
+                "schedule": r.get("schedule"),
+                "emergency": r.get("emergency")
+            })
+            
+            if self._region_hashes.get(cpu) != r_hash:
+                changed_regions.append(cpu)
+                self._region_hashes[cpu] = r_hash
+                self._pending_changes.add(cpu)
+            elif prev_r is not None:
+                r = prev_r
+            regions.append(r)
+
+        if previous is not None:
+            prev_list = previous.data.get("regions", [])
+            same_regions = len(prev_list) == len(regions) and all(a is b for a, b in zip(prev_list, regions))
+            same_dates = (data.get("date_today"), data.get("date_tomorrow")) == (previous.date_today, previous.date_tomorrow)
+            if same_regions and same_dates:
+                return previous.data, changed_regions
+        
+        if any(a is not b for a, b in zip(regions, data.get("regions", []))):
+            data = dict(data)
+            data["regions"] = regions
+        return data, changed_regions
+
+    def _publish_snapshot(self, data: dict):
+        """Робить нову версію знімка поточною, а попередню кладе в кільце історії."""
+        previous = self._snapshot
+        version = previous.version + 1 if previous else 1
+        if previous:
+            self._history.append(previous)
+        self._snapshot = ScheduleSnapshot(data, version=version)
 
     def _merge_with_old_data(self, new_data: dict):
         """Об'єднує нові дані з кешу з попередніми, запобігаючи втраті відомих статусів."""
-        if not self._cached_data: return
+        if not self._snapshot: return
         
-        old_regions = {r["cpu"]: r for r in self._cached_data.get("regions", [])}
+        old_regions = self._snapshot.regions
+        to_merge = []
         
         for new_r in new_data.get("regions", []):
             cpu = new_r.get("cpu")
-            if cpu not in old_regions: continue
+            if cpu not in old_regions or new_r.get("skipped"): continue
             
-            old_r = old_regions[cpu]
+            # Регіони, поєднані з temno, об'єднуються з попередніми даними самого DTEK
+            old_r = self._primary_regions.get(cpu) if cpu in self._secondary_results else None
+            old_r = old_r or old_regions[cpu]
             if "schedule" not in old_r: continue
             if "schedule" not in new_r: 
                 new_r["schedule"] = old_r["schedule"]
                 continue
-                
-            # Об'єднуємо черги
-            for q_id, old_q_sched in old_r["schedule"].items():
-                if q_id not in new_r["schedule"]:
-                    new_r["schedule"][q_id] = old_q_sched
-                    continue
-                
-                new_q_sched = new_r["schedule"][q_id]
-                # Об'єднуємо дати
-                for date_str, old_day_grid in old_q_sched.items():
-                    if date_str not in new_q_sched:
-                        new_q_sched[date_str] = old_day_grid
-                    else:
-                        # Розумне об'єднання слотів
-                        for slot, old_status in old_day_grid.items():
-                            new_status = new_q_sched[date_str].get(slot, 0)
-                            # Якщо новий статус "unknown" (0), а старий був відомий — залишаємо старий
-                            if new_status == 0 and old_status != 0:
-                                new_q_sched[date_str][slot] = old_status
+            to_merge.append((new_r, old_r))
+            
+        # Об'єднуємо черги та дати всіх регіонів одним пакетом:
+        # невідомий новий статус не затирає відомий старий
+        merged = merge_schedules_batch([(new_r["schedule"], old_r["schedule"]) for new_r, old_r in to_merge])
+        for (new_r, _), schedule in zip(to_merge, merged):
+            new_r["schedule"] = schedule
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: bytes, prefix: str = ".tmp_"):
+    """
+    Атомарний запис файлу: тимчасовий файл у тій самій теці, fsync, потім os.replace.
+    Читач ніколи не бачить недописаний файл, після збою живлення на місці файлу не лишається
+    порожнеча, а тимчасовий файл видаляється, якщо запис не вдався. Теку створює за потреби.
+    prefix — початок імені тимчасового файлу (за ним недописані файли знаходить прибирання).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=prefix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
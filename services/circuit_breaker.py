@@ -0,0 +1,75 @@
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Запобіжник для одного джерела даних.
+    Після failure_threshold помилок поспіль джерело вважається недоступним (open)
+    і не опитується reset_timeout секунд; потім дозволяється одна пробна спроба (half_open).
+    Успіх закриває запобіжник, невдача знову відкриває його.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 300):
+        self.name = name
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._total_failures = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Чи можна зараз звертатися до джерела."""
+        state = self.state
+        if state == HALF_OPEN and self._state == OPEN:
+            _LOGGER.info(f"Circuit '{self.name}' is half-open, trying the source again")
+            self._state = HALF_OPEN
+        return state != OPEN
+
+    def record_success(self):
+        if self._state != CLOSED:
+            _LOGGER.info(f"Circuit '{self.name}' closed: source recovered")
+        self._state = CLOSED
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        self._total_failures += 1
+        if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != OPEN:
+                self._times_opened += 1
+                _LOGGER.warning(
+                    f"Circuit '{self.name}' opened after {self._failures} failure(s), "
+                    f"pausing requests for {self._reset_timeout:.0f}s"
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Поточний стан для логів та метрик."""
+        state = self.state
+        retry_in = 0.0
+        if state == OPEN:
+            retry_in = max(0.0, self._reset_timeout - (time.monotonic() - self._opened_at))
+        return {
+            "state": state,
+            "failures": self._failures,
+            "total_failures": self._total_failures,
+            "times_opened": self._times_opened,
+            "retry_in": round(retry_in)
+        }
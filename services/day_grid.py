@@ -0,0 +1,228 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+SLOTS_PER_DAY = 48
+# "00:00", "00:30", ... "23:30" — ключі формату API
+SLOT_LABELS = tuple(f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 30))
+SLOT_INDEX = {label: i for i, label in enumerate(SLOT_LABELS)}
+
+# Коди статусів API: 1 - світло є, 2 - світла немає, 3 - можливе відключення, 0 - невідомо
+CODE_UNKNOWN = 0
+CODE_ON = 1
+CODE_OFF = 2
+CODE_POSSIBLE = 3
+# Слот, якого не було у відповіді API (щоб перетворення назад у словник було без втрат)
+MISSING = 0xFF
+
+_NAME_BY_CODE = tuple(
+    {CODE_ON: "on", CODE_OFF: "off", CODE_POSSIBLE: "possible"}.get(c, "unknown") for c in range(256)
+)
+# Таблиця для bytes.translate: будь-який код, крім 1..3, стає 0 (невідомо)
+_NORMALIZE = bytes(c if c in (CODE_ON, CODE_OFF, CODE_POSSIBLE) else CODE_UNKNOWN for c in range(256))
+
+UNKNOWN_CODES = bytes(SLOTS_PER_DAY)
+
+
+class DayGrid:
+    """
+    Компактний незмінний графік на один день: 48 байт, по байту на 30-хвилинний слот.
+    Будується один раз під час оновлення кешу і без втрат перетворюється у формат API
+    ({"HH:MM": код}) та назад.
+    """
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: bytes = bytes([MISSING]) * SLOTS_PER_DAY):
+        if len(slots) != SLOTS_PER_DAY:
+            raise ValueError(f"DayGrid needs {SLOTS_PER_DAY} slots, got {len(slots)}")
+        object.__setattr__(self, "slots", bytes(slots))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DayGrid is immutable")
+
+    @classmethod
+    def from_api(cls, day_schedule: Optional[dict]) -> "DayGrid":
+        """Створює графік зі словника API. Ключі поза 30-хвилинною сіткою ігноруються."""
+        buf = bytearray([MISSING]) * SLOTS_PER_DAY
+        for label, code in (day_schedule or {}).items():
+            idx = SLOT_INDEX.get(label)
+            if idx is not None and isinstance(code, int) and 0 <= code < MISSING:
+                buf[idx] = code
+        return cls(bytes(buf))
+
+    def to_api(self) -> Dict[str, int]:
+        return {SLOT_LABELS[i]: c for i, c in enumerate(self.slots) if c != MISSING}
+
+    def to_half_list(self) -> list[str]:
+        """Список з 48 статусів ("on"/"off"/"possible"/"unknown") для генератора зображень."""
+        return [_NAME_BY_CODE[c] for c in self.slots]
+
+    def codes(self) -> bytes:
+        """48 нормалізованих кодів (0 - невідомо, 1..3 - відомий статус)."""
+        return self.slots.translate(_NORMALIZE)
+
+    def code_at(self, idx: int) -> int:
+        return _NORMALIZE[self.slots[idx]]
+
+    def status_at(self, idx: int) -> str:
+        return _NAME_BY_CODE[self.slots[idx]]
+
+    def __eq__(self, other):
+        if isinstance(other, DayGrid):
+            return self.slots == other.slots
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.slots)
+
+    def __repr__(self):
+        return f"DayGrid({self.codes().hex()})"
+
+
+EMPTY_DAY = DayGrid()
+
+
+def merge_day(new: DayGrid, old: DayGrid) -> DayGrid:
+    """Не затираємо відомий статус невідомим (0 або відсутнім слотом)."""
+    if new.slots == old.slots:
+        return new
+    merged = bytes(
+        o if n in (CODE_UNKNOWN, MISSING) and o not in (CODE_UNKNOWN, MISSING) else n
+        for n, o in zip(new.slots, old.slots)
+    )
+    return new if merged == new.slots else DayGrid(merged)
+
+
+def merge_schedules(new: Optional[dict], old: Optional[dict]) -> Dict[str, Dict[str, DayGrid]]:
+    """Об'єднує компактні графіки одного регіону. Див. merge_schedules_batch."""
+    return merge_schedules_batch([(new, old)])[0]
+
+
+def merge_schedules_batch(pairs: list) -> list:
+    """
+    Об'єднує пари компактних графіків регіонів (новий, старий) {черга: {дата: DayGrid}}
+    за правилом merge_day. Черги та дати, відомі лише у старому графіку, переносяться без змін.
+    Усі дні, що є в обох графіках (усіх черг усіх пар), складаються в одну матрицю (N x 48)
+    і об'єднуються однією масковою операцією замість циклу по слотах.
+    Не змінює вхідні словники; незмінені дні зберігають ідентичність об'єктів.
+    """
+    results = []
+    overlaps = []  # (об'єднаний графік черги, дата, новий день, старий день)
+    for new, old in pairs:
+        merged = {q_id: dict(q_sched) for q_id, q_sched in (new or {}).items()}
+        for q_id, old_q_sched in (old or {}).items():
+            merged_q_sched = merged.get(q_id)
+            if merged_q_sched is None:
+                merged[q_id] = old_q_sched
+                continue
+            for date_str, old_grid in old_q_sched.items():
+                new_grid = merged_q_sched.get(date_str)
+                if new_grid is None:
+                    merged_q_sched[date_str] = old_grid
+                elif new_grid.slots != old_grid.slots:
+                    overlaps.append((merged_q_sched, date_str, new_grid, old_grid))
+        results.append(merged)
+
+    if not overlaps:
+        return results
+
+    import numpy as np # важкий імпорт відкладаємо до першого об'єднання
+    new_m = np.frombuffer(b"".join(o[2].slots for o in overlaps), dtype=np.uint8).reshape(-1, SLOTS_PER_DAY)
+    old_m = np.frombuffer(b"".join(o[3].slots for o in overlaps), dtype=np.uint8).reshape(-1, SLOTS_PER_DAY)
+    take_old = ((new_m == CODE_UNKNOWN) | (new_m == MISSING)) & (old_m != CODE_UNKNOWN) & (old_m != MISSING)
+    result = np.where(take_old, old_m, new_m)
+
+    for row in np.flatnonzero(take_old.any(axis=1)):
+        merged_q_sched, date_str = overlaps[row][0], overlaps[row][1]
+        merged_q_sched[date_str] = DayGrid(result[row].tobytes())
+    return results
+
+
+def reconcile_schedules(authoritative: Optional[dict], other: Optional[dict]) -> tuple[Dict[str, Dict[str, DayGrid]], int]:
+    """
+    Поєднує графіки регіону з двох джерел по слотах:
+    - однакові або відомі лише в одному джерелі слоти беруться як є;
+    - якщо обидва джерела знають статус і він різний, перемагає authoritative.
+    Повертає (поєднаний графік, кількість слотів, у яких джерела розійшлися).
+    """
+    conflicts = 0
+    for q_id, auth_q_sched in (authoritative or {}).items():
+        other_q_sched = (other or {}).get(q_id) or {}
+        for date_str, auth_grid in auth_q_sched.items():
+            other_grid = other_q_sched.get(date_str)
+            if other_grid is None or other_grid.slots == auth_grid.slots:
+                continue
+            conflicts += sum(
+                1 for a, o in zip(auth_grid.codes(), other_grid.codes())
+                if a != CODE_UNKNOWN and o != CODE_UNKNOWN and a != o
+            )
+    return merge_schedules(authoritative, other), conflicts
+
+
+def compact_schedule(schedule: Optional[dict]) -> Dict[str, Dict[str, DayGrid]]:
+    """Перетворює графік регіону {черга: {дата: {"HH:MM": код}}} у компактну форму."""
+    return {
+        q_id: {date_str: DayGrid.from_api(day) for date_str, day in (q_sched or {}).items()}
+        for q_id, q_sched in (schedule or {}).items()
+    }
+
+
+def expand_schedule(schedule: Optional[dict]) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Зворотне перетворення компактного графіку регіону у формат API."""
+    return {
+        q_id: {date_str: grid.to_api() for date_str, grid in q_sched.items()}
+        for q_id, q_sched in (schedule or {}).items()
+    }
+
+
+def _update_digest(digest, value: Any):
+    if isinstance(value, DayGrid):
+        digest.update(b"G")
+        digest.update(value.slots)
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value):
+            encoded = str(key).encode()
+            digest.update(len(encoded).to_bytes(4, "big"))
+            digest.update(encoded)
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    else:
+        encoded = repr(value).encode()
+        digest.update(len(encoded).to_bytes(4, "big"))
+        digest.update(encoded)
+
+
+def schedule_hash(value: Any) -> str:
+    """
+    Стабільний хеш компактного графіку (дня, черги, регіону або набору черг)
+    без серіалізації у JSON.
+    """
+    digest = hashlib.md5()
+    _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+def pack_payload(data: dict) -> dict:
+    """Готує знімок до збереження у JSON: кожен день стає hex-рядком з 96 символів."""
+    packed = dict(data)
+    packed["regions"] = [
+        {**r, "schedule": {
+            q_id: {date_str: grid.slots.hex() for date_str, grid in q_sched.items()}
+            for q_id, q_sched in r["schedule"].items()
+        }} if r.get("schedule") else r
+        for r in data.get("regions", [])
+    ]
+    return packed
+
+
+def unpack_payload(data: dict) -> dict:
+    """Зворотне до pack_payload."""
+    unpacked = dict(data)
+    unpacked["regions"] = [
+        {**r, "schedule": {
+            q_id: {date_str: DayGrid(bytes.fromhex(slots)) for date_str, slots in q_sched.items()}
+            for q_id, q_sched in r["schedule"].items()
+        }} if r.get("schedule") else r
+        for r in data.get("regions", [])
+    ]
+    return unpacked
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Any, Iterable, List, Optional
+
+from services.image_cache import ImageCache, image_cache_key
+from services.rendered_image import RenderedImage
+
+_LOGGER = logging.getLogger(__name__)
+
+MODE = "dynamic"
+
+
+def dynamic_slot(dt: datetime) -> str:
+    """Півгодинний слот, у межах якого «Прогноз (24 год)» не змінюється: дата та індекс 0..47."""
+    return f"{dt.strftime('%Y-%m-%d')}/{dt.hour * 2 + (1 if dt.minute >= 30 else 0):02d}"
+
+
+class DynamicPrerender:
+    """
+    Кеш зображень режиму dynamic на поточний півгодинний слот.
+    Вміст кола змінюється лише раз на 30 хв, тож о кожній межі слоту (і після оновлення регіону)
+    зображення для всіх (регіон, черга, назва черги) користувачів dynamic рендеряться заздалегідь,
+    а запити «📊 Поточний статус» беруть готові з ImageCache за ключем (хеш графіка, слот).
+    Стрілка часу стоїть на моменті рендера; live_marker=True — рендер зі стрілкою на кожен запит.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(DynamicPrerender, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, enabled: bool = True, live_marker: bool = False):
+        if self._initialized:
+            return
+        self.enabled = enabled
+        self.live_marker = live_marker
+        self._stats = {"prerendered": 0, "hits": 0, "misses": 0}
+        self._initialized = True
+
+    @property
+    def cacheable(self) -> bool:
+        return self.enabled and not self.live_marker
+
+    @staticmethod
+    def cache_key(schedule_hash: str, dt: datetime, label: str, region_name: Optional[str], bot_username: Optional[str]) -> str:
+        # Назва черги (alias користувача) намальована в центрі кола, тому теж входить у ключ
+        return image_cache_key(schedule_hash, dynamic_slot(dt), label, region_name, bot_username)
+
+    async def get(self, region: str, queue: str, cache_key: str) -> Optional[List[RenderedImage]]:
+        if not self.cacheable:
+            return None
+        images = await ImageCache().get(region, queue, MODE, cache_key)
+        self._stats["hits" if images else "misses"] += 1
+        return images
+
+    async def set(self, region: str, queue: str, cache_key: str, images: List[RenderedImage]):
+        if self.cacheable:
+            await ImageCache().set(region, queue, MODE, cache_key, images)
+
+    async def prerender(self, api_client, subscriptions: Iterable[tuple], bot_username: Optional[str], new_slot: bool = False) -> int:
+        """
+        subscriptions — (region_id, queue_id, alias) користувачів у режимі dynamic.
+        new_slot=True (виклик на межі півгодини) спершу прибирає зображення попередніх слотів.
+        Повертає кількість відрендерених наборів зображень.
+        """
+        if not self.cacheable:
+            return 0
+        if new_slot:
+            ImageCache().clear_mode(MODE)
+        from services.api_client import REGIONS
+        from services.day_grid import EMPTY_DAY, schedule_hash
+        from services.image_generator import is_schedule_empty
+        from services.render_coordinator import RenderCoordinator
+
+        now_dt = datetime.now()
+        jobs = []
+        for region_id, queue_id, alias in subscriptions:
+            schedule_data = await api_client.fetch_schedule(region_id, queue_id, allow_stale=True)
+            if not schedule_data:
+                continue
+            region_name = REGIONS.get(region_id, "Unknown Region")
+            key = self.cache_key(schedule_hash(schedule_data["schedule"]), now_dt, alias, region_name, bot_username)
+            if ImageCache().has(region_id, queue_id, MODE, key):
+                continue
+            today_half = schedule_data["schedule"].get(schedule_data["date_today"], EMPTY_DAY).to_half_list()
+            tomorrow_half = schedule_data["schedule"].get(schedule_data["date_tomorrow"], EMPTY_DAY).to_half_list()
+            # Як і в send_schedule: порожнє завтра малюється сірим
+            tomorrow_half_for_gen = [] if is_schedule_empty(tomorrow_half) else tomorrow_half
+            # Той самий ключ, що й у send_schedule: запит користувача під час пререндера чекає його
+            jobs.append(((region_id, queue_id), RenderCoordinator().render(
+                (region_id, queue_id, MODE, key),
+                partial(self._render, region_id, queue_id, alias, key, now_dt, today_half,
+                        tomorrow_half_for_gen, region_name, bot_username)
+            )))
+
+        results = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+        rendered = 0
+        for ((region_id, queue_id), _), images in zip(jobs, results):
+            if isinstance(images, BaseException):
+                _LOGGER.error(f"Failed to pre-render dynamic image for {region_id}/{queue_id}: {images!r}")
+                continue
+            rendered += 1
+        self._stats["prerendered"] += rendered
+        if jobs:
+            _LOGGER.info(f"Pre-rendered {rendered}/{len(jobs)} dynamic images for slot {dynamic_slot(now_dt)}")
+        return rendered
+
+    async def _render(self, region_id, queue_id, alias, key, now_dt, today_half, tomorrow_half, region_name, bot_username):
+        from services.render_pool import render_schedule_images
+        images = await render_schedule_images(
+            today_half, tomorrow_half, now_dt, MODE, alias,
+            show_time_marker=True,
+            region_name=region_name,
+            bot_username=bot_username
+        )
+        await self.set(region_id, queue_id, key, images)
+        return images
+
+    def get_stats(self) -> dict[str, Any]:
+        return dict(self._stats)
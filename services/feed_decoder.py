@@ -0,0 +1,107 @@
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+    _loads: Callable[[Any], Any] = orjson.loads
+    BACKEND = "orjson"
+except ImportError:
+    _loads = json.loads
+    BACKEND = "json"
+
+
+
+def _start_alloc_tracing() -> tuple[bool, int]:
+    """
+    Починає вимірювання пікових алокацій одного декодування.
+    Повертає (чи ми запустили tracemalloc, поточний обсяг як точку відліку).
+    """
+    if tracemalloc.is_tracing():
+        # Трасування вже ввімкнене ззовні (напр. профілювання) — не вимикаємо його
+        tracemalloc.reset_peak()
+        return False, tracemalloc.get_traced_memory()[0]
+    tracemalloc.start()
+    return True, 0
+
+
+def _stop_alloc_tracing(started_here: bool, baseline: int) -> int:
+    """Пік алокацій Python (KB) понад точку відліку з моменту _start_alloc_tracing."""
+    peak = tracemalloc.get_traced_memory()[1]
+    if started_here:
+        tracemalloc.stop()
+    return max(peak - baseline, 0) // 1024
+
+
+def _skip_region(region: dict) -> dict:
+    """
+    Заглушка для регіону без підписників: без графіків, але з переліком черг,
+    щоб регіон лишався у списку активних для реєстрації.
+    """
+    return {
+        "cpu": region.get("cpu"),
+        "emergency": region.get("emergency", False),
+        "skipped": True,
+        "schedule": {q_id: {} for q_id in (region.get("schedule") or {})}
+    }
+
+
+def decode_feed(raw: bytes, keep_cpus: Optional[set] = None) -> tuple[Optional[dict], dict[str, Any]]:
+    """
+    Декодує відповідь DTEK-проксі, де поле "body" містить JSON-рядок.
+    Обгортка розбирається прямо з байтів (orjson не створює проміжного тексту всієї відповіді),
+    у пам'яті одночасно лише сирі байти та рядок body; далі розбирається внутрішній документ.
+    keep_cpus — якщо задано, регіони поза цим набором замінюються заглушками.
+    Повертає (дані, метрики декодування).
+    """
+    started = time.perf_counter()
+    tracing = _start_alloc_tracing()
+    try:
+        data, inner_chars, skipped = _decode(raw, keep_cpus)
+    finally:
+        peak_alloc_kb = _stop_alloc_tracing(*tracing)
+    if data is None:
+        return None, {"backend": BACKEND, "raw_bytes": len(raw)}
+
+    metrics = {
+        "backend": BACKEND,
+        "raw_bytes": len(raw),
+        "inner_chars": inner_chars,
+        # Включає накладні витрати tracemalloc (приблизно вдвічі довше за чисте декодування)
+        "parse_ms": round((time.perf_counter() - started) * 1000, 1),
+        "skipped_regions": skipped,
+        # Пік саме цього декодування, а не ru_maxrss усього процесу за весь час роботи
+        "peak_alloc_kb": peak_alloc_kb
+    }
+    return data, metrics
+
+
+def _decode(raw: bytes, keep_cpus: Optional[set]) -> tuple[Optional[dict], Optional[int], int]:
+    """Повертає (дані або None, довжина рядка body, кількість заглушок)."""
+    envelope = _loads(raw)
+    body = envelope.get("body") if isinstance(envelope, dict) else None
+    del envelope
+    if not body:
+        return None, None, 0
+
+    if isinstance(body, str):
+        inner_chars = len(body)
+        data = _loads(body)
+    else:
+        # Проксі віддав body вже об'єктом, а не рядком
+        inner_chars = None
+        data = body
+    del body
+
+    skipped = 0
+    if keep_cpus is not None:
+        regions = []
+        for r in data.get("regions", []):
+            if r.get("cpu") in keep_cpus:
+                regions.append(r)
+            else:
+                regions.append(_skip_region(r))
+                skipped += 1
+        data["regions"] = regions
+    return data, inner_chars, skipped
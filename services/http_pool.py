@@ -0,0 +1,188 @@
+import json
+import logging
+import ssl
+import time
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESPONSE_BYTES = 16 * 1024 * 1024
+
+
+class ResponseTooLarge(aiohttp.ClientError):
+    """Відповідь перевищила дозволений розмір."""
+
+
+class HttpPool:
+    """
+    Спільний HTTP-шар для всіх запитів бота: upstream-джерела (DTEK, ІФ, temno) та Telegram.
+    Один налаштований TCPConnector: ліміти з'єднань (загальний і на хост), keep-alive,
+    кеш DNS, таймаути за замовчуванням та обмеження розміру відповіді.
+    Статистика пулу збирається через aiohttp TraceConfig.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(HttpPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30,
+        dns_ttl: int = 300,
+        timeout: float = 30,
+        connect_timeout: float = 10,
+        max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES
+    ):
+        if self._initialized:
+            return
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_ttl = dns_ttl
+        self._timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_response_bytes = max_response_bytes
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "queued": 0,
+            "queue_time_ms": 0.0,
+            "max_queue_time_ms": 0.0
+        }
+        self._initialized = True
+
+    def session(self) -> aiohttp.ClientSession:
+        """Спільна сесія; створюється при першому виклику всередині циклу подій."""
+        if self._session is None or self._session.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=self._dns_ttl,
+                use_dns_cache=True,
+                ssl=_ssl_context()
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=self._timeout,
+                trace_configs=[self._trace_config()]
+            )
+            _LOGGER.info(
+                f"HTTP pool created: limit={self._limit}, per_host={self._limit_per_host}, "
+                f"keepalive={self._keepalive_timeout}s, dns_ttl={self._dns_ttl}s"
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self._stats
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace(queued_at=None))
+
+        async def on_request_start(session, ctx, params):
+            stats["requests"] += 1
+
+        async def on_request_exception(session, ctx, params):
+            stats["errors"] += 1
+
+        async def on_queued_start(session, ctx, params):
+            stats["queued"] += 1
+            ctx.queued_at = time.monotonic()
+
+        async def on_queued_end(session, ctx, params):
+            if ctx.queued_at is not None:
+                waited = (time.monotonic() - ctx.queued_at) * 1000
+                stats["queue_time_ms"] += waited
+                stats["max_queue_time_ms"] = max(stats["max_queue_time_ms"], waited)
+
+        async def on_connection_create(session, ctx, params):
+            stats["new_connections"] += 1
+
+        async def on_connection_reuse(session, ctx, params):
+            stats["reused_connections"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_queued_start.append(on_queued_start)
+        trace.on_connection_queued_end.append(on_queued_end)
+        trace.on_connection_create_end.append(on_connection_create)
+        trace.on_connection_reuseconn.append(on_connection_reuse)
+        return trace
+
+    def get_stats(self) -> dict[str, Any]:
+        """Відкриті з'єднання (зайняті/вільні), частка перевикористання та час очікування в черзі пулу."""
+        stats = dict(self._stats)
+        connections = stats["new_connections"] + stats["reused_connections"]
+        stats["reuse_ratio"] = round(stats["reused_connections"] / connections, 3) if connections else None
+        stats["queue_time_ms"] = round(stats["queue_time_ms"], 1)
+        stats["max_queue_time_ms"] = round(stats["max_queue_time_ms"], 1)
+        connector = self._connector
+        # Внутрішні поля aiohttp: якщо зміняться у новій версії, просто не показуємо
+        acquired = getattr(connector, "_acquired", None)
+        idle = getattr(connector, "_conns", None)
+        stats["open_in_use"] = len(acquired) if acquired is not None else None
+        stats["open_idle"] = sum(len(v) for v in idle.values()) if isinstance(idle, dict) else None
+        return stats
+
+
+def _ssl_context():
+    """Як і aiogram, довіряємо сертифікатам certifi, якщо пакет встановлено."""
+    try:
+        import certifi
+    except ImportError:
+        return True
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+async def read_body(resp: aiohttp.ClientResponse, limit: Optional[int] = None) -> bytes:
+    """Читає тіло відповіді, обриваючи читання, якщо воно більше за limit байт."""
+    limit = limit or HttpPool().max_response_bytes
+    if resp.content_length is not None and resp.content_length > limit:
+        raise ResponseTooLarge(f"Response of {resp.content_length} bytes exceeds limit of {limit}")
+    chunks, size = [], 0
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        size += len(chunk)
+        if size > limit:
+            raise ResponseTooLarge(f"Response exceeds limit of {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_json(resp: aiohttp.ClientResponse, limit: Optional[int] = None) -> Any:
+    """read_body + розбір JSON."""
+    return json.loads(await read_body(resp, limit))
+
+
+try:
+    from aiogram.client.session.aiohttp import AiohttpSession
+
+    class SharedAiohttpSession(AiohttpSession):
+        """Сесія aiogram поверх спільного пулу: бот не створює власний конектор і не закриває пул."""
+
+        def __init__(self, pool: HttpPool, **kwargs):
+            super().__init__(**kwargs)
+            self._pool = pool
+
+        async def create_session(self) -> aiohttp.ClientSession:
+            return self._pool.session()
+
+        async def close(self) -> None:
+            # Пулом керує main(): він закривається один раз після зупинки бота
+            pass
+except ImportError: # скрипти без aiogram
+    SharedAiohttpSession = None
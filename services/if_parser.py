@@ -0,0 +1,88 @@
+import logging
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from services.day_grid import SLOTS_PER_DAY, CODE_ON, CODE_OFF, MISSING, DayGrid
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOT_MINUTES = 30
+DAY_MINUTES = 24 * 60
+
+
+def _parse_date(date_str: str) -> Optional[str]:
+    """"28.01.2026" -> "2026-01-28"; None, якщо формат несподіваний."""
+    try:
+        day, month, year = date_str.split(".")
+        return date(int(year), int(month), int(day)).isoformat()
+    except (ValueError, AttributeError):
+        return None
+
+
+def _parse_minutes(time_str: str) -> int:
+    """"06:30" -> 390. Допускає "24:00" (кінець доби) та секунди ("06:30:00")."""
+    parts = time_str.split(":")
+    hours, minutes = int(parts[0]), int(parts[1])
+    total = hours * 60 + minutes
+    if not 0 <= minutes < 60 or not 0 <= total <= DAY_MINUTES:
+        raise ValueError(f"time out of range: {time_str}")
+    return total
+
+
+def _fill(buf: bytearray, start_min: int, end_min: int):
+    """Позначає відключенням усі слоти, які перетинає інтервал [start_min, end_min)."""
+    first = start_min // SLOT_MINUTES
+    last = -(-end_min // SLOT_MINUTES)  # округлення вгору
+    if last > first:
+        buf[first:last] = bytes([CODE_OFF]) * (last - first)
+
+
+def parse_if_schedule(raw_data: list, queue: str) -> Dict[str, DayGrid]:
+    """
+    Перетворює формат ІФ (інтервали відключень) у компактні графіки {дата: DayGrid}.
+    Кожен інтервал одразу переводиться у діапазон індексів слотів і заповнюється зрізом.
+    Слот вважається відключеним, якщо інтервал його хоча б частково перекриває.
+    Інтервал через північ (to <= from, напр. 22:00-02:00) переноситься на наступну дату;
+    якщо цієї дати немає у відповіді, решта її слотів лишається невідомою.
+    """
+    days: Dict[str, bytearray] = {}
+    spills: Dict[str, list] = {}
+
+    for day_data in raw_data or []:
+        iso_date = _parse_date(day_data.get("eventDate"))
+        if not iso_date: continue
+
+        # За замовчуванням світло є; відключення накладаються зверху
+        buf = days.setdefault(iso_date, bytearray([CODE_ON]) * SLOTS_PER_DAY)
+        for interval in (day_data.get("queues") or {}).get(queue) or []:
+            # interval: {"from": "06:00", "to": "10:30", "status": 1}
+            start_str = interval.get("from")
+            end_str = interval.get("to")
+            if not start_str or not end_str: continue
+            try:
+                start_min = _parse_minutes(start_str)
+                end_min = _parse_minutes(end_str)
+            except (ValueError, IndexError) as e:
+                _LOGGER.error(f"Error parsing interval {start_str}-{end_str}: {e}")
+                continue
+
+            if end_min > start_min:
+                _fill(buf, start_min, end_min)
+            elif end_min < start_min:
+                _fill(buf, start_min, DAY_MINUTES)
+                next_date = (date.fromisoformat(iso_date) + timedelta(days=1)).isoformat()
+                spills.setdefault(next_date, []).append(end_min)
+
+    for next_date, ends in spills.items():
+        buf = days.get(next_date)
+        if buf is None:
+            buf = days[next_date] = bytearray([MISSING]) * SLOTS_PER_DAY
+        for end_min in ends:
+            _fill(buf, 0, end_min)
+
+    return {iso_date: DayGrid(bytes(buf)) for iso_date, buf in days.items()}
+
+
+def parse_if_schedule_dict(raw_data: list, queue: str) -> Dict[str, Dict[str, int]]:
+    """Те саме у форматі API: {дата: {"HH:MM": код}}."""
+    return {iso_date: grid.to_api() for iso_date, grid in parse_if_schedule(raw_data, queue).items()}
@@ -1,31 +1,213 @@
 import logging
-from io import BytesIO
-from typing import Dict, Optional, Tuple
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services.image_disk_cache import DiskImageStore
+from services.rendered_image import RENDERER_VERSION, RenderedImage
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def image_cache_key(
+    schedule_hash: str,
+    period: str,
+    label: str,
+    region_name: Optional[str],
+    bot_username: Optional[str]
+) -> str:
+    """
+    Ключ зображень у межах (регіон, черга, режим): хеш графіка та все інше, що намальовано
+    на картинці — період (дата рендера для classic/list, півгодинний слот для dynamic),
+    назва черги, назва регіону, підпис бота та версія рендерерів.
+    Починається з "хеш|", тому clear_queue(keep_hash=...) зберігає записи актуального графіка.
+    """
+    return f"{schedule_hash}|{period}|{label}|{region_name or ''}|{bot_username or ''}|r{RENDERER_VERSION}"
+
+
+def _new_counters() -> Dict[str, int]:
+    return {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0}
+
+
 class ImageCache:
+    """
+    LRU-кеш відрендерених зображень (region, queue, mode, key) -> List[RenderedImage],
+    де key будує image_cache_key
+    з обмеженням за сумарним розміром у байтах та опційним TTL.
+    Якщо задано disk_path, під ним працює дисковий рівень (DiskImageStore): промах у пам'яті
+    шукається на диску, тож після перезапуску бот одразу віддає вже відрендерені зображення.
+    Рахує влучання, промахи, витіснення та зайняті байти — загалом і по (регіон, режим).
+    """
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(ImageCache, cls).__new__(cls)
-            cls._instance._cache = {} # (region, queue, mode, hash) -> List[BytesIO]
+            cls._instance._initialized = False
         return cls._instance
 
-    def get(self, region: str, queue: str, mode: str, schedule_hash: str) -> Optional[list]:
-        key = (region, queue, mode, schedule_hash)
-        return self._cache.get(key)
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        if self._initialized:
+            return
+        self._max_bytes = max_bytes
+        self._ttl = ttl or None
+        self._disk: Optional[DiskImageStore] = None
+        if disk_path:
+            try:
+                self._disk = DiskImageStore(disk_path, **({"max_bytes": disk_max_bytes} if disk_max_bytes else {}))
+            except OSError as e:
+                _LOGGER.warning(f"Image disk cache at {disk_path} is unavailable, using memory only: {e}")
+        # key -> (images, size, expires_at)
+        self._cache: "OrderedDict[Tuple[str, str, str, str], Tuple[List[RenderedImage], int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._expired = 0
+        self._rejected = 0
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(_new_counters)
+        # Вторинні індекси: інвалідація пропорційна кількості видалених записів, а не розміру кешу
+        self._by_region: Dict[str, Set[Tuple[str, str, str, str]]] = defaultdict(set)
+        self._by_queue: Dict[Tuple[str, str], Set[Tuple[str, str, str, str]]] = defaultdict(set)
+        self._by_mode: Dict[str, Set[Tuple[str, str, str, str]]] = defaultdict(set)
+        self._initialized = True
+
+    async def get(self, region: str, queue: str, mode: str, cache_key: str) -> Optional[List[RenderedImage]]:
+        key = (region, queue, mode, cache_key)
+        counters = self._counters[(region, mode)]
+        entry = self._cache.get(key)
+        if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+            self._remove(key)
+            self._expired += 1
+            entry = None
+        if entry is None:
+            images = await self._disk.get(key) if self._disk else None
+            if images is None:
+                counters["misses"] += 1
+                return None
+            self._store(key, images)
+            counters["disk_hits"] += 1
+            return images
+        self._cache.move_to_end(key)
+        counters["hits"] += 1
+        return entry[0]
+
+    def has(self, region: str, queue: str, mode: str, cache_key: str) -> bool:
+        """Перевірка наявності без впливу на статистику та порядок LRU."""
+        key = (region, queue, mode, cache_key)
+        entry = self._cache.get(key)
+        if entry is not None and (entry[2] is None or entry[2] > time.monotonic()):
+            return True
+        return bool(self._disk and self._disk.has(key))
+
+    async def set(self, region: str, queue: str, mode: str, cache_key: str, images: List[RenderedImage]):
+        key = (region, queue, mode, cache_key)
+        self._store(key, images)
+        if self._disk:
+            await self._disk.put(key, images, self._ttl)
+
+    async def close(self):
+        """Записує відкладені зміни дискового рівня (при зупинці бота)."""
+        if self._disk:
+            await self._disk.close()
 
-    def set(self, region: str, queue: str, mode: str, schedule_hash: str, images: list):
-        key = (region, queue, mode, schedule_hash)
-        self._cache[key] = images
-        _LOGGER.debug(f"Cached images for {region}/{queue} ({mode})")
+    def _store(self, key: Tuple[str, str, str, str], images: List[RenderedImage]):
+        region, queue, mode, _ = key
+        size = sum(img.size for img in images)
+        if size > self._max_bytes:
+            # Одне зображення більше за весь бюджет: не кешуємо, щоб не витіснити все інше
+            self._rejected += 1
+            _LOGGER.warning(f"Images for {region}/{queue} ({mode}) are {size} bytes, larger than cache budget")
+            return
+        if key in self._cache:
+            self._remove(key)
+        expires_at = time.monotonic() + self._ttl if self._ttl else None
+        self._cache[key] = (images, size, expires_at)
+        self._by_region[region].add(key)
+        self._by_queue[(region, queue)].add(key)
+        self._by_mode[mode].add(key)
+        self._bytes += size
+        counters = self._counters[(region, mode)]
+        counters["entries"] += 1
+        counters["bytes"] += size
+        _LOGGER.debug(f"Cached images for {region}/{queue} ({mode}), {size} bytes")
+
+        while self._bytes > self._max_bytes:
+            old_key = next(iter(self._cache))
+            self._remove(old_key)
+            self._counters[(old_key[0], old_key[2])]["evictions"] += 1
+
+    def _remove(self, key: Tuple[str, str, str, str]):
+        region, queue, mode, _ = key
+        _, size, _ = self._cache.pop(key)
+        self._bytes -= size
+        counters = self._counters[(region, mode)]
+        counters["entries"] -= 1
+        counters["bytes"] -= size
+        for index, index_key in ((self._by_region, region), (self._by_queue, (region, queue)), (self._by_mode, mode)):
+            keys = index[index_key]
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
 
     def clear_region(self, region: str):
         """Видаляє всі зображення для конкретного регіону (при оновленні графіку)."""
-        keys_to_remove = [k for k in self._cache.keys() if k[0] == region]
+        keys_to_remove = list(self._by_region.get(region, ()))
         for k in keys_to_remove:
-            del self._cache[k]
+            self._remove(k)
+        if self._disk:
+            self._disk.remove_region(region)
         if keys_to_remove:
             _LOGGER.info(f"Cleared {len(keys_to_remove)} cached images for region {region}")
+
+    def clear_queue(self, region: str, queue: str, keep_hash: Optional[str] = None) -> int:
+        """
+        Видаляє зображення однієї черги. Якщо задано keep_hash, лишаються записи цього графіка:
+        ключ дорівнює keep_hash або починається з "keep_hash|" (див. image_cache_key).
+        """
+        def stale(key) -> bool:
+            return keep_hash is None or (key[3] != keep_hash and not key[3].startswith(f"{keep_hash}|"))
+
+        keys_to_remove = [k for k in self._by_queue.get((region, queue), ()) if stale(k)]
+        for k in keys_to_remove:
+            self._remove(k)
+        if self._disk:
+            self._disk.remove_queue(region, queue, stale)
+        if keys_to_remove:
+            _LOGGER.debug(f"Cleared {len(keys_to_remove)} cached images for {region}/{queue}")
+        return len(keys_to_remove)
+
+    def clear_mode(self, mode: str):
+        """Видаляє всі зображення одного режиму (напр. dynamic попереднього півгодинного слоту)."""
+        keys_to_remove = list(self._by_mode.get(mode, ()))
+        for k in keys_to_remove:
+            self._remove(k)
+        if self._disk:
+            self._disk.remove_mode(mode)
+        if keys_to_remove:
+            _LOGGER.info(f"Cleared {len(keys_to_remove)} cached {mode} images")
+
+    def get_stats(self, detailed: bool = True) -> dict[str, Any]:
+        """Загальні лічильники та (detailed=True) розбивка по "регіон/режим" (лише ненульові)."""
+        totals = _new_counters()
+        by_region_mode = {}
+        for (region, mode), counters in self._counters.items():
+            for name, value in counters.items():
+                totals[name] += value
+            if detailed and any(counters.values()):
+                by_region_mode[f"{region}/{mode}"] = dict(counters)
+        lookups = totals["hits"] + totals["disk_hits"] + totals["misses"]
+        return {
+            **totals,
+            "max_bytes": self._max_bytes,
+            "expired": self._expired,
+            "rejected": self._rejected,
+            "hit_ratio": round((totals["hits"] + totals["disk_hits"]) / lookups, 3) if lookups else None,
+            **({"disk": self._disk.get_stats()} if self._disk else {}),
+            **({"by_region_mode": by_region_mode} if detailed else {})
+        }
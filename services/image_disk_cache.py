@@ -0,0 +1,369 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from services.atomic_file import atomic_write
+from services.rendered_image import RenderedImage
+
+_LOGGER = logging.getLogger(__name__)
+
+# 2 — ключі з датою рендера, назвою черги, підписами та версією рендерерів (image_cache_key)
+INDEX_VERSION = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Через скільки секунд після зміни індекс записується на диск (зміни за цей час об'єднуються)
+DEFAULT_FLUSH_DELAY = 5.0
+
+
+def _key_str(key: Tuple[str, ...]) -> str:
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+class DiskImageStore:
+    """
+    Дисковий рівень кешу зображень, що переживає перезапуск.
+    - PNG зберігаються за хешем вмісту (blobs/ab/<blake2b>.png): однакові зображення
+      різних ключів займають місце один раз;
+    - index.json зіставляє ключ кешу зі списком хешів; на старті читається лише він;
+    - запис атомарний (тимчасовий файл + os.replace); метадані зображень (час і тривалість
+      рендера) зберігаються в індексі поруч із хешами;
+    - сумарний розмір обмежений max_bytes, витісняються найдавніше використані ключі;
+    - читання та запис файлів ідуть у потоці (asyncio.to_thread), а індекс лише позначається
+      зміненим і записується не частіше ніж раз на flush_delay секунд разом із видаленням
+      звільнених файлів (та при close()).
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, flush_delay: float = DEFAULT_FLUSH_DELAY):
+        self._path = path
+        self._blob_dir = os.path.join(path, "blobs")
+        self._index_path = os.path.join(path, "index.json")
+        self._max_bytes = max_bytes
+        # ключ (JSON-рядок) -> {"blobs": [digest...], "expires": epoch|None, "meta": [{...}...]}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._blob_sizes: Dict[str, int] = {}
+        self._blob_refs: Dict[str, int] = {}
+        # ключ (JSON-рядок) -> кортеж (регіон, черга, режим, ключ зображень), розібраний один раз
+        self._keys: Dict[str, Tuple[str, ...]] = {}
+        # Вторинні індекси, як у кеші в пам'яті: інвалідація без перебору всього індексу
+        self._by_region: Dict[str, Set[str]] = defaultdict(set)
+        self._by_queue: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._by_mode: Dict[str, Set[str]] = defaultdict(set)
+        self._bytes = 0
+        self._flush_delay = flush_delay
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        # Файли, що вже не в індексі, але ще на диску: видаляються під час запису індексу
+        self._pending_deletes: Set[str] = set()
+        # Впорядковує запис файлів відносно видалення: файл зі списку на видалення ще на диску
+        self._io_lock = asyncio.Lock()
+        self._stats = {"reads": 0, "writes": 0, "evictions": 0, "errors": 0, "index_writes": 0}
+        self._orphans_swept = False
+        self._sweep_task: Optional[asyncio.Task] = None
+        os.makedirs(self._blob_dir, exist_ok=True)
+        self._load_index()
+        try:
+            self._sweep_task = asyncio.get_running_loop().create_task(self._sweep_orphans())
+        except RuntimeError:
+            # Поза циклом подій — прибирання виконає перший flush()
+            pass
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest[:2], f"{digest}.png")
+
+    def _load_index(self):
+        started = time.perf_counter()
+        index = self._read_index()
+        if index is not None:
+            self._load_entries(index)
+        _LOGGER.info(
+            f"Image disk cache: {len(self._entries)} entries, {self._bytes} bytes indexed "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"Image disk cache index {self._index_path} is unreadable, starting empty: {e}")
+            return None
+        if index.get("version") != INDEX_VERSION:
+            _LOGGER.info("Image disk cache index has another version, starting empty")
+            return None
+        return index
+
+    def _load_entries(self, index: Dict[str, Any]):
+        self._blob_sizes = {d: int(size) for d, size in index.get("blobs", {}).items()}
+        now = time.time()
+        for key_str, entry in index.get("entries", []):
+            if entry.get("expires") is not None and entry["expires"] <= now:
+                continue
+            if all(d in self._blob_sizes for d in entry["blobs"]):
+                self._add_entry(key_str, tuple(json.loads(key_str)), entry)
+        # Файли, на які вже не посилається жоден ключ (напр. після закінчення TTL), прибирає _sweep_orphans
+        for digest in [d for d in self._blob_sizes if d not in self._blob_refs]:
+            del self._blob_sizes[digest]
+            self._dirty = True
+
+    async def _sweep_orphans(self):
+        """
+        Прибирання після старту: обхід blobs/ іде у потоці й не затримує запуск бота.
+        Під _io_lock, тож нові файли не з'являються, поки обхід триває.
+        """
+        async with self._io_lock:
+            if self._orphans_swept:
+                return
+            self._orphans_swept = True
+            started = time.perf_counter()
+            # Файли зі списку на видалення ще можуть знадобитися put() — їх прибере flush()
+            keep = set(self._blob_sizes) | self._pending_deletes
+            try:
+                removed, errors = await asyncio.to_thread(self._remove_orphans, keep)
+            except OSError as e:
+                self._stats["errors"] += 1
+                _LOGGER.warning(f"Failed to sweep orphaned cached images: {e}")
+                return
+            self._stats["errors"] += errors
+        _LOGGER.info(f"Image disk cache: {removed} orphaned file(s) removed in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def _remove_orphans(self, keep: Set[str]) -> Tuple[int, int]:
+        """
+        Виконується у потоці. Видаляє з blobs/ файли, яких немає в keep: збій між записом
+        файлу та індексу (або недописаний тимчасовий файл) інакше лишав би їх на диску назавжди.
+        Повертає (кількість видалених файлів, кількість помилок).
+        """
+        removed = errors = 0
+        for dir_path, _, file_names in os.walk(self._blob_dir):
+            for name in file_names:
+                digest, ext = os.path.splitext(name)
+                if ext == ".png" and digest in keep and dir_path == os.path.dirname(self._blob_path(digest)):
+                    continue
+                try:
+                    os.unlink(os.path.join(dir_path, name))
+                    removed += 1
+                except OSError as e:
+                    errors += 1
+                    _LOGGER.warning(f"Failed to delete orphaned cached image {name}: {e}")
+        # Недописані тимчасові файли індексу
+        for name in os.listdir(self._path):
+            if name.startswith(".index_"):
+                try:
+                    os.unlink(os.path.join(self._path, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed, errors
+
+    def _mark_dirty(self):
+        """Індекс змінено: запис відкладається, щоб серія змін дала один запис."""
+        self._dirty = True
+        if self._flush_task is None:
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # Поза циклом подій (напр. під час старту) — запишемо при наступній зміні чи close()
+                pass
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self._flush_delay)
+        finally:
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """Записує індекс (якщо він змінився) і видаляє звільнені файли."""
+        if not self._orphans_swept:
+            await self._sweep_orphans()
+        async with self._io_lock:
+            if not self._dirty and not self._pending_deletes:
+                return
+            # Знімок — лише копії посилань: записи індексу після додавання не змінюються,
+            # тому серіалізація та запис ідуть у потоці, не блокуючи цикл подій
+            index = {
+                "version": INDEX_VERSION,
+                "blobs": dict(self._blob_sizes),
+                # Порядок списку — порядок LRU (від найдавнішого)
+                "entries": list(self._entries.items())
+            }
+            deletes = [d for d in self._pending_deletes if d not in self._blob_sizes]
+            self._pending_deletes.clear()
+            self._dirty = False
+            try:
+                errors = await asyncio.to_thread(self._write_index, index, deletes)
+            except OSError as e:
+                self._stats["errors"] += 1
+                self._dirty = True
+                self._pending_deletes.update(deletes)
+                _LOGGER.warning(f"Failed to write image disk cache index: {e}")
+                return
+            self._stats["index_writes"] += 1
+            self._stats["errors"] += errors
+
+    def _write_index(self, index: Dict[str, Any], deletes: List[str]) -> int:
+        """Виконується у потоці. Файли видаляються лише після запису індексу без них."""
+        atomic_write(self._index_path, json.dumps(index, ensure_ascii=False).encode("utf-8"), ".index_")
+        errors = 0
+        for digest in deletes:
+            try:
+                os.unlink(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                errors += 1
+                _LOGGER.warning(f"Failed to delete cached image {digest}: {e}")
+        return errors
+
+    async def close(self):
+        """Скасовує відкладений запис і записує індекс одразу (при зупинці бота)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    def _add_entry(self, key_str: str, key: Tuple[str, ...], entry: Dict[str, Any]):
+        self._entries[key_str] = entry
+        self._keys[key_str] = key
+        region, queue, mode = key[:3]
+        self._by_region[region].add(key_str)
+        self._by_queue[(region, queue)].add(key_str)
+        self._by_mode[mode].add(key_str)
+        for digest in entry["blobs"]:
+            if self._blob_refs.get(digest, 0) == 0:
+                self._bytes += self._blob_sizes[digest]
+            self._blob_refs[digest] = self._blob_refs.get(digest, 0) + 1
+
+    def _drop_entry(self, key_str: str, release: bool = True):
+        entry = self._entries.pop(key_str)
+        if release:
+            self._release(entry["blobs"])
+        region, queue, mode = self._keys.pop(key_str)[:3]
+        for index, index_key in ((self._by_region, region), (self._by_queue, (region, queue)), (self._by_mode, mode)):
+            keys = index[index_key]
+            keys.discard(key_str)
+            if not keys:
+                del index[index_key]
+
+    def _release(self, blobs: List[str]):
+        for digest in blobs:
+            self._blob_refs[digest] -= 1
+            if self._blob_refs[digest] == 0:
+                del self._blob_refs[digest]
+                self._bytes -= self._blob_sizes.pop(digest)
+                self._pending_deletes.add(digest)
+
+    def _read_blobs(self, digests: List[str], meta: List[Dict[str, Any]]) -> List[RenderedImage]:
+        """Виконується у потоці. Одне читання у bytes при підйомі в пам'ять; далі зображення ділиться без копій."""
+        images = []
+        for digest, m in zip(digests, meta):
+            with open(self._blob_path(digest), "rb") as f:
+                images.append(RenderedImage(f.read(), rendered_at=m.get("rendered_at"), render_ms=m.get("render_ms"), digest=digest))
+        return images
+
+    def _write_blobs(self, images: List[RenderedImage]):
+        """Виконується у потоці."""
+        for image in images:
+            atomic_write(self._blob_path(image.digest), image.data, ".blob_")
+
+    def has(self, key: Tuple[str, ...]) -> bool:
+        entry = self._entries.get(_key_str(key))
+        return entry is not None and (entry.get("expires") is None or entry["expires"] > time.time())
+
+    async def get(self, key: Tuple[str, ...]) -> Optional[List[RenderedImage]]:
+        key_str = _key_str(key)
+        entry = self._entries.get(key_str)
+        if entry is None:
+            return None
+        if entry.get("expires") is not None and entry["expires"] <= time.time():
+            self._drop_entry(key_str)
+            self._mark_dirty()
+            return None
+        try:
+            meta = entry.get("meta") or [{}] * len(entry["blobs"])
+            images = await asyncio.to_thread(self._read_blobs, entry["blobs"], meta)
+        except (OSError, ValueError) as e:
+            # Файл видалено або пошкоджено ззовні — забуваємо ключ (якщо його не замінили, поки читали)
+            self._stats["errors"] += 1
+            _LOGGER.warning(f"Cached image for {key} is unreadable, dropping it: {e}")
+            if self._entries.get(key_str) is entry:
+                self._drop_entry(key_str)
+                self._mark_dirty()
+            return None
+        if self._entries.get(key_str) is entry:
+            self._entries.move_to_end(key_str)
+        self._stats["reads"] += 1
+        return images
+
+    async def put(self, key: Tuple[str, ...], images: List[RenderedImage], ttl: Optional[float] = None):
+        key_str = _key_str(key)
+        async with self._io_lock:
+            # Повтор: поки файли пишуться, інвалідація могла звільнити вже наявні
+            while True:
+                missing = {}
+                for image in images:
+                    digest = image.digest
+                    if digest in self._blob_sizes:
+                        continue
+                    if digest in self._pending_deletes:
+                        # Видалення відбувається лише під _io_lock, тож файл ще на диску
+                        self._pending_deletes.discard(digest)
+                        self._blob_sizes[digest] = image.size
+                    else:
+                        missing[digest] = image
+                if not missing:
+                    break
+                try:
+                    await asyncio.to_thread(self._write_blobs, list(missing.values()))
+                except OSError as e:
+                    self._stats["errors"] += 1
+                    _LOGGER.warning(f"Failed to write cached image for {key}: {e}")
+                    return
+                for digest, image in missing.items():
+                    self._blob_sizes[digest] = image.size
+            digests = [image.digest for image in images]
+            # Старий запис звільняється після додавання нового, щоб спільні файли не видалилися
+            previous = self._entries.get(key_str)
+            if previous is not None:
+                self._drop_entry(key_str, release=False)
+            self._add_entry(key_str, key, {
+                "blobs": digests,
+                "expires": time.time() + ttl if ttl else None,
+                "meta": [image.meta() for image in images]
+            })
+            if previous is not None:
+                self._release(previous["blobs"])
+        self._stats["writes"] += 1
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            self._drop_entry(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+        self._mark_dirty()
+
+    def _remove_keys(self, keys: List[str]) -> int:
+        for key_str in keys:
+            self._drop_entry(key_str)
+        if keys:
+            self._mark_dirty()
+        return len(keys)
+
+    def remove_region(self, region: str) -> int:
+        return self._remove_keys(list(self._by_region.get(region, ())))
+
+    def remove_queue(self, region: str, queue: str, predicate: Optional[Callable[[tuple], bool]] = None) -> int:
+        keys = self._by_queue.get((region, queue), ())
+        return self._remove_keys([k for k in keys if predicate is None or predicate(self._keys[k])])
+
+    def remove_mode(self, mode: str) -> int:
+        return self._remove_keys(list(self._by_mode.get(mode, ())))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes
+        }
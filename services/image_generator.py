@@ -1,10 +1,11 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
 from io import BytesIO
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
+from services.day_grid import DayGrid
+from services.list_renderer import ListViewRenderer
+from services.ring_renderer import render_ring
+
 # Кольори для графіків
 COLOR_ON = "#4CAF50"      # Green
 COLOR_OFF = "#D32F2F"     # Red (Darker)
@@ -85,72 +86,7 @@ def _generate_circle_view(
         "unknown": COLOR_UNKNOWN
     }
     colors = [color_map.get(s, COLOR_UNKNOWN) for s in display_data]
-    sizes = [1] * 48
-
-    fig = plt.figure(figsize=(8, 8))
-    # Максимально збільшуємо графік, щоб він займав майже весь простір
-    ax = fig.add_axes([0.01, 0.01, 0.98, 0.98], projection=None, aspect='equal')
-    
-    # Малюємо кільце з 48 сегментів, але БЕЗ автоматичних ліній
-    ax.pie(sizes, colors=colors, startangle=90, counterclock=False, 
-           wedgeprops=dict(width=0.4, edgecolor='none', linewidth=0))
-
-    # Додаємо розділювачі годин вручну (тільки 24 лінії, кожні 2 сегменти)
-    for i in range(24):
-        angle = 90 - i * 15
-        r_in, r_out = 0.6, 1.0
-        x_in = r_in * np.cos(np.radians(angle))
-        y_in = r_in * np.sin(np.radians(angle))
-        x_out = r_out * np.cos(np.radians(angle))
-        y_out = r_out * np.sin(np.radians(angle))
-        ax.plot([x_in, x_out], [y_in, y_out], color='w', linewidth=0.8, zorder=3)
-
-    # Додаємо цифри годин (всі 24 години)
-    for i in range(24):
-        angle = 90 - (i * 15 + 7.5) 
-        r = 0.8 
-        x = r * np.cos(np.radians(angle))
-        y = r * np.sin(np.radians(angle))
-        ax.text(x, y, f"{i:02d}", ha='center', va='center', 
-                fontsize=11, fontweight='bold', color=COLOR_TEXT_WHITE)
-
-    # Стрілка поточного часу
-    if show_time_marker:
-        current_angle = 90 - (current_dt.hour * 15 + current_dt.minute * 0.25)
-        r_start, r_end = 0.55, 1.05
-        x_s = r_start * np.cos(np.radians(current_angle))
-        y_s = r_start * np.sin(np.radians(current_angle))
-        x_e = r_end * np.cos(np.radians(current_angle))
-        y_e = r_end * np.sin(np.radians(current_angle))
-        ax.plot([x_s, x_e], [y_s, y_e], color='#2196F3', linewidth=4, solid_capstyle='round', zorder=5)
-        ax.scatter([x_e], [y_e], color='#2196F3', s=100, edgecolors='white', linewidth=2, zorder=6)
-
-    # Розділювач опівночі (00:00) - завжди вгорі
-    mx_s, mx_e = 0.55, 1.05
-    ax.plot([0, 0], [mx_s, mx_e], color='white', linewidth=4, zorder=10)
-    
-    # Центр
-    ax.text(0, 0.15, queue_id, ha='center', va='center', fontsize=20, fontweight='bold')
-    
-    
-    ax.text(0, -0.1, title, ha='center', va='center', fontsize=14, fontweight='bold', color='#555555')
-    ax.text(0, -0.25, f"{current_dt.strftime('%d.%m.%Y')}", ha='center', va='center', fontsize=10, color='grey')
-
-    if region_name:
-        # Додаємо заголовок зверху (трохи вище, щоб не наповзало)
-        plt.text(0.5, 0.99, region_name, ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=fig.transFigure, 
-                 bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
-    
-    if bot_username:
-        # Переносимо в самий нижній кут з невеликою підкладкою для читабельності
-        plt.text(0.99, 0.01, f"@{bot_username.replace('@', '')}", ha='right', va='bottom', fontsize=9, color='grey', transform=fig.transFigure,
-                 bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
-
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=120)
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+    return render_ring(colors, current_dt, queue_id, title, show_time_marker, region_name, bot_username)
 
 def _generate_list_view(
     half_list: List[str], 
@@ -175,84 +111,14 @@ def _generate_list_view(
     if start_time is not None:
         intervals.append((start_time, 48))
 
-    # Розрахунок висоти (завжди квадрат 8x8)
-    fig = plt.figure(figsize=(8, 8))
-    ax = fig.add_axes([0.05, 0.05, 0.9, 0.9])
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    ax.set_axis_off()
-
-    # Заголовок регіону (самий верх)
-    if region_name:
-        plt.text(0.5, 0.97, region_name, ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=ax.transAxes)
-    
-    # Підзаголовок
-    plt.text(0.5, 0.90, f"Графік відключень • {title}", ha='center', va='top', fontsize=14, fontweight='bold', color='#555555', transform=ax.transAxes)
-    
-    y_pos = 0.65 # Починаємо нижче, щоб не наповзало на заголовок
-    
-    if not intervals:
-        plt.text(0.5, 0.45, f"{current_dt.strftime('%d.%m.%Y')}\nВідключень не заплановано", 
-                 ha='center', va='center', fontsize=16, color='green', fontweight='bold', transform=ax.transAxes)
-    else:
-        # Дата (вище першого інтервалу)
-        plt.text(0.05, y_pos + 0.12, f"{current_dt.strftime('%d.%m.%Y')}", fontsize=14, fontweight='bold', color='#333333', transform=ax.transAxes)
-        
-        # Динамічний крок залежно від кількості інтервалів
-        step = min(0.14, 0.50 / len(intervals)) if intervals else 0.15
-        
-        for start, end in intervals:
-            s_h, s_m = divmod(start * 30, 60)
-            e_h, e_m = divmod(end * 30, 60)
-            if e_h == 24: e_h, e_m = 0, 0
-            
-            duration_min = (end - start) * 30
-            dur_h, dur_m = divmod(duration_min, 60)
-            dur_str = f"{dur_h} год" + (f" {dur_m} хв" if dur_m else "")
-
-            # Динамічний розмір плашки та шрифту
-            box_h = min(0.12, 0.5 / len(intervals)) if intervals else 0.08
-            font_s = 18 if len(intervals) <= 3 else 16
-            
-            # Плашка інтервалу
-            rect = patches.FancyBboxPatch((0.05, y_pos - box_h/2), 0.6, box_h, 
-                                          facecolor='#C2185B', edgecolor='none', 
-                                          boxstyle='round,pad=0.02', transform=ax.transAxes)
-            ax.add_patch(rect)
-            
-            plt.text(0.15, y_pos, f"{s_h:02d}:{s_m:02d}", color='white', fontsize=font_s, fontweight='bold', ha='center', va='center', transform=ax.transAxes)
-            plt.text(0.35, y_pos, "———", color='white', fontsize=font_s, ha='center', va='center', transform=ax.transAxes)
-            plt.text(0.55, y_pos, f"{e_h:02d}:{e_m:02d}", color='white', fontsize=font_s, fontweight='bold', ha='center', va='center', transform=ax.transAxes)
-            
-            # Тривалість
-            plt.text(0.75, y_pos, dur_str, color='#C2185B', fontsize=font_s - 2, fontweight='bold', 
-                     ha='left', va='center', bbox=dict(facecolor='white', edgecolor='#C2185B', boxstyle='round,pad=0.3'), transform=ax.transAxes)
-            
-            y_pos -= step * 1.2 if len(intervals) <= 3 else step
-            
-    # Номер черги в нижньому правому куті (піднято, щоб не заважати тегу)
-    plt.text(0.95, 0.12, f"{queue_id}", ha='right', va='bottom', fontsize=16, fontweight='bold', 
-             bbox=dict(facecolor=COLOR_ACCENT, alpha=0.8, edgecolor='none', boxstyle='round,pad=0.5'), color='white',
-             transform=ax.transAxes)
-
-    if show_time_marker:
-        plt.text(0.01, 0.01, f"Станом на {current_dt.strftime('%H:%M')}", fontsize=9, color='grey', transform=ax.transAxes, ha='left', va='bottom')
-
-    if bot_username:
-        # Вирівнюємо по горизонталі з "Станом на"
-        plt.text(0.99, 0.01, f"@{bot_username.replace('@', '')}", ha='right', va='bottom', fontsize=9, color='grey', transform=ax.transAxes,
-                 bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
-
-    buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=120)
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+    return ListViewRenderer().render(intervals, current_dt, queue_id, title, show_time_marker, region_name, bot_username)
 
-def convert_api_to_half_list(day_schedule: dict) -> List[str]:
+def convert_api_to_half_list(day_schedule) -> List[str]:
     """
-    Перетворює словник API {"00:00": 1, ...} у список з 48 елементів.
+    Перетворює словник API {"00:00": 1, ...} або компактний DayGrid у список з 48 елементів.
     """
+    if isinstance(day_schedule, DayGrid):
+        return day_schedule.to_half_list()
     res = []
     for h in range(24):
         for m in (0, 30):
@@ -0,0 +1,42 @@
+from collections import deque
+from typing import Any, Optional
+
+
+class LatencyTracker:
+    """
+    Ковзне вікно останніх запитів до джерела: затримка (мс) та успішність.
+    Використовується, щоб обирати затримку хеджування і віддавати перевагу
+    швидшому надійному джерелу.
+    """
+
+    def __init__(self, window: int = 100):
+        self._samples: deque[tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency_ms: float, ok: bool):
+        self._samples.append((latency_ms, ok))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-й перцентиль (0..1) затримки успішних запитів або None, якщо їх немає."""
+        ordered = sorted(ms for ms, ok in self._samples if ok)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        return sum(1 for _, ok in self._samples if ok) / len(self._samples)
+
+    def snapshot(self) -> dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        rate = self.success_rate
+        return {
+            "samples": len(self._samples),
+            "p50_ms": round(p50) if p50 is not None else None,
+            "p95_ms": round(p95) if p95 is not None else None,
+            "success_rate": round(rate, 2) if rate is not None else None
+        }
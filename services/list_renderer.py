@@ -0,0 +1,160 @@
+import threading
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+import matplotlib.patches as patches
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from services.ring_renderer import encode_png
+
+# Розмір і роздільність, як у _generate_list_view (8x8 дюймів, dpi=120)
+DEFAULT_SIZE_IN = 8
+DEFAULT_DPI = 120
+# Скільки плашок інтервалів створюється заздалегідь; більше — добудовуються при потребі
+DEFAULT_SLOTS = 8
+INTERVAL_COLOR = "#C2185B"
+ACCENT_COLOR = "#FF6D00"
+
+
+class _IntervalSlot:
+    """Плашка одного інтервалу: прямокутник, початок, тире, кінець і тривалість."""
+
+    def __init__(self, ax):
+        common = dict(color='white', ha='center', va='center', transform=ax.transAxes, visible=False)
+        self.rect = patches.FancyBboxPatch((0.05, 0), 0.6, 0.1, facecolor=INTERVAL_COLOR, edgecolor='none',
+                                           boxstyle='round,pad=0.02', transform=ax.transAxes, visible=False)
+        ax.add_patch(self.rect)
+        self.start = ax.text(0.15, 0, "", fontweight='bold', **common)
+        self.dash = ax.text(0.35, 0, "———", **common)
+        self.end = ax.text(0.55, 0, "", fontweight='bold', **common)
+        self.duration = ax.text(0.75, 0, "", color=INTERVAL_COLOR, fontweight='bold', ha='left', va='center',
+                                bbox=dict(facecolor='white', edgecolor=INTERVAL_COLOR, boxstyle='round,pad=0.3'),
+                                transform=ax.transAxes, visible=False)
+        self.artists = (self.rect, self.start, self.dash, self.end, self.duration)
+
+    def show(self, y_pos: float, box_h: float, font_s: int, start: str, end: str, duration: str):
+        self.rect.set_bounds(0.05, y_pos - box_h / 2, 0.6, box_h)
+        for text, value in ((self.start, start), (self.end, end), (self.duration, duration)):
+            text.set_text(value)
+        for text in (self.start, self.dash, self.end):
+            text.set_y(y_pos)
+            text.set_fontsize(font_s)
+        self.duration.set_y(y_pos)
+        self.duration.set_fontsize(font_s - 2)
+        for artist in self.artists:
+            artist.set_visible(True)
+
+    def hide(self):
+        for artist in self.artists:
+            artist.set_visible(False)
+
+
+class ListViewRenderer:
+    """
+    Рендер картки зі списком відключень на одній постійній фігурі.
+    Фігура, осі та всі написи створюються один раз на процес; між рендерами змінюються
+    лише тексти, видимість, позиції та розміри шрифтів (ті самі правила розкладки, що й раніше).
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ListViewRenderer, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, slots: int = DEFAULT_SLOTS, size_in: float = DEFAULT_SIZE_IN, dpi: int = DEFAULT_DPI):
+        if self._initialized:
+            return
+        # Фігура спільна для всього процесу: у режимі рендера в потоках рендери серіалізуються
+        self._lock = threading.Lock()
+        self._fig = Figure(figsize=(size_in, size_in), dpi=dpi)
+        FigureCanvasAgg(self._fig)
+        ax = self._fig.add_axes([0.05, 0.05, 0.9, 0.9])
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.set_axis_off()
+        self._ax = ax
+
+        self._region = ax.text(0.5, 0.97, "", ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=ax.transAxes)
+        self._subtitle = ax.text(0.5, 0.90, "", ha='center', va='top', fontsize=14, fontweight='bold', color='#555555', transform=ax.transAxes)
+        self._empty = ax.text(0.5, 0.45, "", ha='center', va='center', fontsize=16, color='green', fontweight='bold', transform=ax.transAxes)
+        self._date = ax.text(0.05, 0.77, "", fontsize=14, fontweight='bold', color='#333333', transform=ax.transAxes)
+        self._slots: List[_IntervalSlot] = [_IntervalSlot(ax) for _ in range(slots)]
+        self._queue = ax.text(0.95, 0.12, "", ha='right', va='bottom', fontsize=16, fontweight='bold',
+                              bbox=dict(facecolor=ACCENT_COLOR, alpha=0.8, edgecolor='none', boxstyle='round,pad=0.5'), color='white',
+                              transform=ax.transAxes)
+        self._marker = ax.text(0.01, 0.01, "", fontsize=9, color='grey', transform=ax.transAxes, ha='left', va='bottom')
+        self._watermark = ax.text(0.99, 0.01, "", ha='right', va='bottom', fontsize=9, color='grey', transform=ax.transAxes,
+                                  bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
+        self._initialized = True
+
+    def render(
+        self,
+        intervals: List[Tuple[int, int]],
+        current_dt: datetime,
+        queue_id: str,
+        title: str = "Сьогодні",
+        show_time_marker: bool = True,
+        region_name: Optional[str] = None,
+        bot_username: Optional[str] = None
+    ) -> BytesIO:
+        """intervals — пари (початковий, кінцевий) індексів півгодинних слотів відключення."""
+        with self._lock:
+            self._layout(intervals, current_dt, queue_id, title, show_time_marker, region_name, bot_username)
+            self._fig.canvas.draw()
+            rgba = np.asarray(self._fig.canvas.buffer_rgba())
+            buf = BytesIO(encode_png(rgba[..., :3]))
+        buf.seek(0)
+        return buf
+
+    def _layout(self, intervals, current_dt, queue_id, title, show_time_marker, region_name, bot_username):
+        _set(self._region, region_name)
+        _set(self._subtitle, f"Графік відключень • {title}")
+
+        y_pos = 0.65 # Починаємо нижче, щоб не наповзало на заголовок
+        date_str = current_dt.strftime('%d.%m.%Y')
+        if not intervals:
+            _set(self._empty, f"{date_str}\nВідключень не заплановано")
+            _set(self._date, None)
+        else:
+            _set(self._empty, None)
+            _set(self._date, date_str)
+            self._date.set_y(y_pos + 0.12)
+
+        while len(self._slots) < len(intervals):
+            self._slots.append(_IntervalSlot(self._ax))
+
+        if intervals:
+            # Динамічний крок, розмір плашки та шрифту залежно від кількості інтервалів
+            step = min(0.14, 0.50 / len(intervals))
+            box_h = min(0.12, 0.5 / len(intervals))
+            font_s = 18 if len(intervals) <= 3 else 16
+        for i, slot in enumerate(self._slots):
+            if i >= len(intervals):
+                slot.hide()
+                continue
+            start, end = intervals[i]
+            s_h, s_m = divmod(start * 30, 60)
+            e_h, e_m = divmod(end * 30, 60)
+            if e_h == 24: e_h, e_m = 0, 0
+            dur_h, dur_m = divmod((end - start) * 30, 60)
+            dur_str = f"{dur_h} год" + (f" {dur_m} хв" if dur_m else "")
+            slot.show(y_pos, box_h, font_s, f"{s_h:02d}:{s_m:02d}", f"{e_h:02d}:{e_m:02d}", dur_str)
+            y_pos -= step * 1.2 if len(intervals) <= 3 else step
+
+        _set(self._queue, f"{queue_id}")
+        _set(self._marker, f"Станом на {current_dt.strftime('%H:%M')}" if show_time_marker else None)
+        _set(self._watermark, f"@{bot_username.replace('@', '')}" if bot_username else None)
+
+
+def _set(text, value: Optional[str]):
+    """Показує напис з новим текстом або ховає його, якщо value порожнє."""
+    if value:
+        text.set_text(value)
+        text.set_visible(True)
+    else:
+        text.set_visible(False)
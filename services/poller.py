@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Результати одного опитування
+CHANGED = "changed"
+QUIET = "quiet"
+ERROR = "error"
+
+
+class AdaptivePoller:
+    """
+    Періодично викликає job з інтервалом, що підлаштовується під стрічку:
+    - після змін (вечірня публікація графіків) опитує з мінімальним інтервалом;
+    - поки змін немає, інтервал поступово зростає до максимального;
+    - після помилок інтервал подвоюється (експоненційна затримка) до максимального.
+    До кожної паузи додається випадковий розкид, щоб не бити у джерело синхронно.
+    job повертає CHANGED, QUIET або ERROR; виняток вважається ERROR.
+    """
+
+    def __init__(
+        self,
+        job: Callable[[], Awaitable[str]],
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        quiet_factor: float = 1.5,
+        jitter: float = 0.1,
+        describe: Optional[Callable[[], Any]] = None
+    ):
+        self._job = job
+        self._base_interval = base_interval # секунди
+        self._min_interval = min(min_interval, base_interval)
+        self._max_interval = max(max_interval, base_interval)
+        self._quiet_factor = quiet_factor
+        self._jitter = jitter
+        self._describe = describe # додаткова інформація для логу (стан запобіжників тощо)
+        self._interval = base_interval
+        self._errors = 0
+        self._last_outcome: Optional[str] = None
+        self._next_run_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def _next_interval(self, outcome: str) -> float:
+        if outcome == ERROR:
+            self._errors += 1
+            return min(self._max_interval, self._base_interval * 2 ** self._errors)
+        self._errors = 0
+        if outcome == CHANGED:
+            return self._min_interval
+        # Тиша після помилок повертає до базового інтервалу, далі — поступове сповільнення
+        if self._last_outcome == ERROR:
+            return self._base_interval
+        return min(self._max_interval, self._interval * self._quiet_factor)
+
+    async def run_once(self) -> float:
+        """Виконує одне опитування і повертає паузу (секунди) до наступного."""
+        try:
+            outcome = await self._job()
+        except Exception as e:
+            _LOGGER.error(f"Poll job failed: {e}", exc_info=True)
+            outcome = ERROR
+        if outcome not in (CHANGED, QUIET, ERROR):
+            outcome = QUIET
+
+        self._interval = self._next_interval(outcome)
+        self._last_outcome = outcome
+        if outcome == ERROR:
+            # Повний розкид для затримки після помилок
+            delay = random.uniform(self._interval / 2, self._interval)
+        else:
+            delay = self._interval * random.uniform(1 - self._jitter, 1 + self._jitter)
+        self._next_run_at = time.time() + delay
+
+        extra = f", {self._describe()}" if self._describe else ""
+        _LOGGER.info(f"Poll outcome={outcome}, next check in {delay / 60:.1f} min (interval {self._interval / 60:.1f} min){extra}")
+        return delay
+
+    async def _loop(self, initial_delay: float):
+        delay = initial_delay
+        while True:
+            await asyncio.sleep(delay)
+            delay = await self.run_once()
+
+    def start(self, initial_delay: float = 0):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(initial_delay))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Поточний стан для логів та метрик."""
+        return {
+            "interval": round(self._interval),
+            "last_outcome": self._last_outcome,
+            "consecutive_errors": self._errors,
+            "next_run_at": self._next_run_at
+        }
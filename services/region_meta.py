@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Optional
+
+from services.atomic_file import atomic_write
+
+_LOGGER = logging.getLogger(__name__)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(CURRENT_DIR)
+CONST_PATH = os.path.join(REPO_ROOT, "external", "svitlo_live", "custom_components", "svitlo_live", "const.py")
+# Скомпільовані метадані регіонів; перегенеровуються лише коли змінився const.py
+META_CACHE_PATH = os.path.join(REPO_ROOT, "database", "region_meta.json")
+
+DEFAULT_DTEK_API_URL = "https://dtek-api.svitlo-proxy.workers.dev/"
+FALLBACK_REGIONS = {"ivano-frankivska-oblast": "Івано-Франківська область"}
+
+
+def find_const_path() -> Optional[str]:
+    if os.path.exists(CONST_PATH):
+        return CONST_PATH
+    # Спробуємо знайти в поточному каталозі (якщо запущено з кореня)
+    alt_path = os.path.join(os.getcwd(), "external", "svitlo_live", "custom_components", "svitlo_live", "const.py")
+    if os.path.exists(alt_path):
+        return alt_path
+    return None
+
+
+def load_const_directly(path: str):
+    """Завантажує константи безпосередньо з файлу, уникаючи імпорту __init__.py та HA залежностей."""
+    import importlib.util
+    import types
+
+    # Надійне мокування homeassistant
+    for mod_name in ['homeassistant', 'homeassistant.const', 'homeassistant.core', 'homeassistant.helpers']:
+        if mod_name not in sys.modules:
+            m = types.ModuleType(mod_name)
+            if mod_name == 'homeassistant': m.__path__ = []
+            sys.modules[mod_name] = m
+
+    # Додаємо Platform у homeassistant.const
+    sys.modules['homeassistant.const'].Platform = types.SimpleNamespace(
+        SENSOR="sensor", BINARY_SENSOR="binary_sensor", CALENDAR="calendar"
+    )
+
+    try:
+        spec = importlib.util.spec_from_file_location("svitlo_live_const_temp", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except Exception as e:
+        _LOGGER.error(f"Failed to load const directly from {path}: {e}")
+        import traceback
+        _LOGGER.debug(traceback.format_exc())
+        return None
+
+
+def _read_cache(path: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or not isinstance(meta.get("regions"), dict):
+        return None
+    return meta
+
+
+def _write_cache(path: str, meta: dict[str, Any]):
+    try:
+        atomic_write(path, json.dumps(meta, ensure_ascii=False, indent=1).encode("utf-8"), ".region_meta_")
+    except OSError as e:
+        _LOGGER.warning(f"Failed to write region metadata cache {path}: {e}")
+
+
+def load_region_metadata(cache_path: str = META_CACHE_PATH) -> dict[str, Any]:
+    """
+    Повертає {"regions", "api_region_map", "dtek_api_url", "source", "load_ms"}.
+    Якщо хеш const.py збігається з кешем, const.py не виконується (без мокування Home Assistant).
+    Якщо const.py немає, але є кеш — беремо кеш; якщо немає нічого — запасні значення.
+    """
+    started = time.perf_counter()
+    const_path = find_const_path()
+    cached = _read_cache(cache_path)
+    const_hash = None
+
+    if const_path:
+        with open(const_path, "rb") as f:
+            const_hash = hashlib.sha256(f.read()).hexdigest()
+        if cached and cached.get("const_hash") == const_hash:
+            meta, source = cached, "cache"
+        else:
+            module = load_const_directly(const_path)
+            if module:
+                meta = {
+                    "const_hash": const_hash,
+                    "dtek_api_url": getattr(module, "DTEK_API_URL", DEFAULT_DTEK_API_URL),
+                    "regions": dict(getattr(module, "REGIONS", FALLBACK_REGIONS)),
+                    "api_region_map": dict(getattr(module, "API_REGION_MAP", {}))
+                }
+                _write_cache(cache_path, meta)
+                source = "const"
+            elif cached:
+                meta, source = cached, "stale-cache"
+            else:
+                meta, source = None, "fallback"
+    elif cached:
+        meta, source = cached, "stale-cache"
+    else:
+        _LOGGER.error(f"File not found: {CONST_PATH}")
+        meta, source = None, "fallback"
+
+    if meta is None:
+        meta = {"dtek_api_url": DEFAULT_DTEK_API_URL, "regions": dict(FALLBACK_REGIONS), "api_region_map": {}}
+    return {
+        "regions": meta["regions"],
+        "api_region_map": meta.get("api_region_map") or {},
+        "dtek_api_url": meta.get("dtek_api_url") or DEFAULT_DTEK_API_URL,
+        "source": source,
+        "load_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
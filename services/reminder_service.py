@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from aiogram import Bot
 from database.db import get_all_users, update_user_last_reminder
 from services.api_client import SvitloApiClient
-from services.image_generator import convert_api_to_half_list
+from services.day_grid import EMPTY_DAY, CODE_OFF
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,22 +36,19 @@ async def check_reminders(bot: Bot, api_client: SvitloApiClient):
             if not schedule_data:
                 continue
                 
-            today_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_today"], {}))
-            tomorrow_half = convert_api_to_half_list(schedule_data["schedule"].get(schedule_data["date_tomorrow"], {}))
+            today_codes = schedule_data["schedule"].get(schedule_data["date_today"], EMPTY_DAY).codes()
+            tomorrow_codes = schedule_data["schedule"].get(schedule_data["date_tomorrow"], EMPTY_DAY).codes()
             
-            all_half = today_half + tomorrow_half
+            all_codes = today_codes + tomorrow_codes
             
             # Знаходимо найближче відключення
             # Поточний індекс у списку 48+48 сегментів
             current_idx = now.hour * 2 + (1 if now.minute >= 30 else 0)
             
-            next_off_idx = -1
-            for i in range(current_idx, len(all_half)):
-                if all_half[i] == "off":
-                    # Перевіряємо, чи це початок блоку відключення
-                    if i == 0 or all_half[i-1] != "off":
-                        next_off_idx = i
-                        break
+            next_off_idx = all_codes.find(CODE_OFF, current_idx)
+            # Пропускаємо продовження блоку, що вже триває: потрібен саме початок відключення
+            while next_off_idx > 0 and all_codes[next_off_idx - 1] == CODE_OFF:
+                next_off_idx = all_codes.find(CODE_OFF, next_off_idx + 1)
             
             if next_off_idx != -1:
                 # Час початку відключення
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from services.rendered_image import RenderedImage
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RenderCoordinator:
+    """
+    Single-flight для рендерів: перший запит за ключем (регіон, черга, режим, ключ кешу)
+    запускає рендер, а всі одночасні запити з тим самим ключем чекають той самий результат.
+    Рендер іде окремою задачею: скасування одного з викликачів не зупиняє його для інших.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(RenderCoordinator, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"renders": 0, "deduplicated": 0, "errors": 0}
+        self._initialized = True
+
+    async def render(self, key: Hashable, factory: Callable[[], Awaitable[List[RenderedImage]]]) -> List[RenderedImage]:
+        """
+        factory — корутина-функція, що рендерить (і кешує) зображення; викликається лише
+        якщо для key ще немає рендера в роботі.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["deduplicated"] += 1
+            _LOGGER.debug(f"Joining in-flight render for {key}")
+        else:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            self._stats["renders"] += 1
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["errors"] += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._in_flight)
+        return stats
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from services.rendered_image import RenderedImage
+
+_LOGGER = logging.getLogger(__name__)
+
+# Модулі, які forkserver імпортує один раз до форку воркерів
+_PRELOAD_MODULES = ["services.image_generator", "services.ring_renderer", "services.list_renderer"]
+
+
+def _worker_init():
+    """Прогріває matplotlib, шаблон кільця та фігуру списку у воркері, щоб перший рендер не платив за них."""
+    import services.image_generator # noqa: F401
+    from services.list_renderer import ListViewRenderer
+    from services.ring_renderer import get_template
+    get_template()
+    ListViewRenderer()
+
+
+def _render_in_worker(kwargs: dict) -> Tuple[List[bytes], float]:
+    """Виконується у процесі-воркері. BytesIO не серіалізується, тому повертаємо байти та час рендера (мс)."""
+    from services.image_generator import generate_schedule_image
+    started = time.perf_counter()
+    images = [buf.getvalue() for buf in generate_schedule_image(**kwargs)]
+    return images, (time.perf_counter() - started) * 1000
+
+
+class RenderPool:
+    """
+    Рендер графіків matplotlib поза циклом подій.
+    - workers > 0: пул процесів; пул перезапускається приблизно після max_tasks_per_child
+      рендерів на воркер, щоб обмежити ріст пам'яті matplotlib;
+    - workers = 0: рендер у потоці (asyncio.to_thread) — для платформ без процесів.
+    Кількість рендерів у черзі та в роботі обмежена max_queue: решта викликачів чекає
+    (back-pressure), тому оновлення одного регіону не забиває пул і не зупиняє бота.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(RenderPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, workers: int = 2, max_tasks_per_child: int = 200, max_queue: int = 16):
+        if self._initialized:
+            return
+        self._workers = max(0, workers)
+        self._max_tasks_per_child = max(1, max_tasks_per_child)
+        self._max_queue = max(1, max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Покоління пулу: зростає з кожним новим executor, щоб перезапускати лише той пул,
+        # який зламався, а не щойно створений іншим викликачем
+        self._generation = 0
+        self._executor_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._renders_since_restart = 0
+        self._stats = {
+            "renders": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "max_wait_ms": 0.0,
+            "render_ms_total": 0.0,
+            "pool_restarts": 0
+        }
+        self._initialized = True
+
+    def _get_executor(self) -> Tuple[ProcessPoolExecutor, int]:
+        """Поточний пул та його покоління; створює пул за потреби."""
+        with self._executor_lock:
+            if self._executor is not None and self._renders_since_restart >= self._max_tasks_per_child * self._workers:
+                # Весь пул перезапускається приблизно після max_tasks_per_child рендерів на воркер.
+                # max_tasks_per_child з ProcessPoolExecutor не використовуємо: при заміні воркерів
+                # він зависає (CPython 3.11–3.13), тому старий пул лише дороблює свою чергу
+                self._retire_executor(cancel_futures=False)
+            if self._executor is None:
+                self._executor = self._create_executor()
+                self._generation += 1
+            return self._executor, self._generation
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # forkserver: воркери форкаються з процесу, де matplotlib і рендерери вже імпортовані,
+        # тому перезапуск воркера дешевий; на Windows доступний лише spawn.
+        # __main__ не попередньо завантажуємо: код модуля main.py (кеші, індекс на диску)
+        # не повинен виконуватися у forkserver
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        ctx = multiprocessing.get_context(method)
+        if method == "forkserver":
+            ctx.set_forkserver_preload(_PRELOAD_MODULES)
+        executor = ProcessPoolExecutor(max_workers=self._workers, mp_context=ctx, initializer=_worker_init)
+        self._renders_since_restart = 0
+        _LOGGER.info(
+            f"Render pool started: {self._workers} {method} worker(s), "
+            f"recycled every {self._max_tasks_per_child} renders per worker, queue cap {self._max_queue}"
+        )
+        return executor
+
+    def _retire_executor(self, cancel_futures: bool = True):
+        """Зупиняє поточний пул; викликається під _executor_lock."""
+        self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+        self._executor = None
+        self._stats["pool_restarts"] += 1
+
+    def _restart_executor(self, generation: int) -> bool:
+        """
+        Перезапускає зламаний пул, лише якщо він досі поточний: одночасні викликачі,
+        що отримали BrokenProcessPool від того самого пулу, перезапускають його один раз.
+        """
+        with self._executor_lock:
+            if self._executor is None or generation != self._generation:
+                return False
+            self._retire_executor()
+            return True
+
+    async def render(self, **kwargs) -> List[RenderedImage]:
+        """Асинхронний аналог generate_schedule_image з тими самими аргументами."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_queue)
+
+        wait_started = time.monotonic()
+        self._stats["waiting"] += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._stats["waiting"] -= 1
+        waited = (time.monotonic() - wait_started) * 1000
+        self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited)
+
+        self._stats["in_flight"] += 1
+        started = time.monotonic()
+        try:
+            if self._workers:
+                loop = asyncio.get_running_loop()
+                executor, generation = self._get_executor()
+                try:
+                    result = await loop.run_in_executor(executor, _render_in_worker, kwargs)
+                except BrokenProcessPool:
+                    # Воркер впав (напр. OOM) — піднімаємо пул заново (якщо цього ще не зробив
+                    # інший викликач) і пробуємо ще раз
+                    if self._restart_executor(generation):
+                        _LOGGER.warning("Render pool is broken, restarting it")
+                    executor, _ = self._get_executor()
+                    result = await loop.run_in_executor(executor, _render_in_worker, kwargs)
+                self._renders_since_restart += 1
+            else:
+                result = await asyncio.to_thread(_render_in_worker, kwargs)
+            self._stats["renders"] += 1
+            images, render_ms = result
+            return [RenderedImage(data, render_ms=render_ms) for data in images]
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._stats["render_ms_total"] += (time.monotonic() - started) * 1000
+            self._stats["in_flight"] -= 1
+            self._semaphore.release()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["avg_render_ms"] = round(stats.pop("render_ms_total") / stats["renders"], 1) if stats["renders"] else None
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 1)
+        return stats
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+async def render_schedule_images(
+    today_half: List[str],
+    tomorrow_half: List[str],
+    current_dt: datetime,
+    mode: str = "classic",
+    queue_id: str = "Unknown",
+    show_time_marker: bool = True,
+    region_name: Optional[str] = None,
+    bot_username: Optional[str] = None
+) -> List[RenderedImage]:
+    """Рендерить графік через спільний RenderPool, не блокуючи цикл подій."""
+    return await RenderPool().render(
+        today_half=today_half, tomorrow_half=tomorrow_half, current_dt=current_dt, mode=mode,
+        queue_id=queue_id, show_time_marker=show_time_marker, region_name=region_name, bot_username=bot_username
+    )
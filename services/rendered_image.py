@@ -0,0 +1,68 @@
+import hashlib
+import struct
+import time
+from typing import Any, Dict, Optional
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Версія рендерерів (image_generator, ring_renderer, list_renderer) у ключах кешу зображень:
+# збільшувати при кожній зміні вигляду картинок, щоб кеш на диску не віддавав старі
+RENDERER_VERSION = 1
+
+
+class RenderedImage:
+    """
+    Готове PNG-зображення з метаданими. Незмінне: data — bytes, тож один екземпляр
+    безпечно ділять кеш і всі одночасні відправки, а aiogram завантажує його без копіювання.
+    Хеш вмісту рахується один раз і далі береться з об'єкта (ключ кешу file_id Telegram).
+    """
+    __slots__ = ("data", "width", "height", "rendered_at", "render_ms", "_digest")
+
+    def __init__(
+        self,
+        data: bytes,
+        rendered_at: Optional[float] = None,
+        render_ms: Optional[float] = None,
+        digest: Optional[str] = None
+    ):
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        _set = object.__setattr__
+        _set(self, "data", data)
+        width, height = png_size(data)
+        _set(self, "width", width)
+        _set(self, "height", height)
+        _set(self, "rendered_at", rendered_at if rendered_at is not None else time.time())
+        _set(self, "render_ms", render_ms)
+        _set(self, "_digest", digest)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RenderedImage is immutable")
+
+    def __reduce__(self):
+        # Розпаковування за замовчуванням відновлює слоти через __setattr__
+        return RenderedImage, (self.data, self.rendered_at, self.render_ms, self._digest)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            # Лінивий кеш хешу — єдине поле, що заповнюється після створення
+            object.__setattr__(self, "_digest", hashlib.blake2b(self.data, digest_size=16).hexdigest())
+        return self._digest
+
+    def meta(self) -> Dict[str, Any]:
+        """Метадані без вмісту (для індексу дискового кешу)."""
+        return {"rendered_at": self.rendered_at, "render_ms": self.render_ms}
+
+    def __repr__(self) -> str:
+        return f"RenderedImage({self.width}x{self.height}, {self.size} bytes)"
+
+
+def png_size(data: bytes) -> tuple[int, int]:
+    """Ширина та висота з заголовка IHDR; (0, 0), якщо це не PNG."""
+    if len(data) < 24 or data[:8] != PNG_SIGNATURE:
+        return 0, 0
+    return struct.unpack(">II", data[16:24])
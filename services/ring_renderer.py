@@ -0,0 +1,275 @@
+import struct
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+from PIL import Image, ImageDraw
+
+# Розмір і роздільність, як у _generate_circle_view (8x8 дюймів, dpi=120)
+DEFAULT_SIZE_IN = 8
+DEFAULT_DPI = 120
+# Стрілка поточного часу: колір, радіуси (у координатах кільця), товщина лінії та точки (pt)
+MARKER_COLOR = "#2196F3"
+MARKER_R_START, MARKER_R_END = 0.55, 1.05
+MARKER_LINE_PT = 4
+MARKER_DOT_PT = 10
+MARKER_EDGE_PT = 2
+# Індекс «сегмента» для пікселів поза кільцем у таблиці кольорів
+BACKGROUND = 48
+# Надвибірка при малюванні стрілки через PIL (згладжування)
+_SUPERSAMPLE = 4
+
+
+class _Layer:
+    """
+    Розріджений RGBA-шар: лише пікселі з ненульовою прозорістю (індекси у плоскому RGB-буфері).
+    Накладання — звичайний alpha-blending тільки цих пікселів.
+    """
+    __slots__ = ("index", "rgb", "alpha")
+
+    def __init__(self, index: np.ndarray, rgb: np.ndarray, alpha: np.ndarray):
+        self.index = index
+        self.rgb = rgb
+        self.alpha = alpha
+
+    @classmethod
+    def from_rgba(cls, rgba: np.ndarray, width: int, height: int, x0: int = 0, y0: int = 0) -> "_Layer":
+        """rgba — фрагмент (h, w, 4) без премультиплікації, розміщений у точці (x0, y0) кадру width x height."""
+        rows, cols = np.nonzero(rgba[..., 3])
+        pixels = rgba[rows, cols]
+        rows, cols = rows + y0, cols + x0
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        pixels = pixels[inside]
+        return cls(
+            (rows[inside] * width + cols[inside]).astype(np.intp),
+            pixels[:, :3].astype(np.float32),
+            (pixels[:, 3:4].astype(np.float32) / 255)
+        )
+
+    def draw(self, flat: np.ndarray):
+        """flat — буфер кадру (N, 3) uint8."""
+        px = flat[self.index].astype(np.float32)
+        flat[self.index] = (px + self.alpha * (self.rgb - px) + 0.5).astype(np.uint8)
+
+
+class RingTemplate:
+    """
+    Статичні частини кругової діаграми для одного розміру, відмальовані matplotlib один раз:
+    покриття кільця (згладжені краї), номер сегмента для кожного пікселя кільця,
+    шар розділювачів годин з підписами та розділювач опівночі.
+    Кожне зображення далі збирається операціями над масивами: фарбування 48 сегментів,
+    накладання шарів, стрілки часу та закешованих текстів.
+    """
+
+    def __init__(self, size_in: float = DEFAULT_SIZE_IN, dpi: int = DEFAULT_DPI):
+        self.size_in = size_in
+        self.dpi = dpi
+
+        fig, ax, wedges = self.new_figure()
+        self.width, self.height = fig.canvas.get_width_height()
+        transform = ax.transData.frozen()
+        self._to_display = transform.transform
+
+        # Покриття кільця: усі сектори одним кольором зі згладжуванням
+        for wedge in wedges:
+            wedge.set_facecolor("black")
+        coverage = _render_rgba(fig)[..., 3]
+        rows, cols = np.nonzero(coverage)
+        self._box = (slice(rows.min(), rows.max() + 1), slice(cols.min(), cols.max() + 1))
+
+        # Номер сегмента за кутом центру пікселя: сектор 0 починається о 00:00 (вгорі), далі за годинниковою
+        x, y = transform.inverted().transform(np.column_stack([cols + 0.5, self.height - rows - 0.5])).T
+        theta = (90 - np.degrees(np.arctan2(y, x))) % 360
+        segment = ((theta // 7.5).astype(np.intp) % 48).astype(np.uint8)
+        alpha = coverage[rows, cols]
+
+        # Повністю покриті пікселі фарбуються таблицею кольорів у межах рамки кільця (49-й колір — біле тло),
+        # а згладжені краї змішуються з білим окремо
+        solid = alpha == 255
+        box_segment = np.full(coverage.shape, BACKGROUND, dtype=np.uint8)
+        box_segment[rows[solid], cols[solid]] = segment[solid]
+        self._box_segment = box_segment[self._box].astype(np.intp)
+        self._edge_index = rows[~solid] * self.width + cols[~solid]
+        self._edge_segment = segment[~solid]
+        self._edge_coverage = (alpha[~solid].astype(np.float32) / 255)[:, None]
+
+        # Шар під стрілкою: розділювачі годин та підписи годин
+        fig, ax, _ = self.new_figure(show_ring=False)
+        for i in range(24):
+            angle = np.radians(90 - i * 15)
+            ax.plot([0.6 * np.cos(angle), 1.0 * np.cos(angle)], [0.6 * np.sin(angle), 1.0 * np.sin(angle)],
+                    color='w', linewidth=0.8, zorder=3)
+        for i in range(24):
+            angle = np.radians(90 - (i * 15 + 7.5))
+            ax.text(0.8 * np.cos(angle), 0.8 * np.sin(angle), f"{i:02d}", ha='center', va='center',
+                    fontsize=11, fontweight='bold', color='#FFFFFF')
+        self.hours_layer = _Layer.from_rgba(_render_rgba(fig), self.width, self.height)
+
+        # Шар над стрілкою: розділювач опівночі
+        fig, ax, _ = self.new_figure(show_ring=False)
+        ax.plot([0, 0], [0.55, 1.05], color='white', linewidth=4, zorder=10)
+        self.midnight_layer = _Layer.from_rgba(_render_rgba(fig), self.width, self.height)
+
+        self._white = np.full((self.height, self.width, 3), 255, dtype=np.uint8)
+
+    def new_figure(self, show_ring: bool = True):
+        """Фігура з тим самим розташуванням осей, що й у _generate_circle_view, на прозорому тлі."""
+        fig = Figure(figsize=(self.size_in, self.size_in), dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes([0.01, 0.01, 0.98, 0.98], aspect='equal')
+        # ax.pie задає межі осей; без кільця сектори лише приховуються
+        wedges, _ = ax.pie([1] * 48, startangle=90, counterclock=False,
+                           wedgeprops=dict(width=0.4, edgecolor='none', linewidth=0))
+        if not show_ring:
+            for wedge in wedges:
+                wedge.set_visible(False)
+        return fig, ax, wedges
+
+    def marker_layer(self, hour: int, minute: int) -> _Layer:
+        """Стрілка поточного часу, намальована PIL з надвибіркою (лінія з круглими кінцями та точка)."""
+        angle = np.radians(90 - (hour * 15 + minute * 0.25))
+        start = self._to_display((MARKER_R_START * np.cos(angle), MARKER_R_START * np.sin(angle)))
+        end = self._to_display((MARKER_R_END * np.cos(angle), MARKER_R_END * np.sin(angle)))
+        # Координати дисплея (y вгору) -> пікселі зображення (y вниз)
+        (x_s, y_s), (x_e, y_e) = (start[0], self.height - start[1]), (end[0], self.height - end[1])
+        pt = self.dpi / 72
+        line_r = MARKER_LINE_PT * pt / 2
+        dot_r = MARKER_DOT_PT * pt / 2
+        edge_r = dot_r + MARKER_EDGE_PT * pt / 2
+
+        margin = edge_r + 2
+        x0, y0 = int(min(x_s, x_e) - margin), int(min(y_s, y_e) - margin)
+        x1, y1 = int(np.ceil(max(x_s, x_e) + margin)), int(np.ceil(max(y_s, y_e) + margin))
+        ss = _SUPERSAMPLE
+        img = Image.new("RGBA", ((x1 - x0) * ss, (y1 - y0) * ss), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+
+        def p(x, y):
+            return (x - x0) * ss, (y - y0) * ss
+
+        def disc(x, y, r, color):
+            cx, cy = p(x, y)
+            draw.ellipse([cx - r * ss, cy - r * ss, cx + r * ss, cy + r * ss], fill=color)
+
+        color = MARKER_COLOR
+        draw.line([p(x_s, y_s), p(x_e, y_e)], fill=color, width=int(round(2 * line_r * ss)))
+        disc(x_s, y_s, line_r, color)
+        disc(x_e, y_e, edge_r, "white")
+        disc(x_e, y_e, dot_r - MARKER_EDGE_PT * pt / 2, color)
+        img = img.resize((x1 - x0, y1 - y0), Image.LANCZOS)
+        return _Layer.from_rgba(np.asarray(img), self.width, self.height, x0, y0)
+
+    def render(self, colors: np.ndarray, texts: List[_Layer], marker: Optional[_Layer] = None) -> bytes:
+        """colors — (48, 3) uint8 RGB для сегментів. Повертає PNG."""
+        frame = self._white.copy()
+        table = np.full((BACKGROUND + 1, 3), 255, dtype=np.uint8)
+        table[:48] = colors
+        frame[self._box] = np.take(table, self._box_segment, axis=0)
+        flat = frame.reshape(-1, 3)
+        edge_rgb = colors[self._edge_segment].astype(np.float32)
+        flat[self._edge_index] = (255 + self._edge_coverage * (edge_rgb - 255) + 0.5).astype(np.uint8)
+        self.hours_layer.draw(flat)
+        if marker is not None:
+            marker.draw(flat)
+        self.midnight_layer.draw(flat)
+        for layer in texts:
+            layer.draw(flat)
+        return encode_png(frame)
+
+
+def _render_rgba(fig: Figure) -> np.ndarray:
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+
+def encode_png(rgb: np.ndarray, level: int = 1) -> bytes:
+    """
+    Мінімальний PNG-кодер (RGB, 8 біт, фільтр None) на zlib.
+    Для цих зображень (великі однотонні області) він у 2-3 рази швидший за PIL і дає менший файл.
+    """
+    height, width = rgb.shape[:2]
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw.data, level)),
+        chunk(b"IEND", b"")
+    ])
+
+
+@lru_cache(maxsize=4)
+def get_template(size_in: float = DEFAULT_SIZE_IN, dpi: int = DEFAULT_DPI) -> RingTemplate:
+    return RingTemplate(size_in, dpi)
+
+
+@lru_cache(maxsize=512)
+def _text_layer(size_in: float, dpi: int, kind: str, text: str) -> _Layer:
+    """Текстові написи діаграми кешуються за вмістом: номер черги, заголовок, дата, регіон, підпис бота."""
+    template = get_template(size_in, dpi)
+    fig, ax, _ = template.new_figure(show_ring=False)
+    if kind == "queue":
+        ax.text(0, 0.15, text, ha='center', va='center', fontsize=20, fontweight='bold')
+    elif kind == "title":
+        ax.text(0, -0.1, text, ha='center', va='center', fontsize=14, fontweight='bold', color='#555555')
+    elif kind == "date":
+        ax.text(0, -0.25, text, ha='center', va='center', fontsize=10, color='grey')
+    elif kind == "region":
+        ax.text(0.5, 0.99, text, ha='center', va='top', fontsize=16, fontweight='bold', color='#333333', transform=fig.transFigure,
+                bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
+    elif kind == "watermark":
+        ax.text(0.99, 0.01, text, ha='right', va='bottom', fontsize=9, color='grey', transform=fig.transFigure,
+                bbox=dict(facecolor='white', alpha=0.5, edgecolor='none', pad=1))
+    else:
+        raise ValueError(f"Unknown text kind: {kind}")
+    return _Layer.from_rgba(_render_rgba(fig), template.width, template.height)
+
+
+@lru_cache(maxsize=64)
+def _marker_layer(size_in: float, dpi: int, hour: int, minute: int) -> _Layer:
+    return get_template(size_in, dpi).marker_layer(hour, minute)
+
+
+@lru_cache(maxsize=16)
+def _rgb(color: str) -> Tuple[int, int, int]:
+    return tuple(int(round(c * 255)) for c in to_rgb(color))
+
+
+def render_ring(
+    segment_colors: List[str],
+    current_dt: datetime,
+    queue_id: str,
+    title: str,
+    show_time_marker: bool = True,
+    region_name: Optional[str] = None,
+    bot_username: Optional[str] = None,
+    size_in: float = DEFAULT_SIZE_IN,
+    dpi: int = DEFAULT_DPI
+) -> BytesIO:
+    """Шаблонний аналог _generate_circle_view: 48 кольорів сегментів -> PNG у BytesIO."""
+    template = get_template(size_in, dpi)
+    colors = np.array([_rgb(c) for c in segment_colors], dtype=np.uint8)
+    texts = [
+        _text_layer(size_in, dpi, "queue", str(queue_id)),
+        _text_layer(size_in, dpi, "title", title),
+        _text_layer(size_in, dpi, "date", current_dt.strftime('%d.%m.%Y'))
+    ]
+    if region_name:
+        texts.append(_text_layer(size_in, dpi, "region", region_name))
+    if bot_username:
+        texts.append(_text_layer(size_in, dpi, "watermark", f"@{bot_username.replace('@', '')}"))
+    marker = _marker_layer(size_in, dpi, current_dt.hour, current_dt.minute) if show_time_marker else None
+    buf = BytesIO(template.render(colors, texts, marker))
+    buf.seek(0)
+    return buf
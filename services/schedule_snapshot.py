@@ -0,0 +1,43 @@
+from types import MappingProxyType
+from typing import Any, Optional, Mapping
+
+
+class ScheduleSnapshot:
+    """
+    Незмінний індексований знімок даних API.
+    Будується один раз після оновлення кешу, щоб пошук регіону та черги
+    не вимагав лінійного проходу по сирому JSON на кожен виклик.
+    Вміст знімка ніколи не змінюється на місці: нова версія створюється
+    копіюванням лише змінених регіонів, незмінені спільні з попередньою.
+    """
+    __slots__ = ("version", "data", "regions", "queues", "date_today", "date_tomorrow", "active_cpus")
+
+    def __init__(self, data: dict, version: int = 0):
+        regions = {}
+        queues = {}
+        for r in data.get("regions", []):
+            cpu = r.get("cpu")
+            if not cpu:
+                continue
+            regions[cpu] = r
+            for q_id, q_sched in (r.get("schedule") or {}).items():
+                if q_sched:
+                    queues[(cpu, q_id)] = q_sched
+
+        _set = object.__setattr__
+        _set(self, "version", version)
+        _set(self, "data", data)
+        _set(self, "regions", MappingProxyType(regions)) # cpu -> region_obj
+        _set(self, "queues", MappingProxyType(queues)) # (cpu, queue) -> schedule
+        _set(self, "date_today", data.get("date_today"))
+        _set(self, "date_tomorrow", data.get("date_tomorrow"))
+        _set(self, "active_cpus", frozenset(cpu for cpu, r in regions.items() if r.get("schedule")))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScheduleSnapshot is immutable")
+
+    def get_region(self, cpu: str) -> Optional[Mapping[str, Any]]:
+        return self.regions.get(cpu)
+
+    def get_queue(self, cpu: str, queue: str) -> Optional[dict]:
+        return self.queues.get((cpu, queue))
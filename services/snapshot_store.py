@@ -0,0 +1,37 @@
+import gzip
+import json
+import logging
+import os
+from typing import Any, Optional
+
+from services.atomic_file import atomic_write
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_FORMAT = 2
+
+
+def save_state(path: str, state: dict[str, Any]):
+    """
+    Атомарно зберігає стан клієнта API у стиснений JSON.
+    Спочатку пише у тимчасовий файл у тій самій теці, потім замінює ним основний,
+    тому збій посеред запису не пошкоджує попередню збережену версію.
+    """
+    payload = json.dumps({"format": STATE_FORMAT, **state}, separators=(",", ":"), ensure_ascii=False).encode()
+    atomic_write(path, gzip.compress(payload, compresslevel=6), ".api_state_")
+
+
+def load_state(path: str) -> Optional[dict[str, Any]]:
+    """Завантажує збережений стан. Повертає None, якщо файлу немає або він непридатний."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            state = json.loads(gzip.decompress(f.read()))
+    except Exception as e:
+        _LOGGER.warning(f"Failed to load API state from {path}: {e}")
+        return None
+    if not isinstance(state, dict) or state.get("format") != STATE_FORMAT:
+        _LOGGER.warning(f"Ignoring API state in {path}: unsupported format")
+        return None
+    return state
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from services.day_grid import DayGrid, compact_schedule
+from services.feed_decoder import decode_feed
+from services.http_pool import read_body, read_json
+from services.if_parser import parse_if_schedule
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FetchResult:
+    """
+    Результат запиту до джерела графіків:
+    - status — HTTP-статус (304 — дані не змінилися, None — джерело не відповіло);
+    - data — розібрані дані у форматі джерела з компактними графіками (DayGrid) або None;
+    - validators — ETag / Last-Modified для наступного умовного запиту;
+    - fresh_for — скільки секунд відповідь свіжа за Cache-Control (0 — перевіряти щоразу);
+    - raw_bytes, decode_metrics — розмір тіла та метрики декодування для статистики.
+    """
+    __slots__ = ("status", "data", "validators", "fresh_for", "raw_bytes", "decode_metrics")
+
+    def __init__(
+        self,
+        status: Optional[int],
+        data: Any = None,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        fresh_for: float = 0,
+        raw_bytes: int = 0,
+        decode_metrics: Optional[dict] = None
+    ):
+        self.status = status
+        self.data = data
+        self.validators = validators or {}
+        self.fresh_for = fresh_for
+        self.raw_bytes = raw_bytes
+        self.decode_metrics = decode_metrics or {}
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (200, 304)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+def freshness_lifetime(headers) -> float:
+    """Скільки секунд відповідь свіжа: Cache-Control max-age / s-maxage мінус Age."""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    max_age = 0
+    if "no-cache" not in cache_control and "no-store" not in cache_control:
+        for directive in cache_control.split(","):
+            name, _, value = directive.strip().partition("=")
+            if name in ("s-maxage", "max-age") and value.isdigit():
+                max_age = max(max_age, int(value))
+    try:
+        age = int(headers.get("Age") or 0)
+    except ValueError:
+        age = 0
+    return max(0, max_age - age)
+
+
+class FeedSource:
+    """
+    Стрічка проксі DTEK з графіками всіх регіонів.
+    Виконує умовний запит (ETag / Last-Modified), декодує подвійно закодований body
+    і повертає регіони з компактними графіками.
+    """
+    name = "dtek"
+
+    def __init__(self, url: str, timeout: float = 30):
+        self._url = url
+        self._timeout = timeout
+
+    def url(self, cache_bust_token: Optional[int] = None) -> str:
+        """URL повної стрічки; cache_bust_token додає ?t= для обходу кешу проксі."""
+        if cache_bust_token is None:
+            return self._url
+        return f"{self._url}?t={cache_bust_token}"
+
+    def build_request(self, validators: Optional[Dict[str, Optional[str]]] = None, cache_bust: bool = False) -> tuple[str, dict[str, str]]:
+        """
+        Формує URL та заголовки запиту.
+        За замовчуванням URL стабільний, щоб проксі міг відповісти 304;
+        у режимі cache_bust додаємо ?t= та no-cache для проксі, що віддає застарілі дані.
+        """
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"): headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"): headers["If-Modified-Since"] = validators["last_modified"]
+
+        if cache_bust:
+            headers["Cache-Control"] = "no-cache"
+            headers["Pragma"] = "no-cache"
+            return self.url(int(time.time())), headers
+        return self.url(), headers
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        cache_bust: bool = False,
+        keep_cpus: Optional[set] = None
+    ) -> FetchResult:
+        """
+        keep_cpus — регіони, графіки яких потрібні (решта стають заглушками), None — усі.
+        Мережеві помилки не ковтаються: їх рахує викликач.
+        """
+        url, headers = self.build_request(validators, cache_bust)
+        async with session.get(url, headers=headers, timeout=self._timeout) as resp:
+            fresh_for = freshness_lifetime(resp.headers)
+            if resp.status != 200:
+                return FetchResult(resp.status, validators=validators, fresh_for=fresh_for)
+            body = await read_body(resp)
+            new_validators = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+
+        # Сирі байти читаються один раз, розбирається лише вкладений документ
+        raw_bytes = len(body)
+        data, metrics = decode_feed(body, keep_cpus)
+        del body
+        if data:
+            # Компактні 48-байтні графіки будуються один раз тут і далі використовуються всюди
+            for r in data.get("regions", []):
+                if r.get("schedule"):
+                    r["schedule"] = compact_schedule(r["schedule"])
+        return FetchResult(200, data, new_validators, fresh_for, raw_bytes, metrics)
+
+    def __repr__(self):
+        return f"FeedSource({self._url})"
+
+
+class IfSource:
+    """Сайт обленерго Івано-Франківська: список черг та інтервали відключень окремо для кожної черги."""
+    name = "if"
+
+    def __init__(self, schedule_url: str, queues_url: str):
+        self._schedule_url = schedule_url
+        self._queues_url = queues_url
+
+    async def fetch_queues(self, session: aiohttp.ClientSession, timeout: float) -> list[str]:
+        """Список черг [{"code": "1.1", ...}, ...] -> ["1.1", ...]; [] при помилці."""
+        try:
+            async with session.get(self._queues_url, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if resp.status != 200:
+                    _LOGGER.error(f"IF Queues API error {resp.status}")
+                    return []
+                data = await read_json(resp)
+        except Exception as e:
+            _LOGGER.error(f"Failed to fetch IF queues: {e}")
+            return []
+        if isinstance(data, list):
+            return [q.get("code") for q in data if isinstance(q, dict) and q.get("code")]
+        return []
+
+    async def fetch(self, session: aiohttp.ClientSession, queue: str, timeout: float) -> FetchResult:
+        """
+        Графік однієї черги: data — {дата: DayGrid} або None.
+        Таймаут не ковтається, щоб викликач міг відрізнити його від помилки.
+        """
+        try:
+            async with session.get(self._schedule_url, params={"queue": queue}, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if resp.status != 200:
+                    _LOGGER.error(f"IF API error {resp.status} for queue {queue}")
+                    return FetchResult(resp.status)
+                raw = await read_json(resp)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Failed to fetch IF schedule for queue {queue}: {e}")
+            return FetchResult(None)
+        return FetchResult(200, parse_if_schedule(raw, queue) if raw else None)
+
+    def __repr__(self):
+        return f"IfSource({self._schedule_url})"
+
+
+class SourceProvider:
+    """
+    Основні upstream-джерела графіків: стрічка проксі DTEK (усі регіони) та сайт ІФ (черги окремо).
+    Клієнт API звертається до джерел лише через їхні fetch(), тому провайдера можна
+    спрямувати на локальний фейковий сервер (fake_upstream.py) для тестів і бенчмарків.
+    """
+
+    def __init__(self, dtek_url: str, if_schedule_url: str, if_queues_url: str, name: str = "live"):
+        self.name = name
+        self.feed = FeedSource(dtek_url)
+        self.if_site = IfSource(if_schedule_url, if_queues_url)
+
+    @classmethod
+    def local(cls, base_url: str) -> "SourceProvider":
+        """Провайдер для fake_upstream.py, що слухає на base_url (напр. http://127.0.0.1:8080)."""
+        base_url = base_url.rstrip("/")
+        return cls(
+            dtek_url=f"{base_url}/dtek",
+            if_schedule_url=f"{base_url}/if/schedule-by-queue",
+            if_queues_url=f"{base_url}/if/gpv-queue-list",
+            name=f"local:{base_url}"
+        )
+
+    def __repr__(self):
+        return f"SourceProvider({self.name})"
@@ -0,0 +1,54 @@
+import logging
+import os
+import time
+from typing import Any, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _process_start_time() -> Optional[float]:
+    """Час запуску процесу (epoch) з /proc; None на платформах без /proc."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # Поле 22 (starttime) — після назви процесу в дужках, яка може містити пробіли
+            fields = f.read().rsplit(b")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/stat", "rb") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith(b"btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration, AttributeError):
+        return None
+
+
+PROCESS_START = _process_start_time()
+_IMPORTED_AT = time.time()
+_marks: list[tuple[str, float]] = []
+_reported = False
+
+
+def mark(name: str):
+    """Позначає етап старту (імпорти, БД, клієнт API, перше опитування...)."""
+    _marks.append((name, time.time()))
+
+
+def report(extra: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """
+    Тривалість етапів холодного старту: від запуску процесу (або від імпорту цього модуля,
+    якщо час запуску невідомий) до кожної позначки. Пише в лог лише перший раз.
+    """
+    global _reported
+    origin = PROCESS_START or _IMPORTED_AT
+    stages, previous = {}, origin
+    for name, at in _marks:
+        stages[name] = round(at - previous, 3)
+        previous = at
+    result = {
+        "origin": "process" if PROCESS_START else "import",
+        "total": round(previous - origin, 3),
+        "stages": stages,
+        **(extra or {})
+    }
+    if not _reported:
+        _reported = True
+        _LOGGER.info(f"Startup report: {result}")
+    return result
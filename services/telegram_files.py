@@ -0,0 +1,134 @@
+import logging
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, InputMediaPhoto
+
+from services.rendered_image import RenderedImage
+
+_LOGGER = logging.getLogger(__name__)
+
+# Фрагменти помилок Telegram про недійсний file_id: лише після них має сенс перезавантажувати.
+# Інші BadRequest (напр. помилка розмітки підпису) повтор не виправить — їх пробрасуємо.
+FILE_ID_ERRORS = ("wrong file identifier", "wrong remote file identifier", "file reference", "wrong_file_id", "file_id")
+
+
+def _is_file_id_error(error: TelegramBadRequest) -> bool:
+    message = (error.message or "").lower()
+    return any(marker in message for marker in FILE_ID_ERRORS)
+
+
+class TelegramFileCache:
+    """
+    file_id, які Telegram повертає після першого завантаження зображення.
+    Ключ — хеш вмісту PNG (RenderedImage.digest): однакове зображення (та сама черга, режим і графік) завантажується
+    один раз, а далі надсилається за file_id, у тому числі в медіагрупах.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(TelegramFileCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, max_entries: int = 10000):
+        if self._initialized:
+            return
+        self._max_entries = max_entries
+        self._file_ids: "OrderedDict[str, str]" = OrderedDict()
+        self._stats = {
+            "uploads": 0,
+            "reuses": 0,
+            "uploaded_bytes": 0,
+            "saved_bytes": 0,
+            "invalidated": 0
+        }
+        self._initialized = True
+
+    def get(self, digest: str) -> Optional[str]:
+        file_id = self._file_ids.get(digest)
+        if file_id is not None:
+            self._file_ids.move_to_end(digest)
+        return file_id
+
+    def remember(self, digest: str, file_id: str):
+        self._file_ids[digest] = file_id
+        self._file_ids.move_to_end(digest)
+        while len(self._file_ids) > self._max_entries:
+            self._file_ids.popitem(last=False)
+
+    def forget(self, digest: str):
+        if self._file_ids.pop(digest, None) is not None:
+            self._stats["invalidated"] += 1
+
+    def record(self, uploaded: bool, size: int):
+        if uploaded:
+            self._stats["uploads"] += 1
+            self._stats["uploaded_bytes"] += size
+        else:
+            self._stats["reuses"] += 1
+            self._stats["saved_bytes"] += size
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        sent = stats["uploads"] + stats["reuses"]
+        stats["reuse_ratio"] = round(stats["reuses"] / sent, 3) if sent else None
+        stats["entries"] = len(self._file_ids)
+        return stats
+
+
+async def send_photos(target: Any, chat_id: int, images: List[RenderedImage], caption: Optional[str], filename: str, parse_mode: str = "Markdown"):
+    """
+    Надсилає одне фото або медіагрупу (підпис — до першого фото).
+    target — Message (відповідь у чат) або Bot (надсилання за chat_id).
+    Зображення з відомим file_id не завантажуються повторно; якщо Telegram відхилив
+    збережений file_id (застарів), ці id забуваються і все надсилається завантаженням;
+    решта помилок BadRequest пробрасується без повтору.
+    Байти зображень передаються в aiogram як є: на кожну відправку вони не копіюються і не хешуються.
+    """
+    cache = TelegramFileCache()
+    digests = [image.digest for image in images]
+    try:
+        return await _send(target, chat_id, images, digests, caption, filename, parse_mode, use_file_ids=True)
+    except TelegramBadRequest as e:
+        stale = [d for d in digests if cache.get(d)]
+        if not stale or not _is_file_id_error(e):
+            raise
+        _LOGGER.warning(f"Telegram rejected cached file_id ({e}), re-uploading {len(images)} image(s)")
+        for d in stale:
+            cache.forget(d)
+        return await _send(target, chat_id, images, digests, caption, filename, parse_mode, use_file_ids=False)
+
+
+async def _send(target, chat_id, images, digests, caption, filename, parse_mode, use_file_ids: bool):
+    cache = TelegramFileCache()
+    file_ids = [cache.get(d) if use_file_ids else None for d in digests]
+    media = [
+        file_id or BufferedInputFile(image.data, filename=f"{filename}_{i}.png")
+        for i, (image, file_id) in enumerate(zip(images, file_ids))
+    ]
+
+    if len(media) > 1:
+        group = [
+            InputMediaPhoto(media=m, caption=caption if i == 0 else None, parse_mode=parse_mode)
+            for i, m in enumerate(media)
+        ]
+        if hasattr(target, "answer_media_group"):
+            messages = await target.answer_media_group(group)
+        else:
+            messages = await target.send_media_group(chat_id, group)
+    else:
+        if hasattr(target, "answer_photo"):
+            message = await target.answer_photo(media[0], caption=caption, parse_mode=parse_mode)
+        else:
+            message = await target.send_photo(chat_id, media[0], caption=caption, parse_mode=parse_mode)
+        messages = [message]
+
+    for message, image, digest, file_id in zip(messages, images, digests, file_ids):
+        cache.record(uploaded=file_id is None, size=image.size)
+        if file_id is None and message.photo:
+            # Найбільший розмір — останній у списку
+            cache.remember(digest, message.photo[-1].file_id)
+    return messages
@@ -0,0 +1,100 @@
+import asyncio
+import inspect
+import logging
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from services.day_grid import DayGrid
+from services.if_parser import parse_if_schedule
+from services.sources import FetchResult
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _to_grid(date_str: str, queue: str, day: Any) -> Optional[DayGrid]:
+    """День у форматі {"HH:MM": код} або список інтервалів відключень [{"from", "to"}]."""
+    if isinstance(day, dict):
+        return DayGrid.from_api(day)
+    if isinstance(day, list):
+        try:
+            event_date = date.fromisoformat(date_str).strftime("%d.%m.%Y")
+        except ValueError:
+            return None
+        return parse_if_schedule([{"eventDate": event_date, "queues": {queue: day}}], queue).get(date_str)
+    return None
+
+
+def normalize_region(raw: Any) -> Optional[Dict[str, Dict[str, DayGrid]]]:
+    """
+    Перетворює відповідь temno {"queues": {черга: {дата: день}}} на компактний графік
+    регіону {черга: {дата: DayGrid}}; день — {"HH:MM": код} або список інтервалів відключень.
+    """
+    if not isinstance(raw, dict):
+        return None
+    queues = raw.get("queues")
+    if not isinstance(queues, dict):
+        return None
+    result = {}
+    for q_id, q_sched in queues.items():
+        if not isinstance(q_sched, dict):
+            continue
+        days = {}
+        for date_str, day in q_sched.items():
+            grid = _to_grid(date_str, str(q_id), day)
+            if grid is not None:
+                days[date_str] = grid
+        if days:
+            result[str(q_id)] = days
+    return result or None
+
+
+class TemnoSource:
+    """
+    Друге джерело графіків для хеджованих запитів: окремий виклик entrypoint(region) на кожен регіон.
+    entrypoint — звичайна або async-функція region (CPU) -> {"queues": {...}} (див. normalize_region).
+    Вендорений external/temno сюди не під'єднано: його публічний API не звірено, тому бот друге
+    джерело не вмикає, а entrypoint передають бенчмарки (fake_upstream.temno_entrypoint).
+    """
+    name = "temno"
+
+    def __init__(
+        self,
+        entrypoint: Callable[[str], Any],
+        regions: Optional[Iterable[str]] = None,
+        timeout: float = 15,
+        concurrency: int = 4
+    ):
+        self._regions = set(regions) if regions else None # None — усі регіони
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._entrypoint = entrypoint
+
+    def covers(self, cpu: str) -> bool:
+        return self._regions is None or cpu in self._regions
+
+    async def fetch_region(self, cpu: str) -> Optional[Dict[str, Dict[str, DayGrid]]]:
+        """Повертає компактний графік регіону або None, якщо джерело не відповіло як слід."""
+        async with self._semaphore:
+            if inspect.iscoroutinefunction(self._entrypoint):
+                raw = await asyncio.wait_for(self._entrypoint(cpu), timeout=self._timeout)
+            else:
+                raw = await asyncio.wait_for(asyncio.to_thread(self._entrypoint, cpu), timeout=self._timeout)
+        return normalize_region(raw)
+
+    async def fetch(self, regions: Iterable[str]) -> FetchResult:
+        """
+        Той самий інтерфейс, що й у FeedSource: data — {"regions": [{"cpu", "schedule"}]}
+        лише з регіонами, які вдалося отримати (запити паралельні, регіони з помилкою пропускаються).
+        Умовних запитів temno не підтримує, тож валідаторів немає.
+        """
+        cpus = [cpu for cpu in regions if self.covers(cpu)]
+        results = await asyncio.gather(*(self.fetch_region(cpu) for cpu in cpus), return_exceptions=True)
+        fetched = []
+        for cpu, result in zip(cpus, results):
+            if isinstance(result, BaseException):
+                _LOGGER.error(f"Temno request for region {cpu} failed: {result!r}")
+            elif result:
+                fetched.append({"cpu": cpu, "schedule": result})
+        if not fetched:
+            return FetchResult(None)
+        return FetchResult(200, {"regions": fetched})
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+import services.api_client
+from services.api_client import SvitloApiClient
+from services.day_grid import CODE_OFF, CODE_ON, DayGrid
+from services.sources import FetchResult
+
+DAY = "2026-10-17"
+
+
+def region(status: int) -> dict:
+    return {"cpu": "kiivska-oblast", "schedule": {"1.1": {DAY: DayGrid.from_api({"00:00": status})}}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(services.api_client, "_instance", None)
+    yield SvitloApiClient()
+    services.api_client._instance = None
+
+
+def test_reconciles_temno_against_primary_data_after_304(client):
+    now = time.time()
+    # DTEK сказав «світла немає»; temno (тоді свіжіший) — «є», і знімок уже містить поєднане «є»
+    client._primary_regions = {"kiivska-oblast": region(CODE_OFF)}
+    client._secondary_results = {"kiivska-oblast": (region(CODE_ON)["schedule"], now - 10)}
+    # Далі DTEK підтвердив свої дані відповіддю 304 — тепер він свіжіше джерело
+    client._primary_fetched_at = now
+    data = client._apply_secondary_results({"regions": [region(CODE_ON)]})
+
+    assert data["regions"][0]["schedule"]["1.1"][DAY].code_at(0) == CODE_OFF
+
+
+def test_conflict_slots_accumulate(client):
+    client._primary_regions = {"kiivska-oblast": region(CODE_OFF)}
+    client._secondary_results = {"kiivska-oblast": (region(CODE_ON)["schedule"], time.time())}
+    client._apply_secondary_results({"regions": [region(CODE_OFF)]})
+    client._apply_secondary_results({"regions": [region(CODE_OFF)]})
+
+    assert client._hedge_stats["conflict_slots"] == 2
+
+
+def test_close_cancels_late_primary_refresh(client):
+    async def run():
+        started = asyncio.Event()
+
+        async def refresh():
+            started.set()
+            await asyncio.sleep(10)
+
+        client._refresh_cache = refresh
+        primary = asyncio.create_task(asyncio.sleep(0, result=(None, True)))
+        client._pending_primary = primary
+        primary.add_done_callback(client._on_late_primary)
+        await started.wait()
+        (late,) = client._background_tasks
+        await client.close()
+        return late
+
+    late = asyncio.run(run())
+    assert late.cancelled()
+    assert not client._background_tasks
+
+
+def test_error_response_with_max_age_does_not_suppress_refresh(client, monkeypatch):
+    async def fetch(session, validators, cache_bust, keep_cpus):
+        return FetchResult(503, fresh_for=300)
+
+    monkeypatch.setattr(client._source.feed, "fetch", fetch)
+    assert asyncio.run(client._fetch_feed()) == (None, False)
+    assert client._fresh_until <= time.time()
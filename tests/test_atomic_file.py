@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from services.atomic_file import atomic_write
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / "nested" / "state.json"
+    atomic_write(str(path), b"old")
+    atomic_write(str(path), b"new")
+    assert path.read_bytes() == b"new"
+    assert os.listdir(path.parent) == ["state.json"]
+
+
+def test_failed_write_keeps_old_file_and_removes_tmp(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    atomic_write(str(path), b"old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write(str(path), b"new", ".state_")
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["state.json"]
@@ -0,0 +1,119 @@
+import copy
+import random
+
+import pytest
+
+from services.day_grid import (
+    MISSING, SLOT_LABELS, SLOTS_PER_DAY, DayGrid, compact_schedule, expand_schedule, merge_schedules,
+    merge_schedules_batch, pack_payload, unpack_payload
+)
+
+
+def legacy_merge(new_schedule: dict, old_schedule: dict) -> dict:
+    """Старий _merge_with_old_data для графіка одного регіону у форматі API."""
+    merged = copy.deepcopy(new_schedule)
+    for q_id, old_q_sched in old_schedule.items():
+        if q_id not in merged:
+            merged[q_id] = copy.deepcopy(old_q_sched)
+            continue
+        new_q_sched = merged[q_id]
+        for date_str, old_day in old_q_sched.items():
+            if date_str not in new_q_sched:
+                new_q_sched[date_str] = dict(old_day)
+                continue
+            for slot, old_status in old_day.items():
+                if new_q_sched[date_str].get(slot, 0) == 0 and old_status != 0:
+                    new_q_sched[date_str][slot] = old_status
+    return merged
+
+
+def random_day(rng: random.Random) -> dict:
+    """День у форматі API: частина слотів відсутня (MISSING), частина невідома (0)."""
+    day = {}
+    for label in SLOT_LABELS:
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        day[label] = 0 if roll < 0.35 else rng.choice((1, 2, 3))
+    return day
+
+
+def random_schedule(rng: random.Random, queues, dates) -> dict:
+    return {
+        q_id: {d: random_day(rng) for d in dates if rng.random() < 0.8}
+        for q_id in queues if rng.random() < 0.9
+    }
+
+
+def merge_batch_api(pairs: list) -> list:
+    batch = merge_schedules_batch([(compact_schedule(new), compact_schedule(old)) for new, old in pairs])
+    return [expand_schedule(merged) for merged in batch]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_merge_matches_legacy_on_random_regions(seed):
+    rng = random.Random(seed)
+    queues = [f"{g}.{s}" for g in range(1, 7) for s in (1, 2)]
+    pairs = [
+        (random_schedule(rng, queues, ["2026-01-27", "2026-01-28"]),
+         random_schedule(rng, queues, ["2026-01-26", "2026-01-27", "2026-01-28"]))
+        for _ in range(10)
+    ]
+    expected = [legacy_merge(new, old) for new, old in pairs]
+    assert merge_batch_api(pairs) == expected
+
+
+def test_missing_slots_take_old_status():
+    new = {"1.1": {"2026-01-28": {"00:00": 0, "00:30": 2}}}
+    old = {"1.1": {"2026-01-28": {"00:00": 2, "00:30": 1, "01:00": 3, "01:30": 0}}}
+    merged = merge_batch_api([(new, old)])[0]
+    # 0 і відсутній слот не затирають відомий статус; відомий новий статус перемагає
+    assert merged == {"1.1": {"2026-01-28": {"00:00": 2, "00:30": 2, "01:00": 3}}}
+    assert merged == legacy_merge(new, old)
+
+
+def test_new_dates_and_queues_are_kept():
+    new = {"1.1": {"2026-01-29": {"00:00": 1}}, "2.1": {"2026-01-28": {"00:00": 2}}}
+    old = {"1.1": {"2026-01-28": {"00:00": 2}}, "3.1": {"2026-01-28": {"12:00": 3}}}
+    merged = merge_batch_api([(new, old)])[0]
+    assert merged == {
+        "1.1": {"2026-01-29": {"00:00": 1}, "2026-01-28": {"00:00": 2}},
+        "2.1": {"2026-01-28": {"00:00": 2}},
+        "3.1": {"2026-01-28": {"12:00": 3}}
+    }
+    assert merged == legacy_merge(new, old)
+
+
+@pytest.mark.parametrize("old", [None, {}])
+def test_empty_old_data_returns_new(old):
+    new = compact_schedule({"1.1": {"2026-01-28": {"00:00": 2}}})
+    assert merge_schedules_batch([(new, old)]) == [new]
+    assert merge_schedules(None, new) == new
+
+
+def test_merge_does_not_mutate_inputs_and_keeps_unchanged_days():
+    new = compact_schedule({"1.1": {"2026-01-28": {"00:00": 2}, "2026-01-29": {"00:00": 0}}})
+    old = compact_schedule({"1.1": {"2026-01-28": {"00:00": 1}, "2026-01-29": {"00:00": 3}}})
+    new_before, old_before = expand_schedule(new), expand_schedule(old)
+    merged = merge_schedules(new, old)
+    assert expand_schedule(new) == new_before and expand_schedule(old) == old_before
+    assert merged["1.1"]["2026-01-28"] is new["1.1"]["2026-01-28"]
+    assert merged["1.1"]["2026-01-29"].to_api() == {"00:00": 3}
+
+
+def test_day_grid_round_trip():
+    day = random_day(random.Random(42))
+    grid = DayGrid.from_api(day)
+    assert grid.to_api() == day
+    assert DayGrid(grid.slots) == grid
+    assert DayGrid.from_api(None).slots == bytes([MISSING]) * SLOTS_PER_DAY
+    # Ключі поза 30-хвилинною сіткою та некоректні коди ігноруються
+    assert DayGrid.from_api({"06:15": 2, "07:00": "2", "08:00": 2}).to_api() == {"08:00": 2}
+
+
+def test_payload_round_trip():
+    rng = random.Random(7)
+    schedule = compact_schedule(random_schedule(rng, ["1.1", "1.2"], ["2026-01-28"]))
+    payload = {"date_today": "2026-01-28", "regions": [{"cpu": "kiivska-oblast", "schedule": schedule}, {"cpu": "empty"}]}
+    assert unpack_payload(pack_payload(payload)) == payload
+    assert expand_schedule(compact_schedule(expand_schedule(schedule))) == expand_schedule(schedule)
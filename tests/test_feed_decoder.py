@@ -0,0 +1,28 @@
+import json
+import tracemalloc
+
+from services.feed_decoder import decode_feed
+
+
+def feed(regions: int) -> bytes:
+    inner = {"regions": [{"cpu": f"r{n}", "schedule": {"1.1": {"2026-10-17": {"00:00": 1}}}} for n in range(regions)]}
+    return json.dumps({"body": json.dumps(inner)}).encode()
+
+
+def test_peak_alloc_is_measured_per_decode():
+    small = decode_feed(feed(10))[1]["peak_alloc_kb"]
+    large = decode_feed(feed(5000))[1]["peak_alloc_kb"]
+    # Після великого декодування мале знову показує малий пік, а не максимум процесу
+    assert small < large
+    assert decode_feed(feed(10))[1]["peak_alloc_kb"] < large
+    assert not tracemalloc.is_tracing()
+
+
+def test_external_tracing_is_left_running():
+    tracemalloc.start()
+    try:
+        _, metrics = decode_feed(feed(10))
+        assert tracemalloc.is_tracing()
+        assert metrics["peak_alloc_kb"] >= 0
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,92 @@
+import random
+from datetime import datetime
+
+from services.day_grid import CODE_OFF, CODE_ON, MISSING, SLOT_INDEX
+from services.if_parser import parse_if_schedule, parse_if_schedule_dict
+
+QUEUE = "1.1"
+
+
+def legacy_parse(raw_data: list, queue: str) -> dict:
+    """Старий SvitloApiClient._parse_if_schedule (цикл по слотах з форматуванням ключів)."""
+    parsed = {}
+    for day_data in raw_data:
+        iso_date = datetime.strptime(day_data["eventDate"], "%d.%m.%Y").date().isoformat()
+        day_schedule = {}
+        for h in range(24):
+            day_schedule[f"{h:02d}:00"] = 1
+            day_schedule[f"{h:02d}:30"] = 1
+        for interval in day_data.get("queues", {}).get(queue, []):
+            start_h, start_m = map(int, interval["from"].split(":"))
+            end_h, end_m = map(int, interval["to"].split(":"))
+            curr_h, curr_m = start_h, start_m
+            while (curr_h < end_h) or (curr_h == end_h and curr_m < end_m):
+                day_schedule[f"{curr_h:02d}:{curr_m:02d}"] = 2
+                curr_m += 30
+                if curr_m >= 60:
+                    curr_m = 0
+                    curr_h += 1
+        parsed[iso_date] = day_schedule
+    return parsed
+
+
+def day(event_date: str, *intervals) -> dict:
+    return {"eventDate": event_date, "queues": {QUEUE: [{"from": f, "to": t, "status": 1} for f, t in intervals]}}
+
+
+def off_slots(grid) -> list:
+    return [i for i, c in enumerate(grid.slots) if c == CODE_OFF]
+
+
+def test_matches_legacy_on_half_hour_intervals():
+    rng = random.Random(1)
+    raw = []
+    for d in range(1, 8):
+        intervals = []
+        for _ in range(rng.randint(0, 4)):
+            start = rng.randint(0, 46)
+            end = rng.randint(start + 1, 48)
+            intervals.append((f"{start // 2:02d}:{start % 2 * 30:02d}", f"{end // 2:02d}:{end % 2 * 30:02d}"))
+        raw.append(day(f"{d:02d}.01.2026", *intervals))
+    assert parse_if_schedule_dict(raw, QUEUE) == legacy_parse(raw, QUEUE)
+
+
+def test_interval_over_midnight_spills_into_next_date():
+    grids = parse_if_schedule([day("27.01.2026", ("22:00", "02:00")), day("28.01.2026")], QUEUE)
+    assert off_slots(grids["2026-01-27"]) == list(range(44, 48))
+    assert off_slots(grids["2026-01-28"]) == [0, 1, 2, 3]
+    assert grids["2026-01-28"].slots[4] == CODE_ON
+
+
+def test_spill_into_missing_date_leaves_other_slots_unknown():
+    grids = parse_if_schedule([day("31.01.2026", ("23:00", "01:30"))], QUEUE)
+    spilled = grids["2026-02-01"]
+    assert off_slots(spilled) == [0, 1, 2]
+    assert set(spilled.slots[3:]) == {MISSING}
+    assert parse_if_schedule_dict([day("31.01.2026", ("23:00", "01:30"))], QUEUE)["2026-02-01"] == {
+        "00:00": CODE_OFF, "00:30": CODE_OFF, "01:00": CODE_OFF
+    }
+
+
+def test_partial_slots_mark_every_overlapped_slot():
+    grids = parse_if_schedule([day("28.01.2026", ("06:15", "07:10"))], QUEUE)
+    assert off_slots(grids["2026-01-28"]) == [SLOT_INDEX["06:00"], SLOT_INDEX["06:30"], SLOT_INDEX["07:00"]]
+
+
+def test_end_of_day_as_24_00():
+    grids = parse_if_schedule([day("28.01.2026", ("21:30", "24:00"))], QUEUE)
+    assert off_slots(grids["2026-01-28"]) == list(range(43, 48))
+    assert set(grids) == {"2026-01-28"}
+
+
+def test_bad_intervals_and_dates_are_skipped():
+    raw = [
+        day("28.01.2026", ("10:00", ""), ("25:00", "26:00"), ("ab", "12:00"), ("12:00", "13:00")),
+        day("not-a-date", ("00:00", "12:00")),
+        {"eventDate": "29.01.2026", "queues": {"2.1": [{"from": "00:00", "to": "12:00"}]}}
+    ]
+    grids = parse_if_schedule(raw, QUEUE)
+    assert set(grids) == {"2026-01-28", "2026-01-29"}
+    assert off_slots(grids["2026-01-28"]) == [24, 25]
+    # Черги немає у відповіді за цей день — світло є весь день
+    assert set(grids["2026-01-29"].slots) == {CODE_ON}
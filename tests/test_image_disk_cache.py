@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+
+from services.image_disk_cache import DiskImageStore
+from services.rendered_image import RenderedImage
+
+
+def image(n: int) -> RenderedImage:
+    return RenderedImage(f"image-{n}".encode())
+
+
+def blob_files(path: str) -> set:
+    return {name for _, _, names in os.walk(os.path.join(path, "blobs")) for name in names}
+
+
+def test_index_is_written_once_per_flush(tmp_path):
+    async def run():
+        store = DiskImageStore(str(tmp_path), flush_delay=60)
+        for n in range(50):
+            await store.put(("kiev", f"{n}.1", "classic", "h"), [image(n)])
+        # Жодна зміна ще не записала індекс: запис відкладено
+        assert not os.path.exists(tmp_path / "index.json")
+        await store.close()
+        return store.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["index_writes"] == 1
+    with open(tmp_path / "index.json", encoding="utf-8") as f:
+        assert len(json.load(f)["entries"]) == 50
+
+
+def test_flush_after_delay(tmp_path):
+    async def run():
+        store = DiskImageStore(str(tmp_path), flush_delay=0.01)
+        await store.put(("kiev", "1.1", "classic", "h"), [image(1)])
+        await store.put(("kiev", "1.2", "classic", "h"), [image(2)])
+        await asyncio.sleep(0.1)
+        return store.get_stats()
+
+    assert asyncio.run(run())["index_writes"] == 1
+    assert os.path.exists(tmp_path / "index.json")
+
+
+def test_entries_survive_restart(tmp_path):
+    key = ("kiev", "1.1", "classic", "h")
+
+    async def write():
+        store = DiskImageStore(str(tmp_path))
+        await store.put(key, [image(1), image(2)])
+        await store.close()
+
+    async def read():
+        return await DiskImageStore(str(tmp_path)).get(key)
+
+    asyncio.run(write())
+    images = asyncio.run(read())
+    assert [img.data for img in images] == [b"image-1", b"image-2"]
+
+
+def test_released_blob_is_deleted_on_flush(tmp_path):
+    async def run():
+        store = DiskImageStore(str(tmp_path), flush_delay=60)
+        await store.put(("kiev", "1.1", "classic", "h"), [image(1)])
+        await store.put(("kiev", "1.2", "classic", "h"), [image(1)])
+        await store.close()
+        digest = image(1).digest
+        assert blob_files(str(tmp_path)) == {f"{digest}.png"}
+
+        store.remove_queue("kiev", "1.1")
+        await store.close()
+        # Файл спільний з 1.2 — лишається
+        assert blob_files(str(tmp_path)) == {f"{digest}.png"}
+
+        store.remove_region("kiev")
+        assert blob_files(str(tmp_path)) == {f"{digest}.png"}
+        await store.close()
+        assert blob_files(str(tmp_path)) == set()
+
+    asyncio.run(run())
+
+
+def test_reput_before_flush_keeps_blob(tmp_path):
+    async def run():
+        store = DiskImageStore(str(tmp_path), flush_delay=60)
+        key = ("kiev", "1.1", "classic", "h")
+        await store.put(key, [image(1)])
+        store.remove_region("kiev")
+        # Той самий вміст знову в кеші до запису індексу: файл не можна видаляти
+        await store.put(key, [image(1)])
+        await store.close()
+        assert blob_files(str(tmp_path)) == {f"{image(1).digest}.png"}
+        assert [img.data for img in await store.get(key)] == [b"image-1"]
+
+    asyncio.run(run())
+
+
+def test_orphaned_blobs_are_removed_on_load(tmp_path):
+    async def write():
+        store = DiskImageStore(str(tmp_path))
+        await store.put(("kiev", "1.1", "classic", "h"), [image(1)])
+        await store.close()
+
+    asyncio.run(write())
+    orphan_dir = tmp_path / "blobs" / "zz"
+    orphan_dir.mkdir()
+    (orphan_dir / "zz00.png").write_bytes(b"orphan")
+    (orphan_dir / ".blob_tmp").write_bytes(b"partial")
+    (tmp_path / ".index_tmp").write_bytes(b"partial")
+
+    async def reopen():
+        # Прибирання йде у фоні після старту; close() дочікується його через flush()
+        store = DiskImageStore(str(tmp_path))
+        await store.close()
+
+    asyncio.run(reopen())
+    assert blob_files(str(tmp_path)) == {f"{image(1).digest}.png"}
+    assert not os.path.exists(tmp_path / ".index_tmp")
+
+
+def test_remove_mode_and_queue_use_indexes(tmp_path):
+    async def run():
+        store = DiskImageStore(str(tmp_path), flush_delay=60)
+        await store.put(("kiev", "1.1", "classic", "old|x"), [image(1)])
+        await store.put(("kiev", "1.1", "classic", "new|x"), [image(2)])
+        await store.put(("kiev", "1.1", "dynamic", "new|y"), [image(3)])
+        await store.put(("odesa", "2.1", "dynamic", "new|y"), [image(4)])
+
+        assert store.remove_mode("dynamic") == 2
+        assert store.remove_queue("kiev", "1.1", lambda key: not key[3].startswith("new|")) == 1
+        assert store.has(("kiev", "1.1", "classic", "new|x"))
+        assert store.get_stats()["entries"] == 1
+        await store.close()
+
+    asyncio.run(run())
@@ -0,0 +1,22 @@
+import pickle
+
+import pytest
+
+from services.rendered_image import RenderedImage
+
+
+def test_rendered_image_is_immutable():
+    image = RenderedImage(b"png")
+    with pytest.raises(AttributeError):
+        image.data = b"other"
+    with pytest.raises(AttributeError):
+        image.render_ms = 1.0
+    assert image.data == b"png"
+
+
+def test_digest_is_cached_and_survives_pickle():
+    image = RenderedImage(b"png", render_ms=5.0)
+    digest = image.digest
+    copy = pickle.loads(pickle.dumps(image))
+    assert copy.digest == digest
+    assert (copy.data, copy.render_ms, copy.rendered_at) == (image.data, image.render_ms, image.rendered_at)
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram import Bot
+from aiogram.types import User
+
+import database.db
+import services.render_pool
+import services.telegram_files
+from handlers import registration
+from services.api_client import REGIONS
+from services.day_grid import schedule_hash
+from services.image_cache import ImageCache, image_cache_key
+from services.rendered_image import RenderedImage
+
+REGION = next(iter(REGIONS))
+QUEUE = "1.1"
+
+
+@pytest.fixture
+def image_cache(monkeypatch):
+    monkeypatch.setattr(ImageCache, "_instance", None)
+    yield ImageCache()
+    ImageCache._instance = None
+
+
+def test_notification_hits_prerendered_images(monkeypatch, image_cache):
+    schedule = {}
+    sent = []
+
+    async def get_user(tg_id):
+        return (tg_id, REGION, f'[{{"id": "{QUEUE}", "alias": "{QUEUE}"}}]', None, "classic")
+
+    async def fetch_schedule(region, queue, allow_stale=False):
+        return {"schedule": schedule, "date_today": "2026-10-17", "date_tomorrow": "2026-10-18"}
+
+    async def send_photos(target, chat_id, images, caption, filename):
+        sent.append(images)
+
+    async def update_user_hash(tg_id, new_hash):
+        pass
+
+    async def render_schedule_images(*args, **kwargs):
+        raise AssertionError("pre-rendered images must be reused")
+
+    monkeypatch.setattr(registration, "get_user", get_user)
+    monkeypatch.setattr(registration.api_client, "fetch_schedule", fetch_schedule)
+    monkeypatch.setattr(services.telegram_files, "send_photos", send_photos)
+    monkeypatch.setattr(database.db, "update_user_hash", update_user_hash)
+    monkeypatch.setattr(services.render_pool, "render_schedule_images", render_schedule_images)
+
+    bot = Bot(token="123456:TEST")
+    bot._me = User(id=123456, is_bot=True, first_name="Svitlo", username="svitlo_test_bot")
+
+    async def run():
+        # Ключ, з яким check_updates рендерить зображення регіону заздалегідь
+        key = image_cache_key(
+            schedule_hash(schedule), datetime.now().date().isoformat(), QUEUE, REGIONS.get(REGION), "svitlo_test_bot"
+        )
+        images = [RenderedImage(b"prerendered")]
+        await image_cache.set(REGION, QUEUE, "classic", key, images)
+        await registration.send_schedule(bot, 42)
+        return images
+
+    images = asyncio.run(run())
+    assert sent == [images]
+    assert image_cache.get_stats()["hits"] == 1
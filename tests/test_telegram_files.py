@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+
+from services.rendered_image import RenderedImage
+from services.telegram_files import TelegramFileCache, send_photos
+
+
+class Target:
+    """Замість Bot: перше надсилання падає з заданою помилкою."""
+
+    def __init__(self, error: str):
+        self.error = error
+        self.sent = []
+
+    async def send_photo(self, chat_id, photo, caption=None, parse_mode=None):
+        self.sent.append(photo)
+        if len(self.sent) == 1:
+            raise TelegramBadRequest(method=None, message=self.error)
+        return SimpleNamespace(photo=[SimpleNamespace(file_id="new-id")])
+
+
+@pytest.fixture
+def file_cache(monkeypatch):
+    monkeypatch.setattr(TelegramFileCache, "_instance", None)
+    yield TelegramFileCache()
+    TelegramFileCache._instance = None
+
+
+def test_stale_file_id_is_reuploaded(file_cache):
+    image = RenderedImage(b"png")
+    file_cache.remember(image.digest, "old-id")
+    target = Target("Bad Request: wrong file identifier/HTTP URL specified")
+
+    asyncio.run(send_photos(target, 42, [image], None, "schedule"))
+    assert target.sent[0] == "old-id" and target.sent[1] != "old-id"
+    assert file_cache.get(image.digest) == "new-id"
+
+
+def test_other_bad_request_keeps_file_id(file_cache):
+    image = RenderedImage(b"png")
+    file_cache.remember(image.digest, "old-id")
+    target = Target("Bad Request: can't parse entities: unsupported start tag")
+
+    with pytest.raises(TelegramBadRequest):
+        asyncio.run(send_photos(target, 42, [image], "*caption", "schedule"))
+    assert len(target.sent) == 1
+    assert file_cache.get(image.digest) == "old-id"